@@ -152,7 +152,13 @@ class InterpreterFunction(_function_base.SignedFunction):
     self.kw_defaults = kw_defaults
     self.closure = closure
     self._call_cache = {}
+    # Results of previous calls, keyed on the types of their arguments. Only
+    # used with --call-summary-depth.
+    self._summary_cache = {}
     self._call_records = []
+    # Calls with concrete arguments and their results, for writing a function
+    # summary with --function-summaries.
+    self._summary_records = []
     # TODO(b/78034005): Combine this and PyTDFunction.signatures into a single
     # way to handle multiple signatures that SignedFunction can also use.
     self._overloads = overloads
@@ -347,23 +353,55 @@ class InterpreterFunction(_function_base.SignedFunction):
         [self.ctx.convert.unsolvable, self.ctx.convert.none], [], node)
     return function.Args(posargs=(args.posargs[0], arg1, arg2, arg3))
 
-  def _hash_call(self, callargs, frame):
+  def _can_reuse_call(self, callargs):
     # Note that we ignore caching in __init__ calls, so that attributes are
     # set correctly.
-    if (self.ctx.options.skip_repeat_calls and
-        ("self" not in callargs or not self.ctx.callself_stack or
-         callargs["self"].data != self.ctx.callself_stack[-1].data)):
+    return (self.ctx.options.skip_repeat_calls and
+            ("self" not in callargs or not self.ctx.callself_stack or
+             callargs["self"].data != self.ctx.callself_stack[-1].data))
+
+  def _environment_hash_args(self, frame):
+    """The globals and nonlocals that this function can see, for hashing."""
+    return ((frame.f_globals.members, set(self.code.co_names)),
+            (frame.f_locals.members,
+             set(frame.f_locals.members) - set(self.code.co_varnames)))
+
+  def _hash_call(self, callargs, frame):
+    if self._can_reuse_call(callargs):
       callkey = _hash_all_dicts(
-          (callargs, None),
-          (frame.f_globals.members, set(self.code.co_names)),
-          (frame.f_locals.members,
-           set(frame.f_locals.members) - set(self.code.co_varnames)))
+          (callargs, None), *self._environment_hash_args(frame))
     else:
       # Make the callkey the number of times this function has been called so
       # that no call has the same key as a previous one.
       callkey = len(self._call_cache)
     return callkey
 
+  def _summarize_call(self, callargs, frame):
+    """Key a call on the types of its arguments, for --call-summary-depth."""
+    depth = self.ctx.options.call_summary_depth
+    if not depth or not self._can_reuse_call(callargs):
+      return None
+    return (abstract_utils.get_dict_type_key_component(callargs, depth),
+            _hash_all_dicts(*self._environment_hash_args(frame)))
+
+  def _snapshot_args(self, callargs):
+    """Snapshot the arguments of a call, to detect side effects on them."""
+    if not self.ctx.options.call_summary_depth:
+      return None
+    return (_hash_all_dicts((callargs, None)),
+            {name: len(var.bindings) for name, var in callargs.items()})
+
+  def _call_without_analysis(self, node, use_annotation):
+    """Returns the result of a call that is not analyzed."""
+    if use_annotation and self.signature.has_return_annotation:
+      ret_type = self.signature.annotations["return"]
+      node, ret = self.ctx.vm.init_class(node, ret_type)
+      if self.is_coroutine():
+        ret = _instances.Coroutine(self.ctx, ret, node).to_variable(node)
+    else:
+      ret = self.ctx.new_unsolvable(node)
+    return node, ret
+
   def call(self, node, func, args, alias_map=None, new_locals=False,
            frame_substs=()):
     if self.is_overload:
@@ -372,16 +410,15 @@ class InterpreterFunction(_function_base.SignedFunction):
         not self.name.endswith(".__init__")):
       log.info("Maximum depth reached. Not analyzing %r", self.name)
       self._set_callself_maybe_missing_members()
-      if (self.signature.has_return_annotation and
-          (self.ctx.options.always_use_return_annotations or
-           self.signature.annotations["return"] == self.ctx.convert.no_return)):
-        ret_type = self.signature.annotations["return"]
-        node, ret = self.ctx.vm.init_class(node, ret_type)
-        if self.is_coroutine():
-          ret = _instances.Coroutine(self.ctx, ret, node).to_variable(node)
-      else:
-        ret = self.ctx.new_unsolvable(node)
-      return node, ret
+      use_annotation = (
+          self.ctx.options.always_use_return_annotations or
+          self.signature.has_return_annotation and
+          self.signature.annotations["return"] == self.ctx.convert.no_return)
+      return self._call_without_analysis(node, use_annotation)
+    if self.ctx.vm.is_over_budget(self.code):
+      log.info("Function budget exceeded. Not analyzing %r", self.name)
+      self._set_callself_maybe_missing_members()
+      return self._call_without_analysis(node, use_annotation=True)
     args = self._fix_args_for_unannotated_contextmanager_exit(node, func, args)
     args = args.simplify(node, self.ctx, self.signature)
     sig, substs, callargs = self._find_matching_sig(node, args, alias_map)
@@ -474,10 +511,16 @@ class InterpreterFunction(_function_base.SignedFunction):
                                               self.ctx.convert.unsolvable)
       frame.check_return = check_return
     callkey_pre = self._hash_call(callargs, frame)
+    args_snapshot = self._snapshot_args(callargs)
     if callkey_pre in self._call_cache:
-      old_ret, old_remaining_depth = self._call_cache[callkey_pre]
+      cached = self._call_cache[callkey_pre]
+    else:
+      cached = self._summary_cache.get(self._summarize_call(callargs, frame))
+    if cached:
+      old_ret, old_remaining_depth = cached
       # Optimization: This function has already been called, with the same
-      # environment and arguments, so recycle the old return value.
+      # environment and arguments (or, with --call-summary-depth, arguments of
+      # the same types), so recycle the old return value.
       # We would want to skip this optimization and reanalyze the call if we can
       # traverse the function deeper.
       if self.ctx.vm.remaining_depth() > old_remaining_depth:
@@ -494,6 +537,8 @@ class InterpreterFunction(_function_base.SignedFunction):
         if self._store_call_records:
           # Even if the call is cached, we might not have been recording it.
           self._call_records.append((callargs, ret, node))
+        if self.ctx.options.function_summaries:
+          self._record_summary(args, callargs, ret, node)
         return node, ret
     if self.code.has_generator():
       generator = _instances.Generator(frame, self.ctx)
@@ -534,11 +579,38 @@ class InterpreterFunction(_function_base.SignedFunction):
     # Recompute the calllkey so that side effects are taken into account.
     callkey_post = self._hash_call(callargs, frame)
     self._call_cache[callkey_post] = ret, self.ctx.vm.remaining_depth()
+    summary_key = self._summarize_call(callargs, frame)
+    # A summary must not be reused for a call that wrote attributes on, or
+    # mutated type parameters of, one of its arguments, since reusing it would
+    # drop those side effects.
+    if (summary_key is not None and
+        self._snapshot_args(callargs) == args_snapshot):
+      self._summary_cache[summary_key] = self._call_cache[callkey_post]
     if self._store_call_records or self.ctx.store_all_calls:
       self._call_records.append((callargs, ret, node_after_call))
+    if self.ctx.options.function_summaries:
+      self._record_summary(args, callargs, ret, node_after_call)
     self.last_frame = frame
     return node_after_call, typeguard_return or ret
 
+  def _record_summary(self, args, callargs, ret, node):
+    """Record a call for --function-summaries."""
+    if args.starargs or args.starstarargs:
+      # We can't tell which parameters were filled in with their defaults.
+      return
+    passed = set(self.signature.param_names[:len(args.posargs)])
+    passed.update(args.namedargs)
+    self._summary_records.append((callargs, passed, ret, node))
+
+  def get_summary_records(self):
+    """Get the summary records of this function's calls.
+
+    Returns:
+      A list of (callargs, names of the parameters that the caller passed
+      explicitly, return value, node) tuples.
+    """
+    return self._summary_records
+
   def get_call_combinations(self, node):
     """Get this function's call records."""
     all_combinations = []
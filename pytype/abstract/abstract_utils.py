@@ -3,7 +3,7 @@
 import collections
 import dataclasses
 import logging
-from typing import Any, Collection, Dict, Iterable, Mapping, Optional, Sequence, Set, Tuple, Union
+from typing import Any, Collection, Dict, FrozenSet, Iterable, Mapping, Optional, Sequence, Set, Tuple, Union
 
 from pytype import datatypes
 from pytype.pyc import opcodes
@@ -940,6 +940,56 @@ def get_dict_fullhash_component(
                       for k, v in vardict.items()))
 
 
+def _get_type_key_at_depth(value: _BaseValueType, depth: int) -> Any:
+  if not _isinstance(value, "Instance") or _isinstance(value, "Module"):
+    return value
+  if (_isinstance(value, "ConcreteValue") and
+      isinstance(value.pyval, (int, float, complex, str, bytes))):
+    # Literal constants may be used to prune branches, so they are keyed on
+    # their value.
+    return (value.cls, type(value.pyval), value.pyval)
+  if depth <= 1:
+    return value.cls
+  return (value.cls, frozenset(
+      (name, get_var_type_key_component(var, depth - 1))
+      for name, var in value.instance_type_parameters.items()))
+
+
+def get_var_type_key_component(var: cfg.Variable, depth: int) -> FrozenSet[Any]:
+  """Summarize the types of the data in a variable.
+
+  Unlike get_var_fullhash_component, this ignores everything about instances
+  except for their classes and the types of their type parameters. Literal
+  constants are the exception: they are summarized by their values.
+
+  Arguments:
+    var: A Variable.
+    depth: How many levels of type parameters to look at. At depth 1, only the
+      class of an instance is used.
+
+  Returns:
+    A hashable frozenset. Non-instance values are included as themselves.
+  """
+  return frozenset(_get_type_key_at_depth(v, depth) for v in var.data)
+
+
+def get_dict_type_key_component(
+    vardict: Dict[str, cfg.Variable], depth: int) -> FrozenSet[Any]:
+  """Summarize the types of the values in a dictionary.
+
+  See get_var_type_key_component.
+
+  Arguments:
+    vardict: A dictionary mapping str to Variable.
+    depth: How many levels of type parameters to look at.
+
+  Returns:
+    A hashable frozenset.
+  """
+  return frozenset((k, get_var_type_key_component(v, depth))
+                   for k, v in vardict.items())
+
+
 def simplify_variable(var, node, ctx):
   """Deduplicates identical data in `var`."""
   if not var:
@@ -56,5 +56,73 @@ class GetViewsTest(test_base.UnitTest):
     self._test_optimized(skip_future_value=False, expected_num_views=2)
 
 
+class TypeKeyTest(test_base.UnitTest):
+
+  def setUp(self):
+    super().setUp()
+    options = config.Options.create(python_version=self.python_version)
+    self._ctx = test_utils.make_context(options)
+    self._node = self._ctx.root_node
+
+  def _list_of(self, *values):
+    return self._ctx.convert.build_list(
+        self._node, [v.to_variable(self._node) for v in values])
+
+  def test_same_class(self):
+    str_instance = self._ctx.convert.primitive_class_instances[str]
+    v1 = str_instance.to_variable(self._node)
+    v2 = self._ctx.convert.build_string(self._node, "a")
+    self.assertEqual(
+        abstract_utils.get_var_type_key_component(v1, 1),
+        abstract_utils.get_var_type_key_component(
+            str_instance.to_variable(self._node), 1))
+    self.assertNotEqual(
+        abstract_utils.get_var_type_key_component(v1, 1),
+        abstract_utils.get_var_type_key_component(
+            self._ctx.convert.build_int(self._node), 1))
+    self.assertNotEqual(abstract_utils.get_var_type_key_component(v1, 1),
+                        abstract_utils.get_var_type_key_component(v2, 1))
+
+  def test_constant(self):
+    v1 = self._ctx.convert.build_string(self._node, "a")
+    v2 = self._ctx.convert.build_string(self._node, "b")
+    self.assertEqual(
+        abstract_utils.get_var_type_key_component(v1, 1),
+        abstract_utils.get_var_type_key_component(
+            self._ctx.convert.build_string(self._node, "a"), 1))
+    self.assertNotEqual(abstract_utils.get_var_type_key_component(v1, 1),
+                        abstract_utils.get_var_type_key_component(v2, 1))
+
+  def test_depth(self):
+    int_instance = self._ctx.convert.primitive_class_instances[int]
+    str_instance = self._ctx.convert.primitive_class_instances[str]
+    v1 = self._list_of(int_instance)
+    v2 = self._list_of(str_instance)
+    self.assertEqual(abstract_utils.get_var_type_key_component(v1, 1),
+                     abstract_utils.get_var_type_key_component(v2, 1))
+    self.assertNotEqual(abstract_utils.get_var_type_key_component(v1, 2),
+                        abstract_utils.get_var_type_key_component(v2, 2))
+    self.assertEqual(
+        abstract_utils.get_var_type_key_component(v1, 2),
+        abstract_utils.get_var_type_key_component(
+            self._list_of(int_instance), 2))
+
+  def test_non_instance(self):
+    v = self._ctx.convert.int_type.to_variable(self._node)
+    self.assertEqual(abstract_utils.get_var_type_key_component(v, 1),
+                     frozenset({self._ctx.convert.int_type}))
+
+  def test_dict(self):
+    str_instance = self._ctx.convert.primitive_class_instances[str]
+    key1 = abstract_utils.get_dict_type_key_component(
+        {"x": str_instance.to_variable(self._node)}, 1)
+    key2 = abstract_utils.get_dict_type_key_component(
+        {"x": str_instance.to_variable(self._node)}, 1)
+    key3 = abstract_utils.get_dict_type_key_component(
+        {"y": str_instance.to_variable(self._node)}, 1)
+    self.assertEqual(key1, key2)
+    self.assertNotEqual(key1, key3)
+
+
 if __name__ == "__main__":
   unittest.main()
@@ -0,0 +1,183 @@
+"""An on-disk cache of processed bytecode.
+
+Compiling a module and turning its bytecode into the blocks.OrderedCode that
+the vm runs (block splitting, merging type comments, constant folding) only
+depends on the source code, the target Python version and the pytype version.
+The cache stores the result together with a hash of those, so that analyzing
+an unchanged file again skips all of it. There is one entry per source file,
+which is replaced when the file changes, so the cache does not grow with every
+edit.
+
+An OrderedCode is a graph of code objects, blocks and opcodes whose opcodes are
+linked to each other, so pickling it directly recurses once per opcode. Instead,
+the nodes of the graph are pickled without their state, and the states follow
+in separate records.
+"""
+
+import copyreg
+import hashlib
+import io
+import logging
+import os
+import pickle
+import zlib
+
+from typing import FrozenSet, Optional, Tuple
+
+from pytype import __version__
+from pytype import blocks
+from pytype import file_utils
+from pytype.pyc import opcodes
+
+log = logging.getLogger(__name__)
+
+_NODE_TYPES = (blocks.OrderedCode, blocks.Block, opcodes.Opcode)
+_SUFFIX = ".code"
+_KEY_LENGTH = hashlib.sha256().digest_size * 2
+
+# An entry: the processed code and the lines of ignored type comments.
+Entry = Tuple[blocks.OrderedCode, FrozenSet[int]]
+
+
+def make_key(src, filename, python_version) -> str:
+  """Compute the cache key of a module."""
+  h = hashlib.sha256()
+  for part in (__version__.__version__, "%d.%d" % python_version,
+               filename or ""):
+    h.update(part.encode("utf-8"))
+    h.update(b"\0")
+  h.update(src.encode("utf-8", "surrogatepass"))
+  return h.hexdigest()
+
+
+_slots = {}
+
+
+def _get_slots(cls):
+  if cls not in _slots:
+    _slots[cls] = tuple(slot for c in cls.__mro__  # pylint: disable=g-complex-comprehension
+                        for slot in c.__dict__.get("__slots__", ())
+                        if slot != "__weakref__")
+  return _slots[cls]
+
+
+def _get_state(node):
+  state = {}
+  for slot in _get_slots(node.__class__):
+    try:
+      state[slot] = getattr(node, slot)
+    except AttributeError:
+      pass
+  state.update(getattr(node, "__dict__", ()))
+  return state
+
+
+def _set_state(node, state):
+  for name, value in state.items():
+    setattr(node, name, value)
+
+
+def _get_node_classes():
+  classes = [blocks.OrderedCode, blocks.Block]
+  todo = [opcodes.Opcode]
+  while todo:
+    cls = todo.pop()
+    classes.append(cls)
+    todo.extend(cls.__subclasses__())
+  return classes
+
+
+class _Pickler(pickle.Pickler):
+  """Pickles graph nodes as empty objects, collecting them as it finds them."""
+
+  def __init__(self, file):
+    super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+    self.nodes = []
+    # Unlike persistent_id(), which is called for every pickled object, the
+    # dispatch table is only consulted for the node classes.
+    self.dispatch_table = copyreg.dispatch_table.copy()
+    self.dispatch_table.update(
+        dict.fromkeys(_get_node_classes(), self._reduce_node))
+
+  def _reduce_node(self, node):
+    # The memo shares the node between records, so this is only called the
+    # first time the node is found. The node is recreated without state;
+    # pickling the state here would recurse into the linked opcodes.
+    self.nodes.append(node)
+    return copyreg.__newobj__, (node.__class__,)
+
+
+def dumps(entry: Entry) -> bytes:
+  """Serialize a cache entry."""
+  f = io.BytesIO()
+  pickler = _Pickler(f)
+  pickler.dump(entry)
+  # Every record holds the nodes found while pickling the previous record,
+  # with their states. Pickling the states may find more nodes, which go into
+  # the next record. An empty record ends the entry.
+  done = 0
+  while True:
+    todo = pickler.nodes[done:]
+    pickler.dump([(node, _get_state(node)) for node in todo])
+    if not todo:
+      break
+    done += len(todo)
+  return zlib.compress(f.getvalue(), 1)
+
+
+def loads(data: bytes) -> Entry:
+  """Deserialize a cache entry."""
+  unpickler = pickle.Unpickler(io.BytesIO(zlib.decompress(data)))
+  entry = unpickler.load()
+  while True:
+    states = unpickler.load()
+    if not states:
+      break
+    for node, state in states:
+      _set_state(node, state)
+  return entry
+
+
+class CodeCache:
+  """A directory of processed bytecode.
+
+  Entries are stored per filename and are only used if their key, computed by
+  make_key(), matches. Storing the entry of a changed file replaces the old one.
+  """
+
+  def __init__(self, directory):
+    self._directory = directory
+
+  def _path(self, filename):
+    name = hashlib.sha256((filename or "").encode("utf-8", "surrogatepass"))
+    return os.path.join(self._directory, name.hexdigest() + _SUFFIX)
+
+  def load(self, filename, key) -> Optional[Entry]:
+    """Load the entry of a file, returning None if there is no usable one."""
+    path = self._path(filename)
+    try:
+      with open(path, "rb") as f:
+        data = f.read()
+    except OSError:
+      return None
+    if data[:_KEY_LENGTH] != key.encode("ascii"):
+      # The entry is from an older version of the file.
+      return None
+    try:
+      return loads(data[_KEY_LENGTH:])
+    except Exception:  # pylint: disable=broad-except
+      # A corrupt entry is as good as a missing one; it is overwritten later.
+      log.warning("Ignoring unreadable code cache entry %s", path)
+      return None
+
+  def store(self, filename, key, entry: Entry):
+    """Store the entry of a file. Failing to write the cache is not an error."""
+    path = self._path(filename)
+    data = key.encode("ascii") + dumps(entry)
+    try:
+      os.makedirs(self._directory, exist_ok=True)
+      with file_utils.atomic_write(path) as tmp:
+        with open(tmp, "wb") as f:
+          f.write(data)
+    except OSError as e:
+      log.warning("Could not write code cache entry %s: %s", path, e)
@@ -0,0 +1,104 @@
+"""Tests for code_cache.py."""
+
+import os
+import textwrap
+
+from pytype import blocks
+from pytype import code_cache
+from pytype import constant_folding
+from pytype.pyc import pyc
+from pytype.tests import test_base
+from pytype.tests import test_utils
+
+import unittest
+
+
+class CodeCacheTest(test_base.UnitTest):
+  """Tests for CodeCache."""
+
+  def _process(self, src):
+    code = pyc.compile_src(
+        textwrap.dedent(src), filename="test.py",
+        python_version=self.python_version, python_exe=None)
+    code = blocks.process_code(code, self.python_version)
+    return constant_folding.optimize(blocks.merge_annotations(code, {}))
+
+  def _flatten(self, code):
+    """Summarize the code, with the links between opcodes and blocks."""
+    out = []
+    for block in code.order:
+      for op in block:
+        out.append((str(op), op.line, op.index, op.code.co_name,
+                    op.next and op.next.index, op.target and op.target.index,
+                    sorted(b.id for b in block.outgoing)))
+    for const in code.co_consts:
+      if isinstance(const, blocks.OrderedCode):
+        out.extend(self._flatten(const))
+    return out
+
+  def test_roundtrip(self):
+    code = self._process("""
+      def f(x):
+        for i in range(x):
+          if i:
+            return [(1, 2), {"a": [3]}]
+        return None
+    """)
+    loaded_code, lines = code_cache.loads(
+        code_cache.dumps((code, frozenset({3}))))
+    self.assertEqual(lines, {3})
+    self.assertEqual(self._flatten(code), self._flatten(loaded_code))
+
+  def test_long_code(self):
+    # Opcodes are linked to each other, so the serialization must not recurse
+    # once per opcode.
+    code = self._process("x = 0\n" * 5000)
+    loaded_code, _ = code_cache.loads(code_cache.dumps((code, frozenset())))
+    self.assertEqual(self._flatten(code), self._flatten(loaded_code))
+
+  def test_store_and_load(self):
+    code = self._process("x = 42")
+    with test_utils.Tempdir() as d:
+      cache = code_cache.CodeCache(os.path.join(d.path, "cache"))
+      key = code_cache.make_key("x = 42", "test.py", self.python_version)
+      self.assertIsNone(cache.load("test.py", key))
+      cache.store("test.py", key, (code, frozenset()))
+      loaded_code, _ = cache.load("test.py", key)
+      self.assertEqual(self._flatten(code), self._flatten(loaded_code))
+      self.assertIsNone(cache.load("other.py", key))
+
+  def test_replace_entry(self):
+    old_code = self._process("x = 42")
+    new_code = self._process("x = 43")
+    with test_utils.Tempdir() as d:
+      cache = code_cache.CodeCache(d.path)
+      old_key = code_cache.make_key("x = 42", "test.py", self.python_version)
+      new_key = code_cache.make_key("x = 43", "test.py", self.python_version)
+      cache.store("test.py", old_key, (old_code, frozenset()))
+      cache.store("test.py", new_key, (new_code, frozenset()))
+      # The new entry replaces the old one rather than being added next to it.
+      self.assertEqual(len(os.listdir(d.path)), 1)
+      self.assertIsNone(cache.load("test.py", old_key))
+      loaded_code, _ = cache.load("test.py", new_key)
+      self.assertEqual(self._flatten(new_code), self._flatten(loaded_code))
+
+  def test_corrupt_entry(self):
+    with test_utils.Tempdir() as d:
+      cache = code_cache.CodeCache(d.path)
+      key = code_cache.make_key("x = 42", "test.py", self.python_version)
+      cache.store("test.py", key, (self._process("x = 42"), frozenset()))
+      path, = (os.path.join(d.path, name) for name in os.listdir(d.path))
+      with open(path, "wb") as f:
+        f.write(key.encode("ascii") + b"not a cache entry")
+      self.assertIsNone(cache.load("test.py", key))
+
+  def test_make_key(self):
+    key = code_cache.make_key("x = 42", "test.py", (3, 8))
+    self.assertEqual(key, code_cache.make_key("x = 42", "test.py", (3, 8)))
+    self.assertNotEqual(key, code_cache.make_key("x = 43", "test.py", (3, 8)))
+    self.assertNotEqual(key, code_cache.make_key("x = 42", "foo.py", (3, 8)))
+    self.assertNotEqual(key, code_cache.make_key("x = 42", "test.py", (3, 9)))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -292,6 +292,38 @@ PICKLE_OPTIONS = [
         "--precompiled-builtins", action="store",
         dest="precompiled_builtins", default=None,
         help="Use the supplied file as precompiled builtins pyi."),
+    _Arg(
+        "--typeshed-bundle-dir", action="store",
+        dest="typeshed_bundle_dir", default=None,
+        help=("Use a precompiled bundle of builtins, typing and the typeshed "
+              "stdlib from this directory, building it first if needed. The "
+              "bundle is specific to the pytype version, Python version and "
+              "platform, and is mapped into memory, so that concurrent pytype "
+              "processes share a single copy of it. Ignored if "
+              "--precompiled-builtins is given.")),
+    _Arg(
+        "--pickle-index", action="store_true", default=False,
+        dest="pickle_index",
+        help=("Save the pickled ast with an index of its top-level "
+              "definitions, so that --use-pickled-files loads definitions "
+              "only when they are looked up.")),
+    _Arg(
+        "--pickle-compression", action="store",
+        dest="pickle_compression", default=None,
+        choices=["gzip", "lzma", "none", "zlib"],
+        help=("Compress pickled output with this codec. 'none' stores the "
+              "pickle uncompressed with a checksum, 'zlib' is the fastest to "
+              "read and 'lzma' produces the smallest files. Readers detect "
+              "the codec, so pickles written with different codecs can be "
+              "mixed. By default, pickled output is not compressed and "
+              "--generate-builtins output is compressed with gzip.")),
+    _Arg(
+        "--pickle-prefetch-threads", type=int, action="store",
+        dest="pickle_prefetch_threads", default=0,
+        help=("Read and decompress the pickled files in the imports map in "
+              "this many background threads before they are needed. "
+              "Unpickling still happens on demand and in the same order. "
+              "Useful on networked filesystems. 0 disables prefetching.")),
     _Arg(
         "--pickle-metadata", type=str, action="store",
         dest="pickle_metadata", default=None,
@@ -342,6 +374,24 @@ INFRASTRUCTURE_OPTIONS = [
         "--touch", type=str, action="store",
         dest="touch", default=None,
         help="Output file to touch when exit status is ok."),
+    _Arg(
+        "--skip-unchanged-output", action="store_true",
+        dest="skip_unchanged_output", default=False,
+        help=("Do not rewrite an existing output file if the interface it "
+              "describes has not changed, so that build systems can skip "
+              "rebuilding its dependents.")),
+    _Arg(
+        "--function-summaries", action="store_true",
+        dest="function_summaries", default=False,
+        help=("Next to a .pyi output, also write a summary of the argument "
+              "and return types that were observed in calls to the module's "
+              "functions, and use the summaries of imported modules to infer "
+              "more precise return types for calls to their functions.")),
+    _Arg(
+        "--bytecode-cache", type=str, action="store",
+        dest="bytecode_cache", default=None,
+        help=("Directory in which to cache the processed bytecode of analyzed "
+              "files, so that unchanged files are not compiled again.")),
     _Arg(
         "-e", "--enable-only", action="store",
         dest="enable_only", default=None,
@@ -382,6 +432,27 @@ DEBUG_OPTIONS = [
         "--no-skip-calls", action="store_false",
         dest="skip_repeat_calls", default=True,
         help=("Don't reuse the results of previous function calls.")),
+    _Arg(
+        "--call-summary-depth", type=int, action="store",
+        dest="call_summary_depth", default=0,
+        help=("Also reuse the results of previous function calls whose "
+              "arguments have the same types, comparing the type parameters "
+              "of arguments down to the given depth. 0 (the default) only "
+              "reuses calls with identical arguments.")),
+    _Arg(
+        "--function-budget", type=int, action="store",
+        dest="function_budget", default=0,
+        help=("Stop analyzing a function after it has run the given number of "
+              "opcodes, counted over all of its calls, and report an "
+              "analysis-budget-exceeded error. Its return annotation or Any "
+              "is used as its return type from then on. 0 (the default) "
+              "means no budget.")),
+    _Arg(
+        "--profile-opcodes", action="store_true",
+        dest="profile_opcodes", default=False,
+        help=("Record the number of executions, the time and the number of "
+              "bindings created for every opcode and source line in the "
+              "--metrics report. See pytype/scripts/opcode_report.py.")),
     _Arg(
         "-T", "--no-typeshed", action="store_false",
         dest="typeshed", default=None,
@@ -620,6 +691,10 @@ class Postprocessor:
     else:
       self.output_options.check = check
 
+  @uses(["+metrics"])
+  def _store_profile_opcodes(self, profile_opcodes):
+    self.output_options.profile_opcodes = profile_opcodes
+
   @uses(["+output"])
   def _store_pickle_output(self, pickle_output):
     if pickle_output:
@@ -648,11 +723,12 @@ class Postprocessor:
       self.error("Need a filename.")
     self.output_options.generate_builtins = generate_builtins
 
-  @uses(["precompiled_builtins"])
+  @uses(["precompiled_builtins", "typeshed_bundle_dir"])
   def _store_typeshed(self, typeshed):
     if typeshed is not None:
       self.output_options.typeshed = typeshed
-    elif self.output_options.precompiled_builtins:
+    elif (self.output_options.precompiled_builtins or
+          self.output_options.typeshed_bundle_dir):
       # Typeshed is included in the builtins pickle.
       self.output_options.typeshed = False
     else:
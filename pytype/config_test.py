@@ -169,21 +169,32 @@ class PostprocessorTest(unittest.TestCase):
 
   def test_typeshed_default(self):
     input_options = types.SimpleNamespace(
-        typeshed=None, precompiled_builtins=None)
-    self.make({"typeshed", "precompiled_builtins"}, input_options)
+        typeshed=None, precompiled_builtins=None, typeshed_bundle_dir=None)
+    self.make({"typeshed", "precompiled_builtins", "typeshed_bundle_dir"},
+              input_options)
     # We only care that `None` was replaced.
     self.assertIsNotNone(self.output_options.typeshed)
 
   def test_typeshed_with_precompiled_builtins(self):
     input_options = types.SimpleNamespace(
-        typeshed=None, precompiled_builtins="builtins")
-    self.make({"typeshed", "precompiled_builtins"}, input_options)
+        typeshed=None, precompiled_builtins="builtins",
+        typeshed_bundle_dir=None)
+    self.make({"typeshed", "precompiled_builtins", "typeshed_bundle_dir"},
+              input_options)
+    self.assertIs(self.output_options.typeshed, False)
+
+  def test_typeshed_with_bundle_dir(self):
+    input_options = types.SimpleNamespace(
+        typeshed=None, precompiled_builtins=None, typeshed_bundle_dir="cache")
+    self.make({"typeshed", "precompiled_builtins", "typeshed_bundle_dir"},
+              input_options)
     self.assertIs(self.output_options.typeshed, False)
 
   def test_typeshed(self):
     input_options = types.SimpleNamespace(
-        typeshed=False, precompiled_builtins=None)
-    self.make({"typeshed", "precompiled_builtins"}, input_options)
+        typeshed=False, precompiled_builtins=None, typeshed_bundle_dir=None)
+    self.make({"typeshed", "precompiled_builtins", "typeshed_bundle_dir"},
+              input_options)
     self.assertIs(self.output_options.typeshed, False)
 
   def test_enable_only(self):
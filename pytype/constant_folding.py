@@ -23,6 +23,7 @@ This is less uniform, and therefore not recommended to use other than for
 input/output.
 """
 
+import itertools
 from typing import Any, Dict, FrozenSet, Tuple
 
 import attrs
@@ -100,6 +101,62 @@ class _Map:
   elements: Dict[Any, Any]
 
 
+def _extend_list(lst, types, elements, values, op):
+  """Fold the addition of elements to the end of a list.
+
+  Only the first MAX_VAR_SIZE elements and values of a list are tracked, since
+  build_folded_type uses only those and the union of the element types. Huge
+  list literals are built one element at a time, so tracking every element
+  would make folding them quadratic.
+
+  Args:
+    lst: The folded list.
+    types: The types of the new elements.
+    elements: An iterable of the new folded elements.
+    values: An iterable of the values of the new elements.
+    op: The opcode that adds the elements.
+
+  Returns:
+    The folded extended list.
+  """
+  tag, et = lst.typ
+  assert tag == 'list'
+  typ = (tag, et | frozenset(types))
+  n = MAX_VAR_SIZE - len(lst.elements)
+  if n <= 0:
+    return _Constant(typ, lst.value, lst.elements, op)
+  elements = lst.elements + tuple(itertools.islice(elements, n))
+  value = lst.value + list(itertools.islice(values, n))
+  return _Constant(typ, value, elements, op)
+
+
+def _update_map(map_, key_types, value_types, elements, values, op):
+  """Fold the addition of entries to a map.
+
+  As with _extend_list, once a map has MAX_VAR_SIZE entries, we only track the
+  types of new entries.
+
+  Args:
+    map_: The folded map.
+    key_types: The types of the new keys.
+    value_types: The types of the new values.
+    elements: A dict of the new entries, with folded values.
+    values: A dict of the new entries.
+    op: The opcode that adds the entries.
+
+  Returns:
+    The folded updated map.
+  """
+  tag, (kt, vt) = map_.typ
+  assert tag == 'map'
+  typ = (tag, (kt | key_types, vt | value_types))
+  if len(map_.elements) >= MAX_VAR_SIZE:
+    return _Constant(typ, map_.value, map_.elements, op)
+  value = {**map_.value, **values}
+  elements = {**map_.elements, **elements}
+  return _Constant(typ, value, elements, op)
+
+
 class _CollectionBuilder:
   """Build up a collection of constants."""
 
@@ -314,55 +371,41 @@ class _FoldConstants:
           elements = stack.fold_args(2, op)
           if elements:
             lst, element = elements.elements
-            tag, et = lst.typ
-            assert tag == 'list'
-            typ = (tag, et | {element.typ})
-            value = lst.value + [element.value]
-            elements = lst.elements + (element,)
-            stack.push(_Constant(typ, value, elements, op))
+            stack.push(_extend_list(
+                lst, [element.typ], [element], [element.value], op))
         elif isinstance(op, opcodes.LIST_EXTEND):
           elements = stack.fold_args(2, op)
           if elements:
             lst, other = elements.elements
-            tag, et = lst.typ
-            assert tag == 'list'
             other_tag, other_et = other.typ
+            # The folded elements are created lazily, since _extend_list may
+            # not need them all.
             if other_tag == 'tuple':
               # Deconstruct the tuple built in opcodes.LOAD_CONST above
-              other_elts = tuple(_Constant(('prim', e), v, None, other.op)
-                                 for (_, e), v in zip(other_et, other.value))
+              other_elts = (_Constant(('prim', e), v, None, other.op)
+                            for (_, e), v in zip(other_et, other.value))
             elif other_tag == 'prim':
               assert other_et == str
               other_et = {other.typ}
-              other_elts = tuple(_Constant(('prim', str), v, None, other.op)
-                                 for v in other.value)
+              other_elts = (_Constant(('prim', str), v, None, other.op)
+                            for v in other.value)
             else:
               other_elts = other.elements
-            typ = (tag, et | set(other_et))
-            value = lst.value + list(other.value)
-            elements = lst.elements + other_elts
-            stack.push(_Constant(typ, value, elements, op))
+            stack.push(_extend_list(lst, other_et, other_elts, other.value, op))
         elif isinstance(op, opcodes.MAP_ADD):
           elements = stack.fold_args(3, op)
           if elements:
             map_, key, val = elements.elements
-            tag, (kt, vt) = map_.typ
-            assert tag == 'map'
-            typ = (tag, (kt | {key.typ}, vt | {val.typ}))
-            value = {**map_.value, **{key.value: val.value}}
-            elements = {**map_.elements, **{key.value: val}}
-            stack.push(_Constant(typ, value, elements, op))
+            stack.push(_update_map(map_, {key.typ}, {val.typ}, {key.value: val},
+                                   {key.value: val.value}, op))
         elif isinstance(op, opcodes.DICT_UPDATE):
           elements = stack.fold_args(2, op)
           if elements:
             map1, map2 = elements.elements
-            tag1, (kt1, vt1) = map1.typ
             tag2, (kt2, vt2) = map2.typ
-            assert tag1 == tag2 == 'map'
-            typ = (tag1, (kt1 | kt2, vt1 | vt2))
-            value = {**map1.value, **map2.value}
-            elements = {**map1.elements, **map2.elements}
-            stack.push(_Constant(typ, value, elements, op))
+            assert tag2 == 'map'
+            stack.push(
+                _update_map(map1, kt2, vt2, map2.elements, map2.value, op))
         else:
           # If we hit any other bytecode, we are no longer building a literal
           # constant. Insert a None as a sentinel to the next BUILD op to
@@ -219,6 +219,40 @@ class TestFolding(test_base.UnitTest):
     """)
     self.assertCountEqual(actual, [(x, str, "", None) for x in (4, 6, 7)])
 
+  @test_utils.skipBeforePy(
+      (3, 10), "Long literals are built incrementally since 3.10")
+  def test_long_list(self):
+    n = constant_folding.MAX_VAR_SIZE
+    elts = ", ".join(["[1]", "['a']"] * n)
+    [(line, typ, value, elements)] = self._process(f"a = [{elts}]")
+    # Only the first MAX_VAR_SIZE elements are tracked.
+    self.assertEqual(line, 1)
+    self.assertEqual(typ, ("list", (("list", int), ("list", str))))
+    self.assertEqual(value, [[1], ["a"]] * (n // 2))
+    self.assertEqual(elements, [("list", int), ("list", str)] * (n // 2))
+
+  @test_utils.skipBeforePy(
+      (3, 10), "Long literals are built incrementally since 3.10")
+  def test_long_list_of_constants(self):
+    n = constant_folding.MAX_VAR_SIZE
+    elts = ", ".join(["1", "'a'"] * n)
+    [(_, typ, value, elements)] = self._process(f"a = [{elts}]")
+    self.assertEqual(typ, ("list", (int, str)))
+    self.assertEqual(len(value), n)
+    self.assertEqual(len(elements), n)
+
+  @test_utils.skipBeforePy(
+      (3, 10), "Long literals are built incrementally since 3.10")
+  def test_long_map(self):
+    n = constant_folding.MAX_VAR_SIZE
+    elts = ", ".join(f"'k{i}': [{i}]" for i in range(2 * n))
+    folded = self._process("a = {" + elts + ", 'x': ['a']}")
+    _, typ, value, elements = folded[-1]
+    self.assertEqual(typ, ("map", str, (("list", int), ("list", str))))
+    self.assertLess(len(value), 2 * n)
+    self.assertGreaterEqual(len(value), n)
+    self.assertEqual(len(elements), len(value))
+
   def test_type_error(self):
     with self.assertRaises(constant_folding.ConstantError):
       self._process("x = {[1, 2]}")
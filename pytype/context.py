@@ -33,6 +33,7 @@ class Context:
       loader: load_pytd.Loader,
       generate_unknowns: bool = False,
       store_all_calls: bool = False,
+      keep_all_bindings: bool = False,
   ):
     # Inputs
     self.options = options
@@ -43,6 +44,10 @@ class Context:
 
     # Typegraph
     self.program = cfg.Program()
+    if keep_all_bindings:
+      # Keep bindings that are no longer used, e.g., to inspect the whole
+      # typegraph. The C++ typegraph always keeps them.
+      self.program.keep_all_bindings = True
     self.root_node: cfg.CFGNode = self.program.NewCFGNode("root")
     self.program.entrypoint = self.root_node
     # Represents the program exit. Needs to be set before analyze_types.
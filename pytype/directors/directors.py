@@ -23,6 +23,9 @@ log = logging.getLogger(__name__)
 
 SkipFileError = parser.SkipFileError
 parse_src = parser.parse_src
+# Whether parse_src() returns a stdlib ast (as its .ast attribute) that can be
+# shared with preprocessing and compilation.
+PARSES_TO_AST = sys.version_info[:2] >= (3, 9)
 
 _ALL_ERRORS = "*"  # Wildcard for disabling all errors.
 
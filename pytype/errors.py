@@ -1184,6 +1184,13 @@ class ErrorLog(ErrorLogBase):
   def recursion_error(self, stack, name):
     self.error(stack, f"Detected recursion in {name}", keyword=name)
 
+  @_error_name("analysis-budget-exceeded")
+  def analysis_budget_exceeded(self, stack, name, budget, lineno):
+    details = (f"Stopped after {budget} opcodes; calls to {name} return its "
+               "return annotation or Any. See --function-budget.")
+    self.error(stack, f"Analysis of {name} exceeded its budget",
+               details=details, keyword=name, lineno=lineno)
+
   @_error_name("redundant-function-type-comment")
   def redundant_function_type_comment(self, filename, lineno):
     self._add(Error(
@@ -2,8 +2,11 @@
 
 import contextlib
 import errno
+import hashlib
 import os
 import sys
+import uuid
+from typing import Optional
 
 from pytype.platform_utils import path_utils
 
@@ -64,6 +67,37 @@ def cd(path):
     os.chdir(curdir)
 
 
+@contextlib.contextmanager
+def atomic_write(path):
+  """Context manager. Write a file under a temporary name, then rename it.
+
+  Readers, such as concurrent pytype processes, never see a partially written
+  file. If the body raises, the temporary file is removed and path is left
+  untouched.
+
+  Example usage:
+    with atomic_write("/path/to/file") as tmp:
+      with open(tmp, "w") as f:
+        ...
+
+  Arguments:
+    path: The file to write.
+  Yields:
+    The name of a temporary file, in the same directory as path.
+  """
+  # The file is created by the caller, so it gets the usual permissions.
+  tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+  try:
+    yield tmp
+    os.replace(tmp, path)
+  except BaseException:
+    try:
+      os.unlink(tmp)
+    except OSError:
+      pass
+    raise
+
+
 def is_pyi_directory_init(filename):
   """Checks if a pyi file is path/to/dir/__init__.pyi."""
   if filename is None:
@@ -76,6 +110,15 @@ def is_pickle(filename):
   return path_utils.splitext(filename)[1].startswith(PICKLE_EXT)
 
 
+def hash_file(path) -> Optional[str]:
+  """Get the sha256 hex digest of a file's contents, or None if unreadable."""
+  try:
+    with open(path, "rb") as f:
+      return hashlib.sha256(f.read()).hexdigest()
+  except OSError:
+    return None
+
+
 def expand_path(path, cwd=None):
   """Fully expand a path, optionally with an explicit cwd."""
 
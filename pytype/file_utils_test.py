@@ -1,5 +1,7 @@
 """Tests for file_utils.py."""
 
+import os
+
 from pytype import file_utils
 from pytype.platform_utils import path_utils
 from pytype.tests import test_utils
@@ -76,6 +78,40 @@ class FileUtilsTest(unittest.TestCase):
     with file_utils.cd(""):
       self.assertEqual(path_utils.getcwd(), d)
 
+  def test_hash_file(self):
+    with test_utils.Tempdir() as d:
+      foo = d.create_file("foo.txt", "data")
+      bar = d.create_file("bar.txt", "data")
+      self.assertEqual(file_utils.hash_file(foo), file_utils.hash_file(bar))
+      d.create_file("bar.txt", "other")
+      self.assertNotEqual(file_utils.hash_file(foo), file_utils.hash_file(bar))
+      self.assertIsNone(
+          file_utils.hash_file(path_utils.join(d.path, "baz.txt")))
+
+  def test_atomic_write(self):
+    with test_utils.Tempdir() as d:
+      path = d.create_file("foo.txt", "old")
+      with file_utils.atomic_write(path) as tmp:
+        with open(tmp, "w") as f:
+          f.write("new")
+        with open(path) as f:
+          self.assertEqual(f.read(), "old")
+      with open(path) as f:
+        self.assertEqual(f.read(), "new")
+      self.assertEqual(os.listdir(d.path), ["foo.txt"])
+
+  def test_atomic_write_error(self):
+    with test_utils.Tempdir() as d:
+      path = d.create_file("foo.txt", "old")
+      with self.assertRaises(ValueError):
+        with file_utils.atomic_write(path) as tmp:
+          with open(tmp, "w") as f:
+            f.write("new")
+          raise ValueError()
+      with open(path) as f:
+        self.assertEqual(f.read(), "old")
+      self.assertEqual(os.listdir(d.path), ["foo.txt"])
+
 
 class TestPathExpansion(unittest.TestCase):
   """Tests for file_utils.expand_path(s?)."""
@@ -0,0 +1,74 @@
+"""Summaries of the calls to a module's functions that pytype observed.
+
+With --function-summaries, pytype writes a summary next to a .pyi output. A
+summary is itself a pyi file. For each top-level function that was called with
+known argument types while analyzing the module, it has one signature per
+combination of argument types that was seen, with the return type that pytype
+inferred for it. Constant arguments are recorded as Literal types, and
+parameters that were filled in with their defaults are left out. When a module
+with a summary is imported, the summary's signatures are tried before the ones
+in the module's pyi, so that calls whose arguments match one of them get the
+more precise return type.
+"""
+
+import logging
+
+from pytype.pytd import pytd
+
+log = logging.getLogger(__name__)
+
+SUFFIX = ".summary"
+
+
+def get_summary_path(filename: str) -> str:
+  """Get the path of the summary that belongs to the given pyi file."""
+  return filename + SUFFIX
+
+
+def _param_names(sig: pytd.Signature):
+  return tuple(p.name for p in sig.params)
+
+
+def _is_subsequence(names, all_names) -> bool:
+  it = iter(all_names)
+  return all(name in it for name in names)
+
+
+def _can_merge(func: pytd.Function, summary: pytd.Function) -> bool:
+  if func.kind != summary.kind or func.is_coroutine:
+    return False
+  # The summary was recorded for a function of the same name. Make sure that
+  # this is still the function the module exports under that name, rather
+  # than, e.g., the result of a decorator. Parameters that were filled in with
+  # their defaults are left out of summary signatures.
+  param_names = {_param_names(sig) for sig in func.signatures}
+  return all(any(_is_subsequence(_param_names(sig), names)
+                 for names in param_names)
+             for sig in summary.signatures)
+
+
+def merge(ast: pytd.TypeDeclUnit,
+          summary: pytd.TypeDeclUnit) -> pytd.TypeDeclUnit:
+  """Add the signatures from a summary to the functions of a module.
+
+  Args:
+    ast: The module's (unresolved) pytd AST.
+    summary: The module's summary, parsed with the same module name.
+
+  Returns:
+    The AST, with each function's summary signatures in front of its own.
+  """
+  summaries = {f.name: f for f in summary.functions}
+  if not summaries:
+    return ast
+  functions = []
+  for func in ast.functions:
+    func_summary = summaries.get(func.name)
+    if func_summary and _can_merge(func, func_summary):
+      func = func.Replace(
+          signatures=func_summary.signatures + func.signatures)
+    elif func_summary:
+      log.info("Ignoring the summary of %s, whose signature has changed",
+               func.name)
+    functions.append(func)
+  return ast.Replace(functions=tuple(functions))
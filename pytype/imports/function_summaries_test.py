@@ -0,0 +1,76 @@
+"""Tests for function_summaries.py."""
+
+import textwrap
+
+from pytype.imports import function_summaries
+from pytype.pyi import parser
+from pytype.pytd import pytd_utils
+
+import unittest
+
+
+class MergeTest(unittest.TestCase):
+  """Test merging summaries into module ASTs."""
+
+  def _merge(self, src, summary_src):
+    ast = parser.parse_string(textwrap.dedent(src), name="foo")
+    summary = parser.parse_string(textwrap.dedent(summary_src), name="foo")
+    return pytd_utils.Print(function_summaries.merge(ast, summary))
+
+  def test_merge(self):
+    merged = self._merge("""
+      from typing import Any
+      def f(x, y = ...) -> Any: ...
+      def g(x) -> Any: ...
+    """, """
+      def f(x: int, y: str = ...) -> int: ...
+      def f(x: str, y: str = ...) -> str: ...
+    """)
+    self.assertMultiLineEqual(merged, textwrap.dedent("""
+      from typing import Any, overload
+
+      @overload
+      def foo.f(x: int, y: str = ...) -> int: ...
+      @overload
+      def foo.f(x: str, y: str = ...) -> str: ...
+      @overload
+      def foo.f(x, y = ...) -> Any: ...
+      def foo.g(x) -> Any: ...
+    """).strip())
+
+  def test_merge_without_defaults(self):
+    merged = self._merge("""
+      from typing import Any
+      def f(x, y = ..., z = ...) -> Any: ...
+    """, """
+      def f(x: int, *, z: str) -> int: ...
+    """)
+    self.assertMultiLineEqual(merged, textwrap.dedent("""
+      from typing import Any, overload
+
+      @overload
+      def foo.f(x: int, *, z: str) -> int: ...
+      @overload
+      def foo.f(x, y = ..., z = ...) -> Any: ...
+    """).strip())
+
+  def test_changed_parameters(self):
+    merged = self._merge("""
+      from typing import Any
+      def f(y) -> Any: ...
+    """, """
+      def f(x: int) -> int: ...
+    """)
+    self.assertMultiLineEqual(merged, textwrap.dedent("""
+      from typing import Any
+
+      def foo.f(y) -> Any: ...
+    """).strip())
+
+  def test_summary_path(self):
+    self.assertEqual(function_summaries.get_summary_path("foo/bar.pyi"),
+                     "foo/bar.pyi.summary")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -1,12 +1,14 @@
 """Load module type information from the filesystem."""
 
+import concurrent.futures
 import logging
 
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from pytype import config
 from pytype import file_utils
 from pytype.imports import base
+from pytype.imports import function_summaries
 from pytype.imports import pickle_utils
 from pytype.platform_utils import path_utils
 from pytype.pyi import parser
@@ -78,12 +80,57 @@ class _PathFinder:
       return None
 
 
+class _PicklePrefetcher:
+  """Read pickled files in background threads before they are needed.
+
+  Only the reading and decompression is done in the background; unpickling
+  holds the GIL, so it is left to the loader, which keeps the order in which
+  modules are resolved and the errors that are raised unchanged.
+  """
+
+  def __init__(self, options: config.Options):
+    self.options = options
+    self._pending: Optional[Dict[str, concurrent.futures.Future]] = None
+
+  def _start(self):
+    """Start reading every pickled file in the imports map."""
+    self._pending = {}
+    filenames = [f for f in dict.fromkeys(self.options.imports_map.values())
+                 if file_utils.is_pickle(f)]
+    if not filenames:
+      return
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=self.options.pickle_prefetch_threads,
+        thread_name_prefix="pickle-prefetch")
+    for filename in filenames:
+      self._pending[filename] = executor.submit(
+          pickle_utils.ReadPickle, filename,
+          open_function=self.options.open_function)
+    # The submitted reads still run to completion.
+    executor.shutdown(wait=False)
+
+  def read(self, filename: str):
+    """Get the contents of a pickled file, reading it now if not prefetched."""
+    if self._pending is None:
+      self._start()
+    future = self._pending.pop(filename, None)
+    if future is None:
+      return pickle_utils.ReadPickle(
+          filename, open_function=self.options.open_function)
+    # Any error reading the file is raised here, as if it was read now.
+    return future.result()
+
+
 class ModuleLoader(base.ModuleLoader):
   """Find and read module type information."""
 
   def __init__(self, options: config.Options):
     self.options = options
     self._path_finder = _PathFinder(options)
+    if options.pickle_prefetch_threads and options.imports_map is not None:
+      self._prefetcher = _PicklePrefetcher(options)
+    else:
+      self._prefetcher = None
 
   def find_import(self, module_name: str) -> Optional[base.ModuleInfo]:
     """See if the loader can find a file to import for the module."""
@@ -98,10 +145,31 @@ class ModuleLoader(base.ModuleLoader):
       mod_ast = parser.parse_string(
           f.read(), filename=mod_info.filename, name=mod_info.module_name,
           options=parser.PyiOptions.from_toplevel_options(self.options))
+    if self.options.function_summaries:
+      mod_ast = self._add_function_summary(mod_info, mod_ast)
     return mod_ast
 
+  def _add_function_summary(self, mod_info: base.ModuleInfo, mod_ast):
+    """Merge the function summary next to a pyi file, if any, into its AST."""
+    filename = function_summaries.get_summary_path(mod_info.filename)
+    if not path_utils.isfile(filename):
+      return mod_ast
+    # A summary only makes inference more precise, so a bad one is not fatal.
+    try:
+      with self.options.open_function(filename, "r") as f:
+        summary = parser.parse_string(
+            f.read(), filename=filename, name=mod_info.module_name,
+            options=parser.PyiOptions.from_toplevel_options(self.options))
+    except (OSError, parser.ParseError) as e:
+      log.warning("Ignoring function summary %s: %s", filename, e)
+      return mod_ast
+    return function_summaries.merge(mod_ast, summary)
+
   def _load_pickle(self, mod_info: base.ModuleInfo):
     """Load and unpickle a serialized pytd AST."""
+    if self._prefetcher:
+      return pickle_utils.LoadPickleData(
+          self._prefetcher.read(mod_info.filename), mod_info.filename)
     return pickle_utils.LoadPickle(
         mod_info.filename, open_function=self.options.open_function)
 
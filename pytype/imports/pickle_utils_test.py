@@ -1,6 +1,11 @@
 """Tests for pickle_utils.py."""
 
+import textwrap
+
 from pytype.imports import pickle_utils
+from pytype.pyi import parser
+from pytype.pytd import pytd_utils
+from pytype.pytd import serialize_ast
 from pytype.tests import test_base
 from pytype.tests import test_utils
 
@@ -21,9 +26,71 @@ class TestPickle(test_base.UnitTest):
     with test_utils.Tempdir() as d:
       filename = d.create_file("foo.pickle.gz")
       pickle_utils.SavePickle(d1, filename, compress=True)
-      d2 = pickle_utils.LoadPickle(filename, compress=True)
+      d2 = pickle_utils.LoadPickle(filename)
     self.assertEqual(d1, d2)
 
+  def test_compression_codecs(self):
+    d1 = {1, 2j, "3"}
+    with test_utils.Tempdir() as d:
+      for codec in pickle_utils.COMPRESSION_CODECS:
+        with self.subTest(codec=codec):
+          filename = d.create_file(f"foo.pickle.{codec}")
+          pickle_utils.SavePickle(d1, filename, compression=codec)
+          d2 = pickle_utils.LoadPickle(filename)
+          self.assertEqual(d1, d2)
+
+  def test_checksum_mismatch(self):
+    with test_utils.Tempdir() as d:
+      filename = d.create_file("foo.pickle")
+      data = pickle_utils.SavePickle({1, 2}, compression="none")
+      with open(filename, "wb") as f:
+        f.write(data[:-1] + bytes([data[-1] ^ 1]))
+      with self.assertRaises(pickle_utils.LoadPickleError):
+        pickle_utils.LoadPickle(filename)
+
+  def test_load_bundle(self):
+    items = [("foo", b"abc"), ("bar", b""), ("baz", b"de")]
+    with test_utils.Tempdir() as d:
+      filename = d.create_file("foo.bundle")
+      pickle_utils.SaveBundle(items, filename)
+      loaded = pickle_utils.LoadBundle(filename)
+      self.assertEqual([(name, bytes(data)) for name, data in loaded], items)
+
+  def test_load_bundle_not_a_bundle(self):
+    with test_utils.Tempdir() as d:
+      filename = d.create_file("foo.pickle")
+      pickle_utils.SavePickle({1, 2}, filename, compress=True)
+      self.assertIsNone(pickle_utils.LoadBundle(filename))
+
+  def test_load_indexed_ast(self):
+    ast = parser.parse_string(textwrap.dedent("""
+      from typing import TypeVar
+      T = TypeVar("T")
+      x: int
+      class A:
+        def f(self, x: T) -> T: ...
+      def g() -> A: ...
+    """), name="foo")
+    with test_utils.Tempdir() as d:
+      filename = d.create_file("foo.pickled")
+      pickle_utils.StoreAst(ast, filename, src_path="foo.py", indexed=True)
+      loaded = pickle_utils.LoadPickle(filename)
+    self.assertIsInstance(loaded, serialize_ast.SerializableAst)
+    self.assertEqual(loaded.src_path, "foo.py")
+    self.assertEqual(loaded.ast.Lookup("foo.x").name, "foo.x")
+    self.assertIsNone(loaded.ast.Get("foo.y"))
+    self.assertMultiLineEqual(pytd_utils.Print(loaded.ast),
+                              pytd_utils.Print(ast))
+
+  def test_load_compressed_indexed_ast(self):
+    ast = parser.parse_string("x: int\ndef f() -> str: ...", name="foo")
+    with test_utils.Tempdir() as d:
+      filename = d.create_file("foo.pickled")
+      pickle_utils.StoreAst(ast, filename, indexed=True, compression="zlib")
+      loaded = pickle_utils.LoadPickle(filename)
+    self.assertMultiLineEqual(pytd_utils.Print(loaded.ast),
+                              pytd_utils.Print(ast))
+
 
 if __name__ == "__main__":
   test_base.main()
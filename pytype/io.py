@@ -21,6 +21,7 @@ from pytype import load_pytd
 from pytype import utils
 from pytype.directors import directors
 from pytype.imports import builtin_stubs as pytd_builtins
+from pytype.imports import function_summaries
 from pytype.imports import pickle_utils
 from pytype.pyc import pyc
 from pytype.pyi import parser
@@ -141,6 +142,20 @@ def generate_pyi(src, options=None, loader=None, ctx=None):
   return ret.errorlog, result, mod
 
 
+def generate_function_summary(ctx):
+  """Print the function summary of an analyzed module.
+
+  Args:
+    ctx: The context the module was analyzed in.
+
+  Returns:
+    The summary, in pyi format. See pytype.imports.function_summaries.
+  """
+  mod = pytd_utils.WrapTypeDeclUnit(
+      "summary", ctx.vm.pytd_functions_for_summaries())
+  return pytd_utils.Print(pytd_utils.CanonicalOrdering(mod)) + "\n"
+
+
 @_set_verbosity_from(posarg=0)
 def check_or_generate_pyi(options, loader=None, ctx=None) -> AnalysisResult:
   """Returns results from running pytype.
@@ -199,29 +214,59 @@ def check_or_generate_pyi(options, loader=None, ctx=None) -> AnalysisResult:
   return AnalysisResult(options, loader, ctx, errorlog, result, ast)
 
 
-def _write_pyi_output(options, contents, filename):
+def _is_unchanged_pyi(options, contents, filename):
+  """Whether filename already holds the given pyi contents."""
+  try:
+    with options.open_function(filename) as fi:
+      return fi.read() == contents
+  except OSError:
+    return False
+
+
+def _is_unchanged_pickle(options, serializable_ast):
+  """Whether options.output already holds an equivalent pickled ast."""
+  try:
+    old = pickle_utils.LoadPickle(
+        options.output, open_function=options.open_function)
+  except (OSError, pickle_utils.LoadPickleError):
+    return False
+  return (isinstance(old, serialize_ast.SerializableAst) and
+          old.fingerprint is not None and
+          old.fingerprint == serializable_ast.fingerprint and
+          old.src_path == serializable_ast.src_path and
+          old.metadata == serializable_ast.metadata)
+
+
+def _write_pyi_output(options, contents, filename, force=False):
+  """Write a pyi file, returning whether its contents changed."""
   assert filename
   if filename == "-":
     sys.stdout.write(contents)
-  else:
-    log.info("write pyi %r => %r", options.input, filename)
-    with options.open_function(filename, "w") as fi:
-      fi.write(contents)
+    return True
+  if (options.skip_unchanged_output and not force and
+      _is_unchanged_pyi(options, contents, filename)):
+    log.info("pyi %r is unchanged, not rewriting it", filename)
+    return False
+  log.info("write pyi %r => %r", options.input, filename)
+  with options.open_function(filename, "w") as fi:
+    fi.write(contents)
+  return True
 
 
 @_set_verbosity_from(posarg=0)
-def process_one_file(options):
+def process_one_file(options, loader=None):
   """Check a .py file or generate a .pyi for it, according to options.
 
   Args:
     options: config.Options object.
+    loader: Optionally, a load_pytd.Loader instance.
 
   Returns:
     An error code (0 means no error).
   """
 
   log.info("Process %s => %s", options.input, options.output)
-  loader = load_pytd.create_loader(options)
+  loader = loader or load_pytd.create_loader(options)
   try:
     ret = check_or_generate_pyi(options, loader)
   except utils.UsageError:
@@ -233,13 +278,25 @@ def process_one_file(options):
       pyi_output = options.verify_pickle
     else:
       pyi_output = options.output
+    changed = False
+    # Write out the function summary. Dependents use it like the pyi file, so
+    # if it changed, the pyi file is rewritten to mark them out of date.
+    if (options.function_summaries and not options.pickle_output and
+        pyi_output and pyi_output != "-"):
+      changed = _write_pyi_output(
+          options, generate_function_summary(ret.context),
+          function_summaries.get_summary_path(pyi_output))
     # Write out the pyi file.
     if pyi_output:
-      _write_pyi_output(options, ret.pyi, pyi_output)
+      changed = _write_pyi_output(
+          options, ret.pyi, pyi_output, force=changed)
     # Write out the pickle file.
     if options.pickle_output:
       log.info("write pickle %r => %r", options.input, options.output)
-      write_pickle(ret.ast, options, loader)
+      changed = write_pickle(ret.ast, options, loader)
+    if options.skip_unchanged_output:
+      log.info("Interface of %s %s", options.input,
+               "changed" if changed else "is unchanged")
   exit_status = handle_errors(ret.errorlog, options)
 
   # Touch output file upon success.
@@ -251,7 +308,17 @@ def process_one_file(options):
 
 @_set_verbosity_from(posarg=1)
 def write_pickle(ast, options, loader=None):
-  """Dump a pickle of the ast to a file."""
+  """Dump a pickle of the ast to a file.
+
+  Args:
+    ast: The pytd.TypeDeclUnit to pickle.
+    options: config.Options object.
+    loader: A load_pytd.Loader instance.
+
+  Returns:
+    Whether the output was written. With --skip-unchanged-output, an existing
+    pickle of an identical interface is left untouched.
+  """
   loader = loader or load_pytd.create_loader(options)
   try:
     ast = serialize_ast.PrepareForExport(options.module_name, ast, loader)
@@ -269,9 +336,22 @@ def write_pickle(ast, options, loader=None):
     ast2 = ast2.Visit(visitors.ClearClassPointers())
     if not pytd_utils.ASTeq(ast1, ast2):
       raise AssertionError()
-  pickle_utils.StoreAst(ast, options.output, options.open_function,
-                        src_path=options.input,
-                        metadata=options.pickle_metadata)
+  serializable_ast = serialize_ast.SerializeAst(
+      ast, src_path=options.input, metadata=options.pickle_metadata,
+      fingerprint=options.skip_unchanged_output)
+  if (options.skip_unchanged_output and
+      _is_unchanged_pickle(options, serializable_ast)):
+    log.info("pickle %r is unchanged, not rewriting it", options.output)
+    return False
+  if options.pickle_index:
+    pickle_utils.SaveIndexedAst(serializable_ast, options.output,
+                                open_function=options.open_function,
+                                compression=options.pickle_compression)
+  else:
+    pickle_utils.SavePickle(serializable_ast, options.output,
+                            open_function=options.open_function,
+                            compression=options.pickle_compression)
+  return True
 
 
 def print_error_doc_url(errorlog):
@@ -2,6 +2,7 @@
 
 import contextlib
 import io as builtins_io
+import os
 import sys
 import textwrap
 import traceback
@@ -11,6 +12,7 @@ from pytype import io
 from pytype.platform_utils import path_utils
 from pytype.platform_utils import tempfile as compatible_tempfile
 from pytype.pytd import pytd
+from pytype.tests import test_utils
 
 import unittest
 
@@ -135,6 +137,90 @@ class IOTest(unittest.TestCase):
         output="/dev/null" if sys.platform != "win32" else "NUL")
     io.write_pickle(ast, options)  # just make sure we don't crash
 
+  def _process_with_unchanged_output(self, src1, src2, ext, **kwargs):
+    """Process two versions of a file, returning whether the output changed."""
+    with test_utils.Tempdir() as d:
+      src = d.create_file("foo.py", src1)
+      output = path_utils.join(d.path, "foo" + ext)
+      options = config.Options.create(
+          src, output=output, module_name="foo", skip_unchanged_output=True,
+          **kwargs)
+      self.assertEqual(io.process_one_file(options), 0)
+      # Make any rewrite of the output visible in its modification time.
+      os.utime(output, (0, 0))
+      d.create_file("foo.py", src2)
+      self.assertEqual(io.process_one_file(options), 0)
+      return os.stat(output).st_mtime != 0
+
+  def test_skip_unchanged_pyi(self):
+    self.assertFalse(self._process_with_unchanged_output(
+        "x = 0", "x = 1  # a different value", ".pyi"))
+
+  def test_rewrite_changed_pyi(self):
+    self.assertTrue(self._process_with_unchanged_output(
+        "x = 0", "x = ''", ".pyi"))
+
+  def test_skip_unchanged_pickle(self):
+    self.assertFalse(self._process_with_unchanged_output(
+        "def f(): return 0", "def f():\n  return 42", ".pickled",
+        pickle_output=True))
+
+  def test_rewrite_changed_pickle(self):
+    self.assertTrue(self._process_with_unchanged_output(
+        "def f(): return 0", "def f(): return ''", ".pickled",
+        pickle_output=True))
+
+  def test_write_function_summary(self):
+    with test_utils.Tempdir() as d:
+      src = d.create_file("foo.py", textwrap.dedent("""
+        def f(x):
+          return x + 1
+        def g(*args):
+          return args
+        f(0)
+        g(0)
+      """))
+      output = path_utils.join(d.path, "foo.pyi")
+      options = config.Options.create(
+          src, output=output, module_name="foo", function_summaries=True)
+      self.assertEqual(io.process_one_file(options), 0)
+      with open(output + ".summary") as f:
+        summary = f.read()
+    self.assertEqual(summary, textwrap.dedent("""
+      from typing import Literal
+
+      def f(x: Literal[0]) -> int: ...
+    """).lstrip())
+
+  def test_function_summary_with_defaults(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("a.py", textwrap.dedent("""
+        def f(x, flag=False):
+          return [x] if flag else None
+        f(1)
+      """))
+      options = config.Options.create(
+          path_utils.join(d.path, "a.py"),
+          output=path_utils.join(d.path, "a.pyi"), module_name="a",
+          function_summaries=True)
+      self.assertEqual(io.process_one_file(options), 0)
+      src = d.create_file("b.py", textwrap.dedent("""
+        import a
+        x = a.f(1, True)
+      """))
+      output = path_utils.join(d.path, "b.pyi")
+      options = config.Options.create(
+          src, output=output, module_name="b", pythonpath=d.path,
+          function_summaries=True)
+      self.assertEqual(io.process_one_file(options), 0)
+      with open(output) as f:
+        self.assertIn("x: Optional[List[int]]", f.read())
+
+  def test_rewrite_pyi_with_changed_summary(self):
+    self.assertTrue(self._process_with_unchanged_output(
+        "def f(x): return x\nf(0)", "def f(x): return x\nf('')", ".pyi",
+        function_summaries=True))
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -1,14 +1,18 @@
 """Load and link .pyi files."""
 
 import dataclasses
+import hashlib
 import logging
 import os
 import pickle
 
 from typing import Dict, Iterable, List, Optional
 
+from pytype import __version__
+from pytype import config
 from pytype import file_utils
 from pytype import module_utils
+from pytype import utils
 from pytype.imports import base as imports_base
 from pytype.imports import builtin_stubs
 from pytype.imports import module_loader
@@ -36,12 +40,62 @@ def create_loader(options, missing_modules=()):
   if options.precompiled_builtins:
     return PickledPyiLoader.load_from_pickle(
         options.precompiled_builtins, options, missing_modules)
+  elif options.typeshed_bundle_dir:
+    return PickledPyiLoader.load_from_pickle(
+        get_typeshed_bundle(options), options, missing_modules)
   elif options.use_pickled_files:
     return PickledPyiLoader(options, missing_modules=missing_modules)
   else:
     return Loader(options, missing_modules=missing_modules)
 
 
+def create_stdlib_loader(options):
+  """Create a loader with builtins and the typeshed stdlib loaded."""
+  loader = create_loader(options)
+  t = typeshed.Typeshed()
+  module_names = t.get_all_module_names(options.python_version)
+  blacklist = set(t.blacklisted_modules())
+  for m in sorted(module_names):
+    if m not in blacklist:
+      loader.import_name(m)
+  return loader
+
+
+def get_typeshed_bundle(options):
+  """Get the typeshed bundle for options, building it if it does not exist.
+
+  The bundle contains builtins, typing and the typeshed stdlib. Its name
+  depends on everything that affects its contents, so a single directory can
+  hold bundles for several pytype versions, Python versions and platforms.
+
+  Args:
+    options: config.Options object.
+
+  Returns:
+    The filename of the bundle.
+  """
+  # The stubs come with pytype unless TYPESHED_HOME points to another typeshed.
+  key = "\0".join((__version__.__version__, os.getenv("TYPESHED_HOME", ""),
+                   utils.format_version(options.python_version),
+                   options.platform))
+  digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+  filename = path_utils.join(
+      options.typeshed_bundle_dir, f"typeshed-{digest}.bundle")
+  if path_utils.exists(filename):
+    return filename
+  log.info("Building typeshed bundle %s", filename)
+  file_utils.makedirs(options.typeshed_bundle_dir)
+  bundle_options = config.Options.create(
+      python_version=options.python_version, platform=options.platform,
+      open_function=options.open_function)
+  # Like --generate-builtins, load only the stubs that come with pytype.
+  bundle_options.tweak(pythonpath=[])
+  with file_utils.atomic_write(filename) as tmp_filename:
+    create_stdlib_loader(bundle_options).save_to_pickle(
+        tmp_filename, bundle=True)
+  return filename
+
+
 def _is_package(filename):
   if filename == os.devnull:
     # imports_map_loader adds os.devnull entries for __init__.py files in
@@ -336,8 +390,15 @@ class Loader:
     return builtin_stubs.GetDefaultAst(
         parser.PyiOptions.from_toplevel_options(self.options))
 
-  def save_to_pickle(self, filename):
-    """Save to a pickle. See PickledPyiLoader.load_from_pickle for reverse."""
+  def save_to_pickle(self, filename, bundle=False):
+    """Save to a pickle. See PickledPyiLoader.load_from_pickle for reverse.
+
+    Args:
+      filename: The output filename.
+      bundle: Whether to save an uncompressed bundle that can be mapped into
+        memory instead of a compressed pickle. The pickle is compressed with
+        --pickle-compression if it is given, and with gzip otherwise.
+    """
     # We assume that the Loader is in a consistent state here. In particular, we
     # assume that for every module in _modules, all the transitive dependencies
     # have been loaded.
@@ -353,8 +414,13 @@ class Loader:
     builtin_stubs.InvalidateCache()
     # Now pickle the pickles. We keep the "inner" modules as pickles as a
     # performance optimization - unpickling is slow.
-    pickle_utils.SavePickle(items, filename, compress=True,
-                            open_function=self.options.open_function)
+    if bundle:
+      pickle_utils.SaveBundle(items, filename,
+                              open_function=self.options.open_function)
+    else:
+      pickle_utils.SavePickle(
+          items, filename, open_function=self.options.open_function,
+          compression=self.options.pickle_compression or "gzip")
 
   def _resolve_external_and_local_types(self, mod_ast, lookup_ast=None):
     dependencies = self._resolver.collect_dependencies(mod_ast)
@@ -701,6 +767,31 @@ class Loader:
     """Gets a name -> ResolvedModule map of the loader's resolved modules."""
     return self._modules.get_resolved_modules()
 
+  def get_reusable_modules(self) -> Dict[str, Module]:
+    """Gets the fully loaded and resolved modules, except builtins and typing.
+
+    The modules can be passed to add_reusable_modules() of a later loader that
+    uses the same builtins and finds the same files for them.
+
+    Returns:
+      A name -> Module map.
+    """
+    return {name: Module(name, module.filename, module.ast,
+                         metadata=module.metadata,
+                         has_unresolved_pointers=False)
+            for name, module in self._modules.items()
+            if name not in ("builtins", "typing") and module.ast and
+            not module.needs_unpickling() and
+            not module.has_unresolved_pointers}
+
+  def add_reusable_modules(self, modules: Dict[str, Module]):
+    """Adds modules returned by get_reusable_modules() of another loader."""
+    for name, module in modules.items():
+      self._modules[name] = Module(name, module.filename, module.ast,
+                                   metadata=module.metadata,
+                                   has_unresolved_pointers=False)
+    self._modules.invalidate_concatenated()
+
   def lookup_builtin(self, name):
     found = self.builtins.Get(name)
     return found if found is not None else self.typing.Lookup(name)
@@ -711,9 +802,12 @@ class PickledPyiLoader(Loader):
 
   @classmethod
   def load_from_pickle(cls, filename, options, missing_modules=()):
-    """Load a pytd module from a pickle file."""
-    items = pickle_utils.LoadPickle(filename, compress=True,
+    """Load a pytd module from a pickle file or bundle."""
+    items = pickle_utils.LoadBundle(filename,
                                     open_function=options.open_function)
+    if items is None:
+      items = pickle_utils.LoadPickle(filename,
+                                      open_function=options.open_function)
     modules = {
         name: Module(name, filename=None, ast=None, pickle=pickle,
                      has_unresolved_pointers=False)
@@ -722,11 +722,12 @@ class PickledPyiLoaderTest(test_base.UnitTest):
     return loader, loader.load_file(
         module.module_name, self._get_path(tempdir, module.file_name))
 
-  def _pickle_modules(self, loader, tempdir, *modules):
+  def _pickle_modules(self, loader, tempdir, *modules, indexed=False):
     for module in modules:
       pickle_utils.StoreAst(
           loader._modules[module.module_name].ast,
-          self._get_path(tempdir, module.file_name + ".pickled"))
+          self._get_path(tempdir, module.file_name + ".pickled"),
+          indexed=indexed)
 
   def _load_pickled_module(self, tempdir, module):
     pickle_loader = load_pytd.PickledPyiLoader(config.Options.create(
@@ -734,6 +735,14 @@ class PickledPyiLoaderTest(test_base.UnitTest):
     return pickle_loader.load_file(
         module.module_name, self._get_path(tempdir, module.file_name))
 
+  def _load_indexed_module(self, tempdir, module):
+    pickle_loader = load_pytd.PickledPyiLoader(config.Options.create(
+        python_version=self.python_version, pythonpath=tempdir.path,
+        use_pickled_files=True))
+    return pickle_loader.load_file(
+        module.module_name,
+        self._get_path(tempdir, module.file_name + ".pickled"))
+
   def test_load_with_same_module_name(self):
     with test_utils.Tempdir() as d:
       self._create_files(tempdir=d)
@@ -751,6 +760,70 @@ class PickledPyiLoaderTest(test_base.UnitTest):
       self.assertTrue(pytd_utils.ASTeq(ast, loaded_ast))
       loaded_ast.Visit(visitors.VerifyLookup())
 
+  def test_load_indexed(self):
+    with test_utils.Tempdir() as d:
+      self._create_files(tempdir=d)
+      module1 = _Module(module_name="foo.bar.module1", file_name="module1.pyi")
+      module2 = _Module(module_name="module2", file_name="module2.pyi")
+      loader, ast = self._load_ast(tempdir=d, module=module1)
+      self._pickle_modules(loader, d, module1, module2, indexed=True)
+      loaded_ast = self._load_indexed_module(d, module1)
+      self.assertMultiLineEqual(
+          pytd_utils.Print(pytd_utils.CanonicalOrdering(ast)),
+          pytd_utils.Print(loaded_ast))
+      loaded_ast.Visit(visitors.VerifyLookup())
+
+  def test_indexed_lazy_lookup(self):
+    with test_utils.Tempdir() as d:
+      self._create_files(tempdir=d)
+      module1 = _Module(module_name="foo.bar.module1", file_name="module1.pyi")
+      module2 = _Module(module_name="module2", file_name="module2.pyi")
+      loader, _ = self._load_ast(tempdir=d, module=module1)
+      self._pickle_modules(loader, d, module1, module2, indexed=True)
+      loaded_ast = self._load_indexed_module(d, module1)
+      cls = loaded_ast.Lookup("foo.bar.module1.SomeClass")
+      # The definition is resolved without loading the rest of the module.
+      self.assertIn("_lazy_definitions", vars(loaded_ast))
+      cls.Visit(visitors.VerifyLookup())
+      (init,) = cls.Lookup("__init__").signatures
+      self.assertEqual(init.params[1].type.cls.name, "module2.ObjectMod2")
+      self.assertIs(loaded_ast.Lookup("foo.bar.module1.SomeClass"), cls)
+      self.assertIn(cls, loaded_ast.classes)
+      self.assertNotIn("_lazy_definitions", vars(loaded_ast))
+
+  def test_prefetch(self):
+    with test_utils.Tempdir() as d:
+      self._create_files(tempdir=d)
+      module1 = _Module(module_name="module1", file_name="module1.pyi")
+      module2 = _Module(module_name="module2", file_name="module2.pyi")
+      loader, ast = self._load_ast(tempdir=d, module=module1)
+      self._pickle_modules(loader, d, module1, module2)
+      options = config.Options.create(
+          python_version=self.python_version, pythonpath="",
+          use_pickled_files=True, pickle_prefetch_threads=2)
+      options.tweak(imports_map={
+          m.module_name: self._get_path(d, m.file_name + ".pickled")
+          for m in (module1, module2)})
+      pickle_loader = load_pytd.PickledPyiLoader(options)
+      loaded_ast = pickle_loader.import_name("module1")
+      self.assertMultiLineEqual(
+          pytd_utils.Print(pytd_utils.CanonicalOrdering(ast)),
+          pytd_utils.Print(pytd_utils.CanonicalOrdering(loaded_ast)))
+      loaded_ast.Visit(visitors.VerifyLookup())
+
+  def test_indexed_function_alias(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("foo.pyi", """
+        def f(): ...
+        g = f
+      """)
+      foo = _Module(module_name="foo", file_name="foo.pyi")
+      loader, _ = self._load_ast(d, module=foo)
+      self._pickle_modules(loader, d, foo, indexed=True)
+      loaded_ast = self._load_indexed_module(d, foo)
+      g = loaded_ast.Lookup("foo.g")
+      self.assertEqual(g.type, loaded_ast.Lookup("foo.f"))
+
   def test_star_import(self):
     with test_utils.Tempdir() as d:
       d.create_file("foo.pyi", "class A: ...")
@@ -820,6 +893,21 @@ class PickledPyiLoaderTest(test_base.UnitTest):
       self.assertTrue(loader.import_name("foo"))
       self.assertTrue(loader.import_name("ctypes"))
 
+  def test_bundled_builtins(self):
+    with test_utils.Tempdir() as d:
+      filename = path_utils.join(d.path, "builtins.bundle")
+      load_pytd.Loader(config.Options.create(
+          module_name="base", python_version=self.python_version
+      )).save_to_pickle(filename, bundle=True)
+      loader = load_pytd.PickledPyiLoader.load_from_pickle(
+          filename,
+          config.Options.create(
+              module_name="base",
+              python_version=self.python_version,
+              pythonpath=""))
+      self.assertTrue(loader.import_name("sys"))
+      self.assertIsNotNone(loader.lookup_builtin("builtins.int"))
+
 
 class MethodAliasTest(_LoaderTest):
 
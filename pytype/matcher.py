@@ -361,8 +361,9 @@ class AbstractMatcher(utils.ContextWeakrefMixin):
     elif good_matches:
       # Use HasCombination, which is much more expensive than
       # CanHaveCombination, to re-filter bad matches.
-      bad_matches = [m for m in bad_matches
-                     if self._node.HasCombination(list(m.view.values()))]
+      possible = self._node.HasCombinations(
+          [list(m.view.values()) for m in bad_matches])
+      bad_matches = [m for m, p in zip(bad_matches, possible) if p]
       success = not bad_matches
     else:
       success = False
@@ -87,6 +87,17 @@ def _prepare_for_test(enabled=True):
   _enabled = enabled
 
 
+def reset():
+  """Reset all registered metrics to their initial values.
+
+  A long-lived process that analyzes one module after another calls this
+  between modules, so that the metrics of a module don't include those of the
+  modules before it.
+  """
+  for metric in _registered_metrics.values():
+    metric._reset()  # pylint: disable=protected-access
+
+
 _platform_timer = time.time if os.name == "nt" else time.process_time
 
 
@@ -159,6 +170,10 @@ class Metric(metaclass=_RegistryMeta):
     """Return a string summarizing the value of the metric."""
     raise NotImplementedError
 
+  def _reset(self):
+    """Reset the metric to its initial value."""
+    raise NotImplementedError
+
   def _merge(self, other):
     """Merge data from another metric of the same type."""
     raise NotImplementedError
@@ -172,6 +187,9 @@ class Counter(Metric):
 
   def __init__(self, name):
     super().__init__(name)
+    self._reset()
+
+  def _reset(self):
     self._total = 0
 
   def inc(self, count=1):
@@ -193,11 +211,18 @@ class Counter(Metric):
 class StopWatch(Metric):
   """A counter that measures the time spent in a "with" statement."""
 
+  def __init__(self, name):
+    super().__init__(name)
+    self._reset()
+
+  def _reset(self):
+    self._total = 0
+
   def __enter__(self):
     self._start_time = get_cpu_clock()
 
   def __exit__(self, exc_type, exc_value, traceback):
-    self._total = get_cpu_clock() - self._start_time
+    self._total += get_cpu_clock() - self._start_time
     del self._start_time
 
   def _summary(self):
@@ -216,6 +241,9 @@ class ReentrantStopWatch(Metric):
     self._time = 0
     self._calls = 0
 
+  def _reset(self):
+    self._time = 0
+
   def __enter__(self):
     if not self._calls:
       self._start_time = get_cpu_clock()
@@ -239,6 +267,9 @@ class MapCounter(Metric):
 
   def __init__(self, name):
     super().__init__(name)
+    self._reset()
+
+  def _reset(self):
     self._counts = {}
     self._total = 0
 
@@ -271,11 +302,66 @@ class MapCounter(Metric):
       self._total += count
 
 
+class MapProfile(Metric):
+  """The cost of an operation, keyed by an arbitrary string.
+
+  For every key, this records the number of calls, their wall and CPU time and
+  the total of some count, such as the number of objects that the calls
+  created. Each of the last three is recorded both cumulatively and
+  exclusively, i.e., without the part spent in nested calls that were profiled
+  as well. Recursive calls with the same key are counted more than once in the
+  cumulative totals.
+  """
+
+  FIELDS = ("calls", "wall", "cpu", "count", "self_wall", "self_cpu",
+            "self_count")
+
+  def __init__(self, name):
+    super().__init__(name)
+    self._reset()
+
+  def _reset(self):
+    self._entries = {}  # key -> list of the values of FIELDS
+
+  def add(self, key, wall, cpu, count, self_wall, self_cpu, self_count):
+    """Record one call."""
+    if not _enabled:
+      return
+    entry = self._entries.get(key)
+    if entry is None:
+      entry = self._entries[key] = [0] * len(self.FIELDS)
+    for i, value in enumerate(
+        (1, wall, cpu, count, self_wall, self_cpu, self_count)):
+      entry[i] += value
+
+  def entries(self):
+    """Get a mapping from each key to a mapping from field name to value."""
+    return {key: dict(zip(self.FIELDS, entry))
+            for key, entry in self._entries.items()}
+
+  def _summary(self):
+    calls = sum(entry[0] for entry in self._entries.values())
+    cpu = sum(entry[self.FIELDS.index("self_cpu")]
+              for entry in self._entries.values())
+    return (f"{calls} calls, {cpu:f} seconds of CPU time, "
+            f"{len(self._entries)} keys")
+
+  def _merge(self, other):
+    # pylint: disable=protected-access
+    for key, other_entry in other._entries.items():
+      entry = self._entries.setdefault(key, [0] * len(self.FIELDS))
+      for i, value in enumerate(other_entry):
+        entry[i] += value
+
+
 class Distribution(Metric):
   """A metric to track simple statistics from a distribution of values."""
 
   def __init__(self, name):
     super().__init__(name)
+    self._reset()
+
+  def _reset(self):
     self._count = 0  # Number of values.
     self._total = 0.0  # Sum of the values.
     self._squared = 0.0  # Sum of the squares of the values.
@@ -354,6 +440,9 @@ class Snapshot(Metric):
     # options.memory_snapshot flag set by the --memory-snapshots option)
     self.enabled = _enabled and enabled
 
+  def _reset(self):
+    self.snapshots = []
+
   def _start_tracemalloc(self):
     tracemalloc.start(self.nframes)
     self.running = True
@@ -392,6 +481,9 @@ class Snapshot(Metric):
   def _summary(self):
     return "\n\n".join(self.snapshots)
 
+  def _merge(self, other):
+    self.snapshots.extend(other.snapshots)
+
 
 class MetricsContext:
   """A context manager that configures metrics and writes their output."""
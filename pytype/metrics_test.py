@@ -87,6 +87,17 @@ class MetricsTest(unittest.TestCase):
     c2 = metrics.get_metric("foo", metrics.Counter)
     self.assertIs(c1, c2)
 
+  def test_reset(self):
+    c = metrics.Counter("foo")
+    m = metrics.MapCounter("bar")
+    c.inc(2)
+    m.inc("x")
+    metrics.reset()
+    self.assertEqual("bar: 0 {}\nfoo: 0\n", metrics.get_report())
+    self.assertIs(metrics.get_metric("foo", metrics.Counter), c)
+    c.inc()
+    self.assertEqual(1, c._total)
+
 
 class ReentrantStopWatchTest(unittest.TestCase):
 
@@ -188,6 +199,49 @@ class MapCounterTest(unittest.TestCase):
     self.assertDictEqual(dict(x=2, y=2, z=1), c._counts)
 
 
+class MapProfileTest(unittest.TestCase):
+  """Tests for MapProfile."""
+
+  def setUp(self):
+    super().setUp()
+    metrics._prepare_for_test()
+
+  def test_enabled(self):
+    p = metrics.MapProfile("foo")
+    p.add("x", 2.0, 1.0, 3, 1.5, 0.5, 1)
+    p.add("x", 1.0, 1.0, 0, 1.0, 1.0, 0)
+    p.add("y", 1.0, 0.5, 1, 1.0, 0.5, 1)
+    self.assertDictEqual(p.entries(), {
+        "x": dict(calls=2, wall=3.0, cpu=2.0, count=3, self_wall=2.5,
+                  self_cpu=1.5, self_count=1),
+        "y": dict(calls=1, wall=1.0, cpu=0.5, count=1, self_wall=1.0,
+                  self_cpu=0.5, self_count=1),
+    })
+    self.assertEqual("foo: 3 calls, 2.000000 seconds of CPU time, 2 keys",
+                     str(p))
+
+  def test_disabled(self):
+    metrics._prepare_for_test(enabled=False)
+    p = metrics.MapProfile("foo")
+    p.add("x", 1.0, 1.0, 1, 1.0, 1.0, 1)
+    self.assertFalse(p.entries())
+
+  def test_merge_from_file(self):
+    p = metrics.MapProfile("foo")
+    p.add("x", 2.0, 1.0, 3, 1.5, 0.5, 1)
+    dump = io.StringIO("")
+    metrics.dump_all([p], dump)
+    p.add("y", 1.0, 0.5, 1, 1.0, 0.5, 1)
+    dump.seek(0)
+    metrics.merge_from_file(dump)
+    self.assertDictEqual(p.entries(), {
+        "x": dict(calls=2, wall=4.0, cpu=2.0, count=6, self_wall=3.0,
+                  self_cpu=1.0, self_count=2),
+        "y": dict(calls=1, wall=1.0, cpu=0.5, count=1, self_wall=1.0,
+                  self_cpu=0.5, self_count=1),
+    })
+
+
 class DistributionTest(unittest.TestCase):
   """Tests for Distribution."""
 
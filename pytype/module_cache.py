@@ -0,0 +1,118 @@
+"""Loaded dependencies that are shared between runs of pytype-single.
+
+Long-lived processes that analyze one module after another, like the pytype
+daemon and the analyze_project worker pool, keep the loaded and resolved
+dependencies of previous runs in a ModuleCache and reuse them for later runs.
+"""
+
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+from pytype import file_utils
+from pytype import load_pytd
+from pytype import single
+from pytype.imports import base as imports_base
+from pytype.imports import module_loader
+from pytype.pyi import parser
+
+log = logging.getLogger(__name__)
+
+
+def _stat_file(path) -> Optional[Tuple[int, int]]:
+  try:
+    st = os.stat(path)
+  except OSError:
+    return None
+  return st.st_mtime_ns, st.st_size
+
+
+class ModuleCache:
+  """Loaded and resolved modules, shared between the loaders of runs.
+
+  The modules of a loader point into each other and into builtins and typing,
+  so the cache is only used by loaders with the same builtins, and is emptied
+  as soon as any of its modules would be loaded from a different or changed
+  file, rather than tracking which modules depend on the changed one.
+  """
+
+  def __init__(self):
+    self._modules: Dict[str, load_pytd.Module] = {}
+    # module name -> (stat, hash) of the module's file
+    self._files: Dict[str, Tuple[Optional[Tuple[int, int]],
+                                 Optional[str]]] = {}
+    self._builtins = None
+    self._pyi_options = None
+
+  def __len__(self):
+    return len(self._modules)
+
+  def clear(self):
+    self._modules.clear()
+    self._files.clear()
+    self._builtins = self._pyi_options = None
+
+  def _file_hash(self, name, filename) -> Optional[str]:
+    """The hash of filename, rehashing only if its stat info changed."""
+    stat = _stat_file(filename)
+    old_stat, old_hash = self._files.get(name, (None, None))
+    if stat is not None and stat == old_stat:
+      return old_hash
+    return file_utils.hash_file(filename)
+
+  def _is_valid(self, options) -> bool:
+    """Whether every cached module would be loaded from the same file."""
+    finder = module_loader.ModuleLoader(options)
+    for name, module in self._modules.items():
+      mod_info = finder.find_import(name)
+      if module.filename.startswith(imports_base.PREFIX):
+        # Stubs that ship with pytype or typeshed do not change, but a file
+        # for the module may shadow them.
+        if mod_info:
+          return False
+      elif not mod_info or mod_info.filename != module.filename:
+        return False
+      elif self._file_hash(name, module.filename) != self._files[name][1]:
+        log.info("%s changed, clearing module cache", module.filename)
+        return False
+    return True
+
+  def create_loader(self, options) -> load_pytd.Loader:
+    """Creates a loader for options, with the valid cached modules added."""
+    loader = load_pytd.create_loader(options)
+    pyi_options = parser.PyiOptions.from_toplevel_options(options)
+    if (loader.builtins is not self._builtins or
+        pyi_options != self._pyi_options or not self._is_valid(options)):
+      self.clear()
+    loader.add_reusable_modules(self._modules)
+    return loader
+
+  def update(self, options, loader: load_pytd.Loader):
+    """Adds the modules of loader, which has finished analyzing a file."""
+    self._builtins = loader.builtins
+    self._pyi_options = parser.PyiOptions.from_toplevel_options(options)
+    for name, module in loader.get_reusable_modules().items():
+      if name in self._modules or not module.filename:
+        continue
+      self._modules[name] = module
+      if not module.filename.startswith(imports_base.PREFIX):
+        stat = _stat_file(module.filename)
+        self._files[name] = (stat, file_utils.hash_file(module.filename))
+
+  def run(self, options) -> int:
+    """Runs pytype-single with options, reusing and updating the cache."""
+    if options.generate_builtins or options.parse_pyi:
+      return single.run(options) or 0
+    loader = self.create_loader(options)
+    try:
+      ret = single.run(options, loader=loader) or 0
+    except:
+      self.clear()
+      raise
+    if options.pickle_output:
+      # Pickling the output clears the class pointers of the pytd nodes it
+      # contains, which may be shared with the cached modules.
+      self.clear()
+    else:
+      self.update(options, loader)
+    return ret
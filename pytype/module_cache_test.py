@@ -0,0 +1,58 @@
+"""Tests for module_cache.py."""
+
+import os
+
+from pytype import config
+from pytype import module_cache
+from pytype.tests import test_base
+from pytype.tests import test_utils
+
+import unittest
+
+
+class TestModuleCache(test_base.UnitTest):
+  """Test ModuleCache."""
+
+  def _options(self, d):
+    return config.Options.create(
+        python_version=self.python_version, pythonpath=d.path)
+
+  def _load(self, cache, d, module_name):
+    options = self._options(d)
+    loader = cache.create_loader(options)
+    ast = loader.import_name(module_name)
+    cache.update(options, loader)
+    return ast
+
+  def test_reuse(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("foo.pyi", "class A: ...")
+      cache = module_cache.ModuleCache()
+      foo = self._load(cache, d, "foo")
+      self.assertIs(self._load(cache, d, "foo"), foo)
+
+  def test_invalidate_changed_file(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("foo.pyi", "class A: ...")
+      d.create_file("bar.pyi", "from foo import A")
+      cache = module_cache.ModuleCache()
+      self._load(cache, d, "bar")
+      self.assertIn("foo", cache._modules)
+      path = d.create_file("foo.pyi", "class B: ...")
+      # Make sure that the change is noticed even if the mtime is unchanged.
+      os.utime(path, ns=(0, 0))
+      foo = self._load(cache, d, "foo")
+      self.assertIsNotNone(foo.Get("foo.B"))
+      self.assertNotIn("bar", cache._modules)
+
+  def test_invalidate_shadowed_stub(self):
+    with test_utils.Tempdir() as d:
+      cache = module_cache.ModuleCache()
+      self._load(cache, d, "abc")
+      d.create_file("abc.pyi", "x: int")
+      abc = self._load(cache, d, "abc")
+      self.assertIsNotNone(abc.Get("abc.x"))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -8,12 +8,12 @@ class CollectAnnotationLines(ast.NodeVisitor):
   """Collect line numbers of annotations to augment."""
 
   def __init__(self):
-    self.annotation_lines = []
+    self.annotations = []
     self.in_function = False
 
   def visit_AnnAssign(self, node):
     if self.in_function and node.value is None:
-      self.annotation_lines.append(node.end_lineno - 1)  # change to 0-based
+      self.annotations.append(node)
 
   def visit_FunctionDef(self, node):
     self.in_function = True
@@ -23,21 +23,51 @@ class CollectAnnotationLines(ast.NodeVisitor):
 # pylint: enable=invalid-name
 
 
-def augment_annotations(src):
-  """Add an assignment to bare variable annotations."""
-  try:
-    tree = ast.parse(src)
-  except SyntaxError:
-    # Let the compiler catch and report this later.
-    return src
+def augment_annotations(src, tree=None):
+  """Add an assignment to bare variable annotations.
+
+  Args:
+    src: The source code.
+    tree: Optionally, the ast of src. If given, it is modified in place so that
+      it matches the returned source code.
+
+  Returns:
+    The source code, with " = ..." added to every bare variable annotation in a
+    function.
+  """
+  if tree is None:
+    try:
+      tree = ast.parse(src)
+    except SyntaxError:
+      # Let the compiler catch and report this later.
+      return src
   visitor = CollectAnnotationLines()
   visitor.visit(tree)
-  if visitor.annotation_lines:
+  if visitor.annotations:
     lines = src.split("\n")
-    for i in visitor.annotation_lines:
+    parents = {child: node for node in ast.walk(tree)
+               for child in ast.iter_child_nodes(node)}
+    for node in visitor.annotations:
+      i = node.end_lineno - 1  # 0-based
       # Preserve comments, as they may be pytype directives. We don't bother to
       # keep the formatting, since users never see the transformed source code.
       line, mark, comment = lines[i].partition("#")
       lines[i] = line + " = ..." + mark + comment
+      # Column offsets in the ast are in UTF-8 bytes.
+      _add_ellipsis_value(node, len((line + " = ").encode("utf-8")), parents)
     src = "\n".join(lines)
   return src
+
+
+def _add_ellipsis_value(node, col_offset, parents):
+  """Add the value that augment_annotations adds at col_offset of the line."""
+  old_end = (node.end_lineno, node.end_col_offset)
+  node.value = ast.Constant(
+      value=Ellipsis, kind=None, lineno=node.end_lineno,
+      col_offset=col_offset, end_lineno=node.end_lineno,
+      end_col_offset=col_offset + 3)
+  # The annotation, and any enclosing nodes that it ends, now end after "...".
+  while (getattr(node, "end_lineno", None),
+         getattr(node, "end_col_offset", None)) == old_end:
+    node.end_col_offset = col_offset + 3
+    node = parents.get(node)
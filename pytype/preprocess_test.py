@@ -0,0 +1,73 @@
+"""Tests for preprocess.py."""
+
+import ast
+import dis
+import textwrap
+
+from pytype import preprocess
+
+import unittest
+
+
+class AugmentAnnotationsTest(unittest.TestCase):
+  """Test augment_annotations."""
+
+  def _augment(self, src):
+    src = textwrap.dedent(src)
+    tree = ast.parse(src)
+    new_src = preprocess.augment_annotations(src, tree)
+    self.assertEqual(preprocess.augment_annotations(src), new_src)
+    return new_src, tree
+
+  def assert_same_code(self, code1, code2):
+    self.assertEqual(code1.co_code, code2.co_code)
+    self.assertEqual(list(dis.findlinestarts(code1)),
+                     list(dis.findlinestarts(code2)))
+    consts1 = [c for c in code1.co_consts if isinstance(c, type(code1))]
+    consts2 = [c for c in code2.co_consts if isinstance(c, type(code2))]
+    self.assertEqual(len(consts1), len(consts2))
+    for c1, c2 in zip(consts1, consts2):
+      self.assert_same_code(c1, c2)
+
+  def test_augment(self):
+    src, tree = self._augment("""
+      x: int
+      def f():
+        y: int
+        z: str = ""
+        w: (
+            int)  # comment
+        u: "é"  # comment
+      class A:
+        v: int
+    """)
+    self.assertEqual(src, textwrap.dedent("""
+      x: int
+      def f():
+        y: int = ...
+        z: str = ""
+        w: (
+            int)   = ...# comment
+        u: "é"   = ...# comment
+      class A:
+        v: int
+    """))
+    self.assertEqual(ast.dump(tree, include_attributes=True),
+                     ast.dump(ast.parse(src), include_attributes=True))
+    self.assert_same_code(compile(tree, "t.py", "exec"),
+                          compile(src, "t.py", "exec"))
+
+  def test_nothing_to_augment(self):
+    src = "def f():\n  x: int = 0\n"
+    new_src, tree = self._augment(src)
+    self.assertEqual(src, new_src)
+    self.assertEqual(ast.dump(tree, include_attributes=True),
+                     ast.dump(ast.parse(src), include_attributes=True))
+
+  def test_syntax_error(self):
+    src = "def f(:\n  x: int\n"
+    self.assertEqual(src, preprocess.augment_annotations(src))
+
+
+if __name__ == "__main__":
+  unittest.main()
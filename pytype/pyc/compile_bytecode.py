@@ -1,8 +1,13 @@
-"""Compiles a single .py to a .pyc and writes it to stdout."""
+"""Compiles a single .py to a .pyc and writes it to stdout.
+
+With --server, compiles a stream of sources read from stdin instead; see
+serve().
+"""
 
 # These are C modules built into Python. Don't add any modules that are
 # implemented in a .py:
 import importlib.util
+import io
 import marshal
 import re
 import sys
@@ -70,10 +75,57 @@ def compile_src_to_pyc(src, filename, output, mode):
     write_pyc(output, codeobject)
 
 
+def _read_message(f):
+  """Read a length-prefixed message, or return None at the end of the input."""
+  header = f.read(4)
+  if not header:
+    return None
+  length = int.from_bytes(header, "little")
+  data = f.read(length)
+  if len(header) != 4 or len(data) != length:
+    raise EOFError("Truncated message")
+  return data
+
+
+def _write_message(f, data):
+  f.write(len(data).to_bytes(4, "little"))
+  f.write(data)
+
+
+def serve(input_stream, output):
+  """Compile sources read from input_stream until it is closed.
+
+  Every request consists of three length-prefixed messages (a 4-byte
+  little-endian length followed by that many bytes): the filename, the mode and
+  the source code, all utf-8 encoded. The response is a single length-prefixed
+  message holding what compile_src_to_pyc writes for the request.
+
+  Args:
+    input_stream: A binary stream to read requests from.
+    output: A binary stream to write responses to.
+  """
+  while True:
+    filename = _read_message(input_stream)
+    if filename is None:
+      return
+    mode = _read_message(input_stream)
+    src = _read_message(input_stream)
+    if mode is None or src is None:
+      raise EOFError("Truncated request")
+    result = io.BytesIO()
+    compile_src_to_pyc(src.decode("utf-8"), filename.decode("utf-8"), result,
+                       mode.decode("utf-8"))
+    _write_message(output, result.getvalue())
+    output.flush()
+
+
 def main():
+  output = sys.stdout.buffer if hasattr(sys.stdout, "buffer") else sys.stdout
+  if sys.argv[1:] == ["--server"]:
+    serve(sys.stdin.buffer, output)
+    return
   if len(sys.argv) != 4:
     sys.exit(1)
-  output = sys.stdout.buffer if hasattr(sys.stdout, "buffer") else sys.stdout
   compile_to_pyc(data_file=sys.argv[1], filename=sys.argv[2],
                  output=output, mode=sys.argv[3])
 
@@ -12,7 +12,6 @@ from typing import Iterable, List, Optional, Tuple
 
 from pytype import pytype_source_utils
 from pytype import utils
-from pytype.platform_utils import tempfile as compatible_tempfile
 from pytype.pyc import compile_bytecode
 
 
@@ -49,16 +48,97 @@ class CompileError(Exception):
       self.lineno = 1
 
 
+class _CompileServer:
+  """A long-lived target interpreter that compiles source code for us.
+
+  The server runs compile_bytecode.py in --server mode, so that we pay for
+  starting the interpreter once rather than once per module. See
+  compile_bytecode.serve() for the protocol.
+  """
+
+  def __init__(self, python_exe: List[str]):
+    self._python_exe = python_exe
+    self._process = None
+    self._pid = None
+
+  def _start(self):
+    script = pytype_source_utils.load_text_file(_COMPILE_SCRIPT)
+    # We pass -E to ignore the environment so that PYTHONPATH and sitecustomize
+    # on some people's systems don't mess with the interpreter.
+    cmd = self._python_exe + ["-E", "-c", script, "--server"]
+    self._process = subprocess.Popen(  # pylint: disable=consider-using-with
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    # A forked child must not talk to its parent's server.
+    self._pid = os.getpid()
+
+  def _request(self, src, filename, mode):
+    stdin, stdout = self._process.stdin, self._process.stdout
+    for field in (filename, mode, src):
+      compile_bytecode._write_message(stdin, field.encode("utf-8"))  # pylint: disable=protected-access
+    stdin.flush()
+    result = compile_bytecode._read_message(stdout)  # pylint: disable=protected-access
+    if result is None:
+      raise EOFError("Compile server exited")
+    return result
+
+  def compile(self, src, filename, mode):
+    """Compile src, restarting the server once if it has died."""
+    for retry in (False, True):
+      if (self._process is None or self._pid != os.getpid() or
+          self._process.poll() is not None):
+        self._start()
+      try:
+        return self._request(src, filename, mode)
+      except (OSError, EOFError):
+        self.stop()
+        if retry:
+          raise OSError("Compile server for %s failed" %
+                        " ".join(self._python_exe)) from None
+
+  def stop(self):
+    if self._process is None or self._pid != os.getpid():
+      self._process = None
+      return
+    process, self._process = self._process, None
+    try:
+      process.stdin.close()
+    except OSError:
+      pass
+    try:
+      process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+      process.kill()
+      process.wait()
+    process.stdout.close()
+
+
+_compile_servers = {}
+
+
+def _get_compile_server(python_exe: List[str]) -> _CompileServer:
+  key = tuple(python_exe)
+  if key not in _compile_servers:
+    _compile_servers[key] = _CompileServer(python_exe)
+  return _compile_servers[key]
+
+
+@atexit.register
+def _stop_compile_servers():
+  for server in _compile_servers.values():
+    server.stop()
+  _compile_servers.clear()
+
+
 def compile_src_string_to_pyc_string(
     src, filename, python_version, python_exe: List[str], mode="exec"):
   """Compile Python source code to pyc data.
 
   This may use py_compile if the src is for the same version as we're running,
-  or else it spawns an external process to produce a .pyc file. The generated
-  bytecode (.pyc file) is read and both it and any temporary files are deleted.
+  or else it sends the src to a compile server, a long-lived python_exe process
+  that is started on first use and restarted if it dies.
 
   Args:
-    src: Python sourcecode
+    src: Python sourcecode, or, if we can compile it natively, its ast.
     filename: Name of the source file. For error messages.
     python_version: Python version, (major, minor).
     python_exe: A path to a Python interpreter.
@@ -78,26 +158,8 @@ def compile_src_string_to_pyc_string(
     compile_bytecode.compile_src_to_pyc(src, filename or "<>", output, mode)
     bytecode = output.getvalue()
   else:
-    tempfile_options = {"mode": "w", "suffix": ".py", "delete": False}
-    tempfile_options.update({"encoding": "utf-8"})
-    fi = compatible_tempfile.NamedTemporaryFile(**tempfile_options)  # pylint: disable=consider-using-with
-    try:
-      fi.write(src)
-      fi.close()
-      # In order to be able to compile pyc files for a different Python version
-      # from the one we're running under, we spawn an external process.
-      # We pass -E to ignore the environment so that PYTHONPATH and
-      # sitecustomize on some people's systems don't mess with the interpreter.
-      cmd = python_exe + ["-E", "-", fi.name, filename or fi.name, mode]
-
-      compile_script_src = pytype_source_utils.load_binary_file(_COMPILE_SCRIPT)
-
-      with subprocess.Popen(
-          cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE) as p:
-        bytecode, _ = p.communicate(compile_script_src)
-        assert p.poll() == 0, "Child process failed"
-    finally:
-      os.unlink(fi.name)
+    bytecode = _get_compile_server(python_exe).compile(
+        src, filename or "<>", mode)
   first_byte = bytecode[0]
   if first_byte == 0:  # compile OK
     return bytecode[1:]
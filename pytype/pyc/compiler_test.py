@@ -4,6 +4,7 @@
 # they also depend on some functions from pyc/pyc
 
 import os
+import sys
 
 from pytype.pyc import compiler
 
@@ -39,5 +40,37 @@ class PythonExeTest(unittest.TestCase):
     compiler._CUSTOM_PYTHON_EXES = temp
 
 
+class CompileServerTest(unittest.TestCase):
+  """Test the long-lived compile server."""
+
+  def setUp(self):
+    super().setUp()
+    self.server = compiler._CompileServer([sys.executable])
+    self.addCleanup(self.server.stop)
+
+  def test_compile(self):
+    for _ in range(2):
+      bytecode = self.server.compile("x = 42\n", "foo.py", "exec")
+      self.assertEqual(bytecode[:1], b"\0")
+
+  def test_compile_error(self):
+    bytecode = self.server.compile("x = (\n", "foo.py", "exec")
+    self.assertEqual(bytecode[:1], b"\1")
+    self.assertIn(b"foo.py", bytecode)
+
+  def test_reuse(self):
+    self.server.compile("x = 42\n", "foo.py", "exec")
+    pid = self.server._process.pid
+    self.server.compile("y = 42\n", "bar.py", "exec")
+    self.assertEqual(self.server._process.pid, pid)
+
+  def test_restart(self):
+    self.server.compile("x = 42\n", "foo.py", "exec")
+    self.server._process.kill()
+    self.server._process.wait()
+    bytecode = self.server.compile("x = 42\n", "foo.py", "exec")
+    self.assertEqual(bytecode[:1], b"\0")
+
+
 if __name__ == "__main__":
   unittest.main()
@@ -9,12 +9,12 @@ architecture issues (e.g., you can write a Python value to a file on a PC,
 Details of the format may change between Python versions.
 """
 
+import marshal
 import struct
 import sys
+import types
 from typing import List, Sequence, Tuple, Union
 
-from pytype import utils
-
 
 TYPE_NULL = 0x30  # '0'
 TYPE_NONE = 0x4e  # 'N'
@@ -123,11 +123,22 @@ class CodeType:
     return f'<code: {self.co_name}>'
 
 
+_LONG = struct.Struct('<i')
+_LONG64 = struct.Struct('<q')
+_BINARY_FLOAT = struct.Struct('<d')
+_BINARY_COMPLEX = struct.Struct('<dd')
+
+
 class _LoadMarshal:
-  """Stateful loader for marshalled files."""
+  """Stateful loader for marshalled files.
+
+  The loader reads from a memoryview of the data, so that slicing it does not
+  copy, and decodes fixed-size fields with precompiled structs. load() looks up
+  the loader of every type code in a table indexed by the code.
+  """
 
   def __init__(self, data, python_version):
-    self.bufstr = data
+    self.bufstr = memoryview(data)
     self.bufpos = 0
     self.python_version = python_version
     self.refs = []
@@ -139,70 +150,73 @@ class _LoadMarshal:
 
   def load(self):
     """Load an encoded Python data structure."""
-    c = ord('?')  # make pylint happy
+    pos = self.bufpos
     try:
-      c = self._read_byte()
-      if c & REF:
-        # This element might recursively contain other elements, which
-        # themselves store things in the refs table. So we need to determine the
-        # index position *before* reading the contents of this element.
-        idx = self._reserve_ref()
-        result = _LoadMarshal.dispatch[c & ~REF](self)
-        self.refs[idx] = result
-      else:
-        result = _LoadMarshal.dispatch[c](self)
-      return result
-    except KeyError as e:
-      raise ValueError(f'bad marshal code: {chr(c)!r} ({c:02x})') from e
+      c = self.bufstr[pos]
     except IndexError as e:
       raise EOFError() from e
+    self.bufpos = pos + 1
+    load = _DISPATCH[c & ~REF]
+    if load is None:
+      raise ValueError(f'bad marshal code: {chr(c)!r} ({c:02x})')
+    if c & REF:
+      # This element might recursively contain other elements, which
+      # themselves store things in the refs table. So we need to determine the
+      # index position *before* reading the contents of this element.
+      idx = self._reserve_ref()
+      result = load(self)
+      self.refs[idx] = result
+      return result
+    return load(self)
 
   def _read(self, n):
-    """Read n bytes as a string."""
+    """Read n bytes as a memoryview."""
     pos = self.bufpos
-    self.bufpos += n
-    if self.bufpos > len(self.bufstr):
+    end = pos + n
+    if end > len(self.bufstr):
       raise EOFError()
-    return self.bufstr[pos : self.bufpos]
+    self.bufpos = end
+    return self.bufstr[pos:end]
 
   def _read_byte(self):
     """Read an unsigned byte."""
     pos = self.bufpos
-    self.bufpos += 1
-    return self.bufstr[pos]
-
-  def _read_short(self):
-    """Read a signed 16 bit word."""
-    lo = self._read_byte()
-    hi = self._read_byte()
-    x = lo | (hi<<8)
-    if x & 0x8000:
-      # sign extension
-      x -= 0x10000
-    return x
+    try:
+      c = self.bufstr[pos]
+    except IndexError as e:
+      raise EOFError() from e
+    self.bufpos = pos + 1
+    return c
+
+  def _unpack(self, s):
+    """Unpack the values of the struct s."""
+    pos = self.bufpos
+    try:
+      values = s.unpack_from(self.bufstr, pos)
+    except struct.error as e:
+      raise EOFError() from e
+    self.bufpos = pos + s.size
+    return values
 
   def _read_long(self):
     """Read a signed 32 bit word."""
-    s = self._read(4)
-    b = lambda i: s[i]
-    x = b(0) | b(1)<<8 | b(2)<<16 | b(3)<<24
-    if b(3) & 0x80 and x > 0:
-      # sign extension
-      x = -((1<<32) - x)
-      return int(x)
-    else:
-      return x
+    # This is the most frequent read, so it does not go through _unpack.
+    pos = self.bufpos
+    try:
+      x, = _LONG.unpack_from(self.bufstr, pos)
+    except struct.error as e:
+      raise EOFError() from e
+    self.bufpos = pos + 4
+    return x
 
   def _read_long64(self):
     """Read a signed 64 bit integer."""
-    s = self._read(8)
-    b = lambda i: s[i]
-    x = (b(0) | b(1)<<8 | b(2)<<16 | b(3)<<24 |
-         b(4)<<32 | b(5)<<40 | b(6)<<48 | b(7)<<56)
-    if b(7) & 0x80 and x > 0:
-      # sign extension
-      x = -((1<<64) - x)
-    return x
+    return self._unpack(_LONG64)[0]
+
+  def _read_values(self, n):
+    """Load n values."""
+    load = self.load
+    return [load() for _ in range(n)]
 
   def _reserve_ref(self):
     """Reserve one entry in the reference table.
@@ -248,43 +262,38 @@ class _LoadMarshal:
   def load_long(self):
     """Load a variable length integer."""
     size = self._read_long()
+    n = abs(size)
+    # The digits are signed 16 bit words holding 15 bits each.
+    digits = self._unpack(struct.Struct(f'<{n}h'))
     x = 0
-    for i in range(abs(size)):
-      d = self._read_short()
+    for i, d in enumerate(digits):
       x |= d<<(i*15)
     return x if size >= 0 else -x
 
   def load_float(self):
     n = self._read_byte()
-    s = self._read(n)
-    return float(s)
+    return float(bytes(self._read(n)))
 
   def load_binary_float(self):
-    binary = self._read(8)
-    return struct.unpack('<d', binary)[0]
+    return self._unpack(_BINARY_FLOAT)[0]
 
   def load_complex(self):
     n = self._read_byte()
-    s = self._read(n)
-    real = float(s)
+    real = float(bytes(self._read(n)))
     n = self._read_byte()
-    s = self._read(n)
-    imag = float(s)
+    imag = float(bytes(self._read(n)))
     return complex(real, imag)
 
   def load_binary_complex(self):
-    binary = self._read(16)
-    return complex(*struct.unpack('dd', binary))
+    return complex(*self._unpack(_BINARY_COMPLEX))
 
   def load_string(self):
     n = self._read_long()
-    s = bytes(self._read(n))
-    return s
+    return bytes(self._read(n))
 
   def load_interned(self):
     n = self._read_long()
-    s = self._read(n)
-    ret = sys.intern(utils.native_str(s))
+    ret = sys.intern(str(self._read(n), 'utf-8'))
     self._stringtable.append(ret)
     return ret
 
@@ -294,63 +303,46 @@ class _LoadMarshal:
 
   def load_unicode(self):
     n = self._read_long()
-    s = self._read(n)
-    # We need to convert bytes to a unicode string.
     # We use the 'backslashreplace' error mode in order to handle non-utf8
     # backslash-escaped string literals correctly.
-    s = s.decode('utf8', 'backslashreplace')
-    return s
+    return str(self._read(n), 'utf-8', 'backslashreplace')
 
   def load_ascii(self):
     n = self._read_long()
-    return utils.native_str(self._read(n))
+    return str(self._read(n), 'utf-8')
 
   def load_short_ascii(self):
-    n = self._read_byte()
-    return utils.native_str(self._read(n))
+    return str(self._read(self._read_byte()), 'utf-8')
 
   def load_tuple(self):
-    return tuple(self.load_list())
+    return tuple(self._read_values(self._read_long()))
 
   def load_small_tuple(self):
-    n = self._read_byte()
-    l = []
-    for _ in range(n):
-      l.append(self.load())
-    return tuple(l)
+    return tuple(self._read_values(self._read_byte()))
 
   def load_list(self):
-    n = self._read_long()
-    l = []
-    for _ in range(n):
-      l.append(self.load())
-    return l
+    return self._read_values(self._read_long())
 
   def load_dict(self):
     d = {}
+    load = self.load
     while True:
-      key = self.load()
+      key = load()
       if key is _NULL:
         break
-      value = self.load()
-      d[key] = value
+      d[key] = load()
     return d
 
   def load_code(self):
     """Load a Python code object."""
-    argcount = self._read_long()
     # Python 3.8+ has positional only arguments.
     if self.python_version >= (3, 8):
-      posonlyargcount = self._read_long()
+      (argcount, posonlyargcount, kwonlyargcount, nlocals, stacksize,
+       flags) = self._unpack(_CODE_HEADER_38)
     else:
+      argcount, kwonlyargcount, nlocals, stacksize, flags = self._unpack(
+          _CODE_HEADER)
       posonlyargcount = -1
-    if self.python_version[0] >= 3:
-      kwonlyargcount = self._read_long()
-    else:
-      kwonlyargcount = -1
-    nlocals = self._read_long()
-    stacksize = self._read_long()
-    flags = self._read_long()
     # The code field is a 'string of raw compiled bytecode'
     # (https://docs.python.org/3/library/inspect.html#types-and-members).
     code = self.load()
@@ -372,55 +364,81 @@ class _LoadMarshal:
                     self.python_version)
 
   def load_set(self):
-    n = self._read_long()
-    args = [self.load() for _ in range(n)]
-    return set(args)
+    return set(self._read_values(self._read_long()))
 
   def load_frozenset(self):
-    n = self._read_long()
-    args = [self.load() for _ in range(n)]
-    return frozenset(args)
+    return frozenset(self._read_values(self._read_long()))
 
   def load_ref(self):
-    n = self._read_long()
-    return self.refs[n]
+    return self.refs[self._read_long()]
 
   # pylint: enable=missing-docstring
 
-  dispatch = {
-      TYPE_ASCII: load_ascii,
-      TYPE_ASCII_INTERNED: load_ascii,
-      TYPE_BINARY_COMPLEX: load_binary_complex,
-      TYPE_BINARY_FLOAT: load_binary_float,
-      TYPE_CODE: load_code,
-      TYPE_COMPLEX: load_complex,
-      TYPE_DICT: load_dict,
-      TYPE_ELLIPSIS: load_ellipsis,
-      TYPE_FALSE: load_false,
-      TYPE_FLOAT: load_float,
-      TYPE_FROZENSET: load_frozenset,
-      TYPE_INT64: load_int64,
-      TYPE_INT: load_int,
-      TYPE_INTERNED: load_interned,
-      TYPE_LIST: load_list,
-      TYPE_LONG: load_long,
-      TYPE_NONE: load_none,
-      TYPE_NULL: load_null,
-      TYPE_REF: load_ref,
-      TYPE_SET: load_set,
-      TYPE_SHORT_ASCII: load_short_ascii,
-      TYPE_SHORT_ASCII_INTERNED: load_short_ascii,
-      TYPE_SMALL_TUPLE: load_small_tuple,
-      TYPE_STOPITER: load_stopiter,
-      TYPE_STRING: load_string,
-      TYPE_STRINGREF: load_stringref,
-      TYPE_TRUE: load_true,
-      TYPE_TUPLE: load_tuple,
-      TYPE_UNICODE: load_unicode,
-  }
+
+_CODE_HEADER = struct.Struct('<5i')
+_CODE_HEADER_38 = struct.Struct('<6i')
+
+_LOADERS = {
+    TYPE_ASCII: _LoadMarshal.load_ascii,
+    TYPE_ASCII_INTERNED: _LoadMarshal.load_ascii,
+    TYPE_BINARY_COMPLEX: _LoadMarshal.load_binary_complex,
+    TYPE_BINARY_FLOAT: _LoadMarshal.load_binary_float,
+    TYPE_CODE: _LoadMarshal.load_code,
+    TYPE_COMPLEX: _LoadMarshal.load_complex,
+    TYPE_DICT: _LoadMarshal.load_dict,
+    TYPE_ELLIPSIS: _LoadMarshal.load_ellipsis,
+    TYPE_FALSE: _LoadMarshal.load_false,
+    TYPE_FLOAT: _LoadMarshal.load_float,
+    TYPE_FROZENSET: _LoadMarshal.load_frozenset,
+    TYPE_INT64: _LoadMarshal.load_int64,
+    TYPE_INT: _LoadMarshal.load_int,
+    TYPE_INTERNED: _LoadMarshal.load_interned,
+    TYPE_LIST: _LoadMarshal.load_list,
+    TYPE_LONG: _LoadMarshal.load_long,
+    TYPE_NONE: _LoadMarshal.load_none,
+    TYPE_NULL: _LoadMarshal.load_null,
+    TYPE_REF: _LoadMarshal.load_ref,
+    TYPE_SET: _LoadMarshal.load_set,
+    TYPE_SHORT_ASCII: _LoadMarshal.load_short_ascii,
+    TYPE_SHORT_ASCII_INTERNED: _LoadMarshal.load_short_ascii,
+    TYPE_SMALL_TUPLE: _LoadMarshal.load_small_tuple,
+    TYPE_STOPITER: _LoadMarshal.load_stopiter,
+    TYPE_STRING: _LoadMarshal.load_string,
+    TYPE_STRINGREF: _LoadMarshal.load_stringref,
+    TYPE_TRUE: _LoadMarshal.load_true,
+    TYPE_TUPLE: _LoadMarshal.load_tuple,
+    TYPE_UNICODE: _LoadMarshal.load_unicode,
+}
+
+# Type code -> loader, as a list for fast indexing. Codes without a loader are
+# invalid.
+_DISPATCH = [_LOADERS.get(code) for code in range(REF)]
+
+
+def _from_native_code(code, python_version):
+  """Convert a types.CodeType to a CodeType."""
+  consts = tuple(_from_native_code(c, python_version)
+                 if isinstance(c, types.CodeType) else c
+                 for c in code.co_consts)
+  # Python 3.10 marshals co_linetable where older versions marshal co_lnotab.
+  lnotab = (code.co_linetable if python_version >= (3, 10)
+            else code.co_lnotab)
+  return CodeType(code.co_argcount, code.co_posonlyargcount,
+                  code.co_kwonlyargcount, code.co_nlocals, code.co_stacksize,
+                  code.co_flags, code.co_code, consts, code.co_names,
+                  code.co_varnames, code.co_filename, code.co_name,
+                  code.co_firstlineno, lnotab, code.co_freevars,
+                  code.co_cellvars, python_version)
 
 
 def loads(s, python_version):
+  """Load marshalled data written by the given Python version."""
+  if python_version == sys.version_info[:2]:
+    # Our own marshal module reads this version natively, which is much faster.
+    result = marshal.loads(s)
+    if isinstance(result, types.CodeType):
+      result = _from_native_code(result, python_version)
+    return result
   um = _LoadMarshal(s, python_version)
   result = um.load()
   if not um.eof():
@@ -1,5 +1,9 @@
 """Tests for loadmarshal.py."""
 
+import marshal
+import sys
+import textwrap
+
 from pytype.pyc import loadmarshal
 import unittest
 
@@ -167,5 +171,37 @@ class TestLoadMarshal(unittest.TestCase):
   def test_truncated_byte(self):
     self.assertRaises(EOFError, lambda: self.load(b'f'))
 
+  def test_truncated_long(self):
+    self.assertRaises(EOFError, lambda: self.load(b'i\1\2'))
+
+  def test_native(self):
+    # For the host version, loads() uses the marshal module. Check that it
+    # gives the same results as our own loader.
+    src = textwrap.dedent("""
+      def f(x, /, y=3.5, *, z=2**100):
+        return [x, y, z, -1, (1, 2), {'a': b'b'}, frozenset({1j})]
+      class C:
+        def g(self):
+          return lambda: 'ä'
+    """)
+    data = marshal.dumps(compile(src, 'test.py', 'exec'))
+    python_version = sys.version_info[:2]
+    native = self.load(data, python_version)
+    pure = loadmarshal._LoadMarshal(data, python_version).load()
+    self.assertCodeEqual(native, pure)
+
+  def assertCodeEqual(self, code1, code2):
+    self.assertIsInstance(code1, loadmarshal.CodeType)
+    self.assertIsInstance(code2, loadmarshal.CodeType)
+    for attr, value in vars(code1).items():
+      if attr != 'co_consts':
+        self.assertEqual(value, getattr(code2, attr), attr)
+    self.assertEqual(len(code1.co_consts), len(code2.co_consts))
+    for const1, const2 in zip(code1.co_consts, code2.co_consts):
+      if isinstance(const1, loadmarshal.CodeType):
+        self.assertCodeEqual(const1, const2)
+      else:
+        self.assertStrictEqual(const1, const2)
+
 if __name__ == '__main__':
   unittest.main()
@@ -62,7 +62,8 @@ def compile_src(src, filename, python_version, python_exe, mode="exec"):
   """Compile a string to pyc, and then load and parse the pyc.
 
   Args:
-    src: Python source code.
+    src: Python source code. If python_version is the host's version, this may
+      also be an ast of the source code.
     filename: The filename the sourcecode is from.
     python_version: Python version, (major, minor).
     python_exe: The path to Python interpreter.
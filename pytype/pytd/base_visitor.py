@@ -4,6 +4,7 @@ import re
 from typing import Any
 
 from pytype.pytd import pytd
+from pytype.pytd.parse import node as pytd_node
 from pytype.typegraph import cfg_utils
 
 # A convenient value for unchecked_node_classnames if a visitor wants to
@@ -122,6 +123,10 @@ class Visitor:
       constructed based on the enter/visit/leave functions and precondition
       data about legal ASTs.  As an optimization, the visitor will only visit
       nodes under which some actionable node can appear.
+    node_class_mask: A node.NodeClassMask of the node classes that have
+      enter/visit/leave functions, or None if the visitor visits all nodes.
+      As a further optimization, the visitor skips subtrees that do not
+      actually contain any of these classes.
   """
   # The old_node attribute contains a copy of the node before its children were
   # visited. It has the same type as the node currently being visited.
@@ -138,7 +143,7 @@ class Visitor:
     # The set of method names for each visitor implementation is assumed to
     # be fixed. Therefore this introspection can be cached.
     if cls in Visitor._visitor_functions_cache:
-      enter_fns, visit_fns, leave_fns, visit_class_names = (
+      enter_fns, visit_fns, leave_fns, visit_class_names, node_class_mask = (
           Visitor._visitor_functions_cache[cls])
     else:
       enter_fns = {}
@@ -187,13 +192,18 @@ class Visitor:
             raise AssertionError(f"Unknown node type: {node} {cls!r}")
       if visit_all:
         visit_class_names = ALL_NODE_NAMES
+        node_class_mask = None
+      else:
+        node_class_mask = pytd_node.NodeClassMask(
+            set(enter_fns) | set(visit_fns) | set(leave_fns))
       Visitor._visitor_functions_cache[cls] = (
-          enter_fns, visit_fns, leave_fns, visit_class_names)
+          enter_fns, visit_fns, leave_fns, visit_class_names, node_class_mask)
 
     self.enter_functions = enter_fns
     self.visit_functions = visit_fns
     self.leave_functions = leave_fns
     self.visit_class_names = visit_class_names
+    self.node_class_mask = node_class_mask
 
   def Enter(self, node, *args, **kwargs):
     return self.enter_functions[node.__class__.__name__](
@@ -22,9 +22,22 @@ from pytype import metrics
 class Node:
   """Base Node class."""
 
-  __slots__ = ()
+  # The NodeClassMask of the node classes in this subtree, set by
+  # _ContainedNodeMask. Nodes are immutable, so the mask never changes.
+  __slots__ = ("_contained_node_mask",)
 
-  _name2item: Dict[str, Any]  # Lookup cache used by module and class nodes
+  # Whether the nodes below this one may change, so that the mask cannot be
+  # cached.
+  _mutable_children = False
+
+  # Lookup cache used by module and class nodes. Those are not slots classes,
+  # so it lives in their __dict__ rather than taking a slot on every node.
+  _name2item: Dict[str, Any]  # pylint: disable=declare-non-slot
+
+  def __getstate__(self):
+    # Only used by nodes that are not attrs slots classes; the cached mask is
+    # specific to this process and is not pickled.
+    return self.__dict__
 
   def PopulateLookupCache(self, *members):
     # Instances are typically frozen attrs
@@ -105,6 +118,39 @@ class Node:
 # The set of visitor names currently being processed.
 _visiting = set()
 
+# Node class name -> bit in a NodeClassMask. Bits are assigned on first use, so
+# masks are only meaningful within one process.
+_node_class_bits = {}
+
+
+def NodeClassMask(class_names):
+  """Returns a bitmask with one bit set for each of the node class names."""
+  mask = 0
+  for name in class_names:
+    mask |= 1 << _node_class_bits.setdefault(name, len(_node_class_bits))
+  return mask
+
+
+def _ContainedNodeMask(value):
+  """Returns the NodeClassMask of the nodes in value, computed lazily."""
+  if value.__class__ is tuple:
+    mask = 0
+    for child in value:
+      mask |= _ContainedNodeMask(child)
+    return mask
+  elif not isinstance(value, Node):
+    return 0
+  try:
+    return value._contained_node_mask
+  except AttributeError:
+    pass
+  mask = NodeClassMask((value.__class__.__name__,))
+  for _, child in value.IterChildren():
+    mask |= _ContainedNodeMask(child)
+  if not value._mutable_children:
+    object.__setattr__(value, "_contained_node_mask", mask)
+  return mask
+
 
 def _Visit(node, visitor, *args, **kwargs):
   """Visit the node."""
@@ -183,6 +229,11 @@ def _VisitNode(node, visitor, *args, **kwargs):
   node_class_name = node_class.__name__
   if node_class_name not in visitor.visit_class_names:
     return node
+  if (visitor.node_class_mask is not None and
+      not node._mutable_children and
+      not _ContainedNodeMask(node) & visitor.node_class_mask):
+    # The visitor has no callbacks for any node in this subtree.
+    return node
 
   skip_children = set()
   if node_class_name in visitor.enter_functions:
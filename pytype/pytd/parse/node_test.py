@@ -260,6 +260,22 @@ class TestNode(unittest.TestCase):
     new_v_expected = "V(x=(Data(d1=1, d2=2, d3=-1), Data(d1=4, d2=5, d3=-1)))"
     self.assertEqual(repr(new_v), new_v_expected)
 
+  def test_contained_node_mask(self):
+    tree = XY(V(1), (Data(1, 2, 3),))
+    self.assertEqual(node._ContainedNodeMask(tree),
+                     node.NodeClassMask(["XY", "V", "Data"]))
+    self.assertEqual(tree.x._contained_node_mask, node.NodeClassMask(["V"]))
+
+  def test_skip_subtree(self):
+    """Test that subtrees without interesting nodes are not visited."""
+    tree = XY(X(V(1), (V(2),)), Y(Data(1, 2, 3), 4))
+    v = DataVisitor()
+    # Visitors defined in tests visit all nodes, so set the mask by hand.
+    v.node_class_mask = node.NodeClassMask(["Data"])
+    new_tree = tree.Visit(v)
+    self.assertIs(new_tree.x, tree.x)
+    self.assertEqual(new_tree.y, Y(Data(1, 2, -1), 4))
+
   def test_ordering(self):
     nodes = [Node1(True, False), Node1(1, 2),
              Node2(1, 1), Node2("2", "1"),
@@ -50,6 +50,10 @@ class Type:
   __slots__ = ()
 
 
+# The fields of a TypeDeclUnit that hold top-level definitions.
+_DEFINITION_FIELDS = ('constants', 'classes', 'functions', 'aliases')
+
+
 @attrs.frozen(slots=False, eq=False)
 class TypeDeclUnit(Node):
   """Module node. Holds module contents (constants / classes / functions).
@@ -69,7 +73,17 @@ class TypeDeclUnit(Node):
   functions: Tuple['Function', ...]
   aliases: Tuple['Alias', ...]
 
+  # The definitions of a module loaded from an indexed pickle are filled in
+  # lazily.
+  _mutable_children = True
+
   def _InitCache(self):
+    lazy_definitions = self.__dict__.get('_lazy_definitions')
+    if lazy_definitions is not None:
+      # Look up definitions without loading all of them. See
+      # serialize_ast.LazyDefinitions.
+      object.__setattr__(self, '_name2item', lazy_definitions)
+      return
     # TODO(b/159053187): Put constants, functions, classes and aliases into a
     # combined dict.
     self.PopulateLookupCache(
@@ -108,6 +122,15 @@ class TypeDeclUnit(Node):
   def __contains__(self, name):
     return bool(self.Get(name))
 
+  def __getattr__(self, name):
+    # Only called for attributes that are not set. The definitions of a module
+    # loaded from an indexed pickle are not set until they are all needed.
+    lazy_definitions = self.__dict__.get('_lazy_definitions')
+    if lazy_definitions is None or name not in _DEFINITION_FIELDS:
+      raise AttributeError(name)
+    lazy_definitions.Materialize(self)
+    return self.__dict__[name]
+
   # The hash/eq/ne values are used for caching and speed things up quite a bit.
 
   def __hash__(self):
@@ -12,6 +12,7 @@ locally or within a larger repository.
 
 import collections
 import difflib
+import hashlib
 import io
 import itertools
 import pickle
@@ -182,6 +183,23 @@ def Print(ast, multiline_args=False):
   return ast.Visit(printer.PrintVisitor(multiline_args))
 
 
+def Fingerprint(ast):
+  """Compute a hash of the interface described by a pytd node.
+
+  Nodes that print identically after canonical ordering have the same
+  fingerprint, so this can be used to tell whether a regenerated interface
+  differs from a previous one.
+
+  Args:
+    ast: A pytd node, usually a TypeDeclUnit.
+
+  Returns:
+    A hex digest string.
+  """
+  src = Print(CanonicalOrdering(ast))
+  return hashlib.sha256(src.encode("utf-8")).hexdigest()
+
+
 def MakeTypeAnnotation(ast, multiline_args=False):
   """Returns a type annotation and any added imports."""
   vis = printer.PrintVisitor(multiline_args)
@@ -250,6 +250,23 @@ class TestUtils(parser_test_base.ParserTest):
     self.assertEqual("def foo(x, y) -> Any: ...",
                      pytd_utils.Print(pytd_utils.DummyMethod("foo", "x", "y")))
 
+  def test_fingerprint(self):
+    ast1 = self.Parse("""
+      x: int
+      def f(a: str) -> None: ...
+    """)
+    ast2 = self.Parse("""
+      def f(a: str) -> None: ...
+      x: int
+    """)
+    ast3 = self.Parse("""
+      x: int
+      def f(a: bytes) -> None: ...
+    """)
+    self.assertEqual(pytd_utils.Fingerprint(ast1), pytd_utils.Fingerprint(ast2))
+    self.assertNotEqual(pytd_utils.Fingerprint(ast1),
+                        pytd_utils.Fingerprint(ast3))
+
   def test_diff_same_pickle(self):
     ast = pytd.TypeDeclUnit("foo", (), (), (), (), ())
     with test_utils.Tempdir() as d:
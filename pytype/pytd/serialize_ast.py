@@ -24,9 +24,14 @@ class FindClassTypesVisitor(visitors.Visitor):
   def __init__(self):
     super().__init__()
     self.class_type_nodes = []
+    self._seen = set()
 
   def EnterClassType(self, n):
-    self.class_type_nodes.append(n)
+    # Interned nodes appear several times in the tree but need to be indexed
+    # only once.
+    if id(n) not in self._seen:
+      self._seen.add(id(n))
+      self.class_type_nodes.append(n)
 
 
 class UndoModuleAliasesVisitor(visitors.Visitor):
@@ -65,6 +70,7 @@ class SerializableTupleClass(NamedTuple):
   class_type_nodes: Optional[List[pytd.ClassType]]
   src_path: Optional[str]
   metadata: List[str]
+  fingerprint: Optional[str] = None
 
 
 class SerializableAst(SerializableTupleClass):
@@ -86,17 +92,22 @@ class SerializableAst(SerializableTupleClass):
       set.
     src_path: Optionally, the filepath of the original source file.
     metadata: A list of arbitrary string-encoded metadata.
+    fingerprint: The pytd_utils.Fingerprint of ast, or None if it was not
+      computed.
   """
   Replace = SerializableTupleClass._replace  # pylint: disable=no-member,invalid-name
 
 
-def SerializeAst(ast, src_path=None, metadata=None):
+def SerializeAst(ast, src_path=None, metadata=None, fingerprint=False):
   """Loads and stores an ast to disk.
 
   Args:
     ast: The pytd.TypeDeclUnit to save to disk.
     src_path: Optionally, the filepath of the original source file.
     metadata: A list of arbitrary string-encoded metadata.
+    fingerprint: Whether to store the pytd_utils.Fingerprint of the ast, which
+      is needed to tell whether a later pickle has the same interface.
+      Computing it prints the whole ast, so it is off by default.
 
   Returns:
     The SerializableAst derived from `ast`.
@@ -113,18 +124,147 @@ def SerializeAst(ast, src_path=None, metadata=None):
 
   # Clean external references
   ast.Visit(visitors.ClearClassPointers())
+  ast = ast.Visit(visitors.CanonicalOrderingVisitor())
+  # Share identical subtrees, so that they are stored, loaded and resolved
+  # only once. Pickling preserves the sharing.
+  ast = ast.Visit(visitors.InternNodes())
   indexer = FindClassTypesVisitor()
   ast.Visit(indexer)
-  ast = ast.Visit(visitors.CanonicalOrderingVisitor())
 
   metadata = metadata or []
 
   return SerializableAst(
       ast, sorted(dependencies.items()), sorted(late_dependencies.items()),
       sorted(indexer.class_type_nodes), src_path=src_path, metadata=metadata,
+      fingerprint=pytd_utils.Fingerprint(ast) if fingerprint else None,
   )
 
 
+class LazyDefinitions:
+  """The top-level definitions of a module loaded from an indexed pickle.
+
+  Definitions are unpickled on first lookup. Once ProcessAst has been called
+  on the module, their ClassType pointers are filled in at the same time, so
+  that looking up a few names in a large module does not require resolving
+  the whole module. Accessing a field of the module that holds definitions
+  (e.g. by visiting it) loads all of them.
+  """
+
+  def __init__(self, index, load):
+    """Initializer.
+
+    Args:
+      index: A list of (field, name) of the definitions, in field order.
+      load: A function that takes the position of a definition in the index
+        and returns a tuple of the definition and its ClassType nodes.
+    """
+    self._index = index
+    self._positions = {name: i for i, (_, name) in enumerate(index)}
+    self._load = load
+    self._definitions = {}
+    self._type_params = {}
+    self._unit = None
+    self._class_lookup = None
+
+  def get(self, name, default=None):
+    if name in self._definitions:
+      return self._definitions[name]
+    elif name in self._type_params:
+      return self._type_params[name]
+    elif name not in self._positions:
+      return default
+    definition, class_type_nodes = self._load(self._positions[name])
+    # Store the definition before resolving it, since it might refer to itself.
+    self._definitions[name] = definition
+    if self._class_lookup:
+      definition = self._Resolve(definition, class_type_nodes)
+      self._definitions[name] = definition
+    return definition
+
+  def __getitem__(self, name):
+    item = self.get(name)
+    if item is None:
+      raise KeyError(name)
+    return item
+
+  def SetUnit(self, unit):
+    self._unit = unit
+    self._type_params = {t.full_name: t for t in unit.type_params}
+
+  def SetModuleMap(self, module_map):
+    """Resolve all definitions loaded from now on using module_map."""
+    self._class_lookup = visitors.LookupExternalTypes(
+        module_map, self_name=self._unit.name)
+    type_params = tuple(self._ResolveLoaded(t) for t in self._unit.type_params)
+    object.__setattr__(self._unit, "type_params", type_params)
+    self._type_params = {t.full_name: t for t in type_params}
+    for name, definition in list(self._definitions.items()):
+      self._definitions[name] = self._ResolveLoaded(definition)
+
+  def _ResolveLoaded(self, node):
+    indexer = FindClassTypesVisitor()
+    node.Visit(indexer)
+    return self._Resolve(node, indexer.class_type_nodes)
+
+  def _Resolve(self, definition, class_type_nodes):
+    """Fill in the ClassType pointers of a definition, like ProcessAst."""
+    if isinstance(definition, pytd.Class):
+      decorators = {d.type.name for d in definition.decorators}
+    else:
+      decorators = set()
+    try:
+      for node in class_type_nodes:
+        self._class_lookup.allow_functions = node.name in decorators
+        if node is not self._class_lookup.VisitClassType(node):
+          definition = definition.Visit(self._class_lookup)
+          class_type_nodes = None
+          break
+    except KeyError as e:
+      raise UnrestorableDependencyError(
+          f"Unresolved class: {str(e)!r}.") from e
+    local_filler = visitors.FillInLocalPointers(
+        {"": self._unit, self._unit.name: self._unit})
+    if class_type_nodes is None:
+      definition.Visit(local_filler)
+    else:
+      for node in class_type_nodes:
+        local_filler.EnterClassType(node)
+    return definition
+
+  def Materialize(self, unit):
+    """Load all definitions and store them in unit's fields."""
+    fields = {field: [] for field in pytd._DEFINITION_FIELDS}  # pylint: disable=protected-access
+    for field, name in self._index:
+      fields[field].append(self.get(name))
+    for field, definitions in fields.items():
+      object.__setattr__(unit, field, tuple(definitions))
+    # From now on, unit is an ordinary TypeDeclUnit.
+    unit.__dict__.pop("_lazy_definitions")
+    unit.__dict__.pop("_name2item", None)
+    self._load = None
+
+
+def MakeLazyAst(ast, index, load):
+  """Make the definitions of a TypeDeclUnit load lazily.
+
+  Args:
+    ast: A pytd.TypeDeclUnit without definitions, i.e., only with a name and
+      type parameters.
+    index: A list of (field, name) of the definitions, in field order.
+    load: A function that takes the position of a definition in the index and
+      returns a tuple of the definition and its ClassType nodes.
+
+  Returns:
+    ast, whose definitions will be loaded on demand.
+  """
+  lazy_definitions = LazyDefinitions(index, load)
+  lazy_definitions.SetUnit(ast)
+  for field in pytd._DEFINITION_FIELDS:  # pylint: disable=protected-access
+    ast.__dict__.pop(field)
+  object.__setattr__(ast, "_lazy_definitions", lazy_definitions)
+  return ast
+
+
 def EnsureAstName(ast, module_name, fix=False):
   """Verify that serializable_ast has the name module_name, or repair it.
 
@@ -174,6 +314,12 @@ def ProcessAst(serializable_ast, module_map):
     UnrestorableDependencyError: If no concrete module exists in module_map for
       one of the references from the pickled ast.
   """
+  lazy_definitions = serializable_ast.ast.__dict__.get("_lazy_definitions")
+  if lazy_definitions is not None:
+    # Defer resolving the definitions of a lazily loaded ast until they are
+    # looked up.
+    lazy_definitions.SetModuleMap(module_map)
+    return serializable_ast.ast
   # Module external and internal references need to be filled in different
   # steps. As a part of a local ClassType referencing an external cls, might be
   # changed structurally, if the external class definition used here is
@@ -112,6 +112,20 @@ class SerializeAstTest(test_base.UnitTest):
           dict(serialized_ast.dependencies),
           ["builtins", "foo.bar.module1", "module2", "queue"])
 
+  def test_intern_nodes(self):
+    with test_utils.Tempdir() as d:
+      module_name = "module1"
+      pickled_ast_filename = path_utils.join(d.path, "module1.pyi.pickled")
+      module_map = self._store_ast(d, module_name, pickled_ast_filename)
+      serialized_ast = pickle_utils.LoadPickle(pickled_ast_filename)
+      class_type_ids = [id(n) for n in serialized_ast.class_type_nodes]
+      self.assertEqual(len(class_type_ids), len(set(class_type_ids)))
+      ast = serialize_ast.ProcessAst(serialized_ast, module_map)
+    x = ast.Lookup("module1.x")
+    b = ast.Lookup("module1.b")
+    self.assertIs(x.type, b.type)
+    self.assertIsNotNone(x.type.base_type.cls)
+
   def test_unrestorable_child(self):
     # Assume .cls in a ClassType X in module1 was referencing something for
     # which, Visitors.LookupExternalTypes returned AnythingType.
@@ -302,5 +316,14 @@ class SerializeAstTest(test_base.UnitTest):
       serialized_ast = pickle_utils.LoadPickle(pickled_ast_filename)
       self.assertSequenceEqual(serialized_ast.metadata, ["meta", "data"])
 
+  def test_fingerprint(self):
+    with test_utils.Tempdir() as d:
+      ast, _ = self._get_ast(temp_dir=d, module_name="module1")
+    # The fingerprint is expensive, so it is only computed on request.
+    self.assertIsNone(serialize_ast.SerializeAst(ast).fingerprint)
+    self.assertEqual(
+        serialize_ast.SerializeAst(ast, fingerprint=True).fingerprint,
+        pytd_utils.Fingerprint(ast))
+
 if __name__ == "__main__":
   unittest.main()
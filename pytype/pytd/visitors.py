@@ -1845,6 +1845,41 @@ class ClearClassPointers(Visitor):
     node.cls = None
 
 
+class InternNodes(Visitor):
+  """Make structurally identical nodes share a single object.
+
+  Nodes are compared by class and children rather than with __eq__, which
+  ignores the order of union members and the .cls pointers of ClassType nodes.
+  Since the .cls pointers are ignored, all ClassType nodes with the same name
+  become one object, so this should only be applied to trees whose pointers
+  are cleared or all point into the same loader.
+  """
+
+  visits_all_node_types = True
+
+  def __init__(self):
+    super().__init__()
+    # (node class, child keys) -> node. Child nodes are keyed by id, which is
+    # safe because the interned nodes are kept alive by this dict.
+    self._nodes = {}
+
+  def _Key(self, value):
+    if isinstance(value, pytd.Node):
+      return id(value)
+    elif isinstance(value, tuple):
+      return tuple(self._Key(v) for v in value)
+    else:
+      return (type(value), value)
+
+  def Visit(self, node):
+    if isinstance(node, pytd.TypeDeclUnit):
+      return node
+    # Children are visited first, so they have already been interned.
+    key = (node.__class__,
+           tuple(self._Key(child) for _, child in node.IterChildren()))
+    return self._nodes.setdefault(key, node)
+
+
 class ReplaceModulesWithAny(_RemoveTypeParametersFromGenericAny):
   """Replace all references to modules in a list with AnythingType."""
 
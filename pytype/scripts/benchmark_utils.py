@@ -0,0 +1,47 @@
+"""Utilities shared by the benchmark scripts."""
+
+import os
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+
+def find_files(paths: Iterable[str], extensions: Tuple[str, ...],
+               exclude: Tuple[str, ...] = ()) -> Iterator[str]:
+  """Yield the files under the given paths.
+
+  Args:
+    paths: Files, which are yielded as is, and directories, which are searched
+      recursively.
+    extensions: The extensions of the files to yield from directories.
+    exclude: Basenames of files not to yield from directories.
+
+  Yields:
+    Filenames, in sorted order within each directory.
+  """
+  for path in paths:
+    if os.path.isdir(path):
+      for root, _, files in os.walk(path):
+        for f in sorted(files):
+          if f.endswith(extensions) and f not in exclude:
+            yield os.path.join(root, f)
+    else:
+      yield path
+
+
+def best_time(fn: Callable[[], Any], repeat: int) -> Tuple[float, List[Any]]:
+  """Call fn repeat times.
+
+  Args:
+    fn: The function to time.
+    repeat: The number of calls, at least one.
+
+  Returns:
+    A tuple of the shortest run time in seconds and the results of all calls.
+  """
+  best = float("inf")
+  results = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    results.append(fn())
+    best = min(best, time.perf_counter() - start)
+  return best, results
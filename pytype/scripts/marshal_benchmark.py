@@ -0,0 +1,96 @@
+"""Measure how fast pytype reads pyc files for every supported Python version.
+
+Usage:
+  python -m pytype.scripts.marshal_benchmark [-n N] [-V VERSION...] [PATH...]
+
+Every PATH is a Python file or a directory that is searched recursively for
+.py files; the default is the pytype source tree. Every file is compiled for
+each Python version (3.7 and up, by default) for which an interpreter is found,
+and the script reports how long loadmarshal.loads takes to read the compiled
+code of all files, taking the best of N runs. When the version is that of the
+host, loadmarshal uses the stdlib marshal module; the column for the pure
+Python decoder shows what the other versions cost.
+"""
+
+import argparse
+import sys
+
+from pytype import utils
+from pytype.platform_utils import path_utils
+from pytype.pyc import compiler
+from pytype.pyc import loadmarshal
+from pytype.scripts import benchmark_utils
+
+_PYTYPE_DIR = path_utils.dirname(path_utils.dirname(
+    path_utils.abspath(__file__)))
+_VERSIONS = ("3.7", "3.8", "3.9", "3.10")
+# compile_bytecode.write_pyc writes a 12-byte header before the marshal data.
+_HEADER_SIZE = 12
+
+
+def _compile(filenames, python_version):
+  """Compile the files, returning their marshal data."""
+  python_exe = compiler.get_python_executable(python_version)
+  corpus = []
+  for filename in filenames:
+    with open(filename, encoding="utf-8") as f:
+      src = f.read()
+    try:
+      pyc_data = compiler.compile_src_string_to_pyc_string(
+          src, filename, python_version, python_exe)
+    except compiler.CompileError:
+      continue  # e.g., syntax that this version does not support yet
+    corpus.append(pyc_data[_HEADER_SIZE:])
+  return corpus
+
+
+def _time(load, corpus, python_version, repeat):
+  def load_all():
+    for data in corpus:
+      load(data, python_version)
+  return benchmark_utils.best_time(load_all, repeat)[0]
+
+
+def _load_pure(data, python_version):
+  return loadmarshal._LoadMarshal(data, python_version).load()  # pylint: disable=protected-access
+
+
+def run(paths, versions, repeat):
+  """Compile and load the corpus for every version."""
+  filenames = list(benchmark_utils.find_files(paths, (".py",)))
+  if not filenames:
+    print("No Python files found.", file=sys.stderr)
+    return 1
+  print(f"{len(filenames)} files, best of {repeat} runs")
+  print(f"{'version':8} {'files':>6} {'size (MB)':>10} {'loads (s)':>10} "
+        f"{'pure (s)':>9} {'pure (MB/s)':>12}")
+  for version in versions:
+    python_version = utils.version_from_string(version)
+    try:
+      corpus = _compile(filenames, python_version)
+    except compiler.PythonNotFoundError:
+      print(f"{version:8} no interpreter found")
+      continue
+    size = sum(len(data) for data in corpus) / 2**20
+    loads = _time(loadmarshal.loads, corpus, python_version, repeat)
+    pure = _time(_load_pure, corpus, python_version, repeat)
+    print(f"{version:8} {len(corpus):6} {size:10.2f} {loads:10.3f} "
+          f"{pure:9.3f} {size / pure:12.2f}")
+  return 0
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Measure how fast pytype reads pyc files.")
+  parser.add_argument("paths", nargs="*", default=[_PYTYPE_DIR],
+                      help="Python files or directories (default: pytype).")
+  parser.add_argument("-V", "--python-version", dest="versions",
+                      action="append", help="Python version (repeatable).")
+  parser.add_argument("-n", "--repeat", type=int, default=3,
+                      help="Number of runs.")
+  args = parser.parse_args()
+  sys.exit(run(args.paths, args.versions or _VERSIONS, args.repeat))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,80 @@
+"""Measure the peak memory use of pytype on a corpus of Python files.
+
+Usage:
+  python -m pytype.scripts.memory_benchmark [-n N] [PATH...] [-- PYTYPE_ARGS]
+
+Every PATH is a Python file or a directory that is searched recursively for
+.py files; the default is the pytype/test_data corpus. Every file is checked by
+pytype-single in a process of its own, and the script reports the peak resident
+set size (RSS) of that process and the time it took, taking the best of N runs.
+Files that pytype reports errors for are still measured. PYTYPE_ARGS are
+passed on to pytype-single.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from pytype.platform_utils import path_utils
+from pytype.scripts import benchmark_utils
+
+_TEST_DATA = path_utils.join(path_utils.dirname(path_utils.dirname(
+    path_utils.abspath(__file__))), "test_data")
+
+
+def _measure(filename, pytype_args):
+  """Check filename in a new process, returning its peak RSS."""
+  cmd = [sys.executable, "-m", "pytype.single", "--check",
+         "--python_version", "{}.{}".format(*sys.version_info[:2]),
+         *pytype_args, filename]
+  proc = subprocess.Popen(
+      cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  _, _, rusage = os.wait4(proc.pid, 0)
+  # ru_maxrss is in kilobytes on Linux but in bytes on macOS.
+  scale = 1 if sys.platform == "darwin" else 1024
+  return rusage.ru_maxrss * scale
+
+
+def run(paths, repeat, pytype_args):
+  """Measure every file under paths."""
+  filenames = list(benchmark_utils.find_files(
+      paths, (".py",), exclude=("__init__.py",)))
+  if not filenames:
+    print("No Python files found.", file=sys.stderr)
+    return 1
+  print(f"best of {repeat} runs")
+  print(f"{'file':40} {'peak RSS (MB)':>14} {'time (s)':>10}")
+  max_rss = 0
+  total_time = 0.0
+  for filename in filenames:
+    elapsed, results = benchmark_utils.best_time(
+        lambda f=filename: _measure(f, pytype_args), repeat)
+    rss = min(results)
+    max_rss = max(max_rss, rss)
+    total_time += elapsed
+    name = os.path.relpath(filename)
+    print(f"{name[-40:]:40} {rss / 2**20:14.1f} {elapsed:10.2f}")
+  print(f"{'max / total':40} {max_rss / 2**20:14.1f} {total_time:10.2f}")
+  return 0
+
+
+def main():
+  argv = sys.argv[1:]
+  if "--" in argv:
+    pytype_args = argv[argv.index("--") + 1:]
+    argv = argv[:argv.index("--")]
+  else:
+    pytype_args = []
+  parser = argparse.ArgumentParser(
+      description="Measure the peak memory use of pytype.")
+  parser.add_argument("paths", nargs="*", default=[_TEST_DATA],
+                      help="Python files or directories (default: test_data).")
+  parser.add_argument("-n", "--repeat", type=int, default=1,
+                      help="Number of runs per file.")
+  args = parser.parse_args(argv)
+  sys.exit(run(args.paths, args.repeat, pytype_args))
+
+
+if __name__ == "__main__":
+  main()
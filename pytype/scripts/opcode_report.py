@@ -0,0 +1,94 @@
+"""Report where analysis time goes, from --profile-opcodes metrics.
+
+Usage:
+  python -m pytype.scripts.opcode_report [--by KEY] [--sort FIELD] [-n N]
+      FILE...
+
+Every FILE is a metrics file written by pytype-single with
+--profile-opcodes --metrics FILE, e.g., one per module of a project. The
+profiles in all files are merged, and the opcodes with the highest cost are
+listed, either per opcode and source line or aggregated per opcode name or per
+source file.
+
+The cumulative columns (wall, cpu, bindings) include the cost of everything that
+ran while an opcode was executing, such as the body of a function that a CALL
+opcode analyzed; the self_ columns exclude nested opcodes.
+"""
+
+import argparse
+import collections
+import sys
+
+from pytype import metrics
+
+_PROFILE = "vm_opcode_profile"
+
+# Column name in the report -> field of metrics.MapProfile.
+_COLUMNS = {
+    "calls": "calls",
+    "wall": "wall",
+    "cpu": "cpu",
+    "bindings": "count",
+    "self_wall": "self_wall",
+    "self_cpu": "self_cpu",
+    "self_bindings": "self_count",
+}
+
+
+def _group(key, by):
+  opcode, location = key.split(" ", 1)
+  if by == "opcode":
+    return opcode
+  elif by == "file":
+    return location.rsplit(":", 1)[0]
+  else:
+    return key
+
+
+def load(filenames):
+  """Merge the opcode profiles in the given metrics files."""
+  for filename in filenames:
+    with open(filename) as f:
+      metrics.merge_from_file(f)
+  return metrics.get_metric(_PROFILE, metrics.MapProfile).entries()
+
+
+def report(entries, by, sort, limit):
+  """Format the most costly entries as a table."""
+  rows = collections.defaultdict(lambda: dict.fromkeys(_COLUMNS, 0))
+  for key, entry in entries.items():
+    row = rows[_group(key, by)]
+    for column, field in _COLUMNS.items():
+      row[column] += entry[field]
+  ordered = sorted(rows.items(), key=lambda item: item[1][sort], reverse=True)
+  lines = [f"{'calls':>9} {'wall':>9} {'cpu':>9} {'bindings':>9} "
+           f"{'self_wall':>9} {'self_cpu':>9} {'self_bind':>9}  {by}"]
+  for name, row in ordered[:limit]:
+    lines.append(
+        f"{row['calls']:9} {row['wall']:9.3f} {row['cpu']:9.3f} "
+        f"{row['bindings']:9} {row['self_wall']:9.3f} {row['self_cpu']:9.3f} "
+        f"{row['self_bindings']:9}  {name}")
+  return "\n".join(lines)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Report the cost of opcodes from --profile-opcodes metrics.")
+  parser.add_argument("files", nargs="+", help="Metrics files.")
+  parser.add_argument("--by", choices=("line", "opcode", "file"),
+                      default="line", help="How to group opcodes.")
+  parser.add_argument("--sort", choices=list(_COLUMNS), default="self_cpu",
+                      help="Column to sort by, descending.")
+  parser.add_argument("-n", "--limit", type=int, default=30,
+                      help="Number of rows to show.")
+  args = parser.parse_args()
+  entries = load(args.files)
+  if not entries:
+    print(f"No {_PROFILE} data found; was pytype run with --profile-opcodes?",
+          file=sys.stderr)
+    sys.exit(1)
+  print(report(entries, args.by, args.sort, args.limit))
+
+
+if __name__ == "__main__":
+  main()
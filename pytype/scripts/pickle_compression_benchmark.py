@@ -0,0 +1,73 @@
+"""Compare pickle compression codecs on a corpus of pickled pyi files.
+
+Usage:
+  python -m pytype.scripts.pickle_compression_benchmark [-n N] PATH...
+
+Every PATH is a pickled file or a directory that is searched recursively for
+files ending in .pickled or .pickle. The files may be written with any codec.
+Indexed pickles are skipped; every other file is re-encoded with every codec in
+pickle_utils.COMPRESSION_CODECS. For every codec, the script reports the total
+size, the time to write all files and the time to load (read, decompress and
+unpickle) all files, taking the best of N runs.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from pytype.imports import pickle_utils
+from pytype.scripts import benchmark_utils
+
+
+def run(paths, repeat):
+  """Benchmark all codecs on the pickles under paths."""
+  corpus = []
+  for filename in benchmark_utils.find_files(paths, (".pickled", ".pickle")):
+    try:
+      data = pickle_utils.LoadPickle(filename)
+    except (OSError, pickle_utils.LoadPickleError) as e:
+      print(f"Skipping {filename}: {e}", file=sys.stderr)
+      continue
+    ast = getattr(data, "ast", None)
+    if ast is not None and "_lazy_definitions" in vars(ast):
+      print(f"Skipping indexed pickle {filename}", file=sys.stderr)
+      continue
+    corpus.append(data)
+  if not corpus:
+    print("No pickles found.", file=sys.stderr)
+    return 1
+  print(f"{len(corpus)} pickles, best of {repeat} runs")
+  print(f"{'codec':8} {'size (KiB)':>12} {'write (s)':>10} {'load (s)':>10}")
+  with tempfile.TemporaryDirectory() as d:
+    for codec in (None,) + pickle_utils.COMPRESSION_CODECS:
+      filenames = [os.path.join(d, f"{i}.pickled") for i in range(len(corpus))]
+
+      def write(codec=codec, filenames=filenames):
+        for data, filename in zip(corpus, filenames):
+          pickle_utils.SavePickle(data, filename, compression=codec)
+
+      def load(filenames=filenames):
+        for filename in filenames:
+          pickle_utils.LoadPickle(filename)
+
+      write_time, _ = benchmark_utils.best_time(write, repeat)
+      load_time, _ = benchmark_utils.best_time(load, repeat)
+      size = sum(os.path.getsize(f) for f in filenames)
+      print(f"{codec or 'raw':8} {size / 1024:12.1f} {write_time:10.3f} "
+            f"{load_time:10.3f}")
+  return 0
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Compare pickle compression codecs.")
+  parser.add_argument("paths", nargs="+", help="Pickled files or directories.")
+  parser.add_argument("-n", "--repeat", type=int, default=3,
+                      help="Number of runs per codec.")
+  args = parser.parse_args()
+  sys.exit(run(args.paths, args.repeat))
+
+
+if __name__ == "__main__":
+  main()
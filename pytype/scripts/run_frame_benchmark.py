@@ -0,0 +1,137 @@
+"""Benchmark the analysis of functions with many branches.
+
+Usage:
+  python -m pytype.scripts.run_frame_benchmark [-n N] [-s SIZE...] [CASE...]
+
+Every CASE is a generated function modelled on a common kind of branchy code,
+such as an if/elif dispatch table or a big match statement, with SIZE arms.
+The script checks a module containing the function and a call to it, and
+reports the time that takes (the best of N runs), and the number of CFG nodes
+and variables that the analysis created. Most of this time is spent in
+vm.run_frame merging the frame states of the branches at their join points.
+"""
+
+import argparse
+import sys
+import textwrap
+
+from pytype import analyze
+from pytype import config
+from pytype import io
+from pytype import load_pytd
+from pytype.scripts import benchmark_utils
+
+
+def _if_elif(size):
+  arms = "".join(f"""
+  elif op == "op{i}":
+    result = x * {i} + y""" for i in range(1, size))
+  return f"""
+def dispatch(op, x, y):
+  if op == "op0":
+    result = x + y{arms}
+  else:
+    raise ValueError(op)
+  return result
+dispatch("op1", 1, 2)
+"""
+
+
+def _match(size):
+  cases = "".join(f"""
+    case "op{i}":
+      return x * {i}""" for i in range(size))
+  return f"""
+def dispatch(op, x):
+  match op:{cases}
+    case _:
+      return None
+dispatch("op1", 1)
+"""
+
+
+def _conditional_list(size):
+  # Every item is a branch that is taken while the previous items are on the
+  # data stack.
+  items = ", ".join(f"x if flags[{i}] else str(x)" for i in range(size))
+  return f"""
+def row(flags, x):
+  return [{items}]
+row([True], 1)
+"""
+
+
+def _loop(size):
+  arms = "".join(f"""
+    elif item == {i}:
+      total += {i}""" for i in range(1, size))
+  return f"""
+def scan(items):
+  total = 0
+  for item in items:
+    if item == 0:
+      continue{arms}
+    else:
+      break
+  return total
+scan([1, 2, 3])
+"""
+
+
+_CASES = {
+    "if_elif": _if_elif,
+    "match": _match,
+    "conditional_list": _conditional_list,
+    "loop": _loop,
+}
+
+
+def _check(src, options):
+  """Check src, returning the context it was analyzed in."""
+  loader = load_pytd.create_loader(options)
+  ctx = analyze.make_context(options, loader, deep=True)
+  io.check_py(src, options=options, loader=loader, ctx=ctx)
+  return ctx
+
+
+def run(cases, sizes, repeat):
+  """Benchmark the given cases at the given sizes."""
+  options = config.Options.create(
+      python_version=sys.version_info[:2], check=True)
+  if sys.version_info[:2] < (3, 10) and "match" in cases:
+    print("Skipping match, which needs Python 3.10", file=sys.stderr)
+    cases = [c for c in cases if c != "match"]
+  print(f"best of {repeat} runs")
+  print(f"{'case':18} {'size':>6} {'time (s)':>10} {'nodes':>8} "
+        f"{'variables':>10}")
+  for case in cases:
+    for size in sizes:
+      src = textwrap.dedent(_CASES[case](size))
+      best, ctxs = benchmark_utils.best_time(
+          lambda src=src: _check(src, options), repeat)
+      ctx = ctxs[-1]
+      print(f"{case:18} {size:6} {best:10.3f} "
+            f"{len(ctx.program.cfg_nodes):8} "
+            f"{ctx.program.next_variable_id:10}")
+  return 0
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description="Benchmark the analysis of branchy functions.")
+  parser.add_argument("cases", nargs="*", default=list(_CASES),
+                      help=f"Cases to run, from {', '.join(_CASES)} "
+                      "(default: all).")
+  parser.add_argument("-s", "--sizes", type=int, nargs="+",
+                      default=[25, 50, 100], help="Number of branches.")
+  parser.add_argument("-n", "--repeat", type=int, default=3,
+                      help="Number of runs per case and size.")
+  args = parser.parse_args()
+  unknown = [c for c in args.cases if c not in _CASES]
+  if unknown:
+    parser.error(f"unknown cases: {', '.join(unknown)}")
+  sys.exit(run(args.cases, args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+  main()
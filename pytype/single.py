@@ -16,7 +16,6 @@ from pytype import io
 from pytype import load_pytd
 from pytype import metrics
 from pytype import utils
-from pytype.imports import typeshed
 
 
 log = logging.getLogger(__name__)
@@ -47,13 +46,7 @@ class _ProfileContext:
 
 def _generate_builtins_pickle(options):
   """Create a pickled file with the standard library (typeshed + builtins)."""
-  loader = load_pytd.create_loader(options)
-  t = typeshed.Typeshed()
-  module_names = t.get_all_module_names(options.python_version)
-  blacklist = set(t.blacklisted_modules())
-  for m in sorted(module_names):
-    if m not in blacklist:
-      loader.import_name(m)
+  loader = load_pytd.create_stdlib_loader(options)
   loader.save_to_pickle(options.generate_builtins)
 
 
@@ -80,14 +73,37 @@ def main():
   if options.timeout is not None and sys.platform != "win32":
     signal.alarm(options.timeout)
 
+  return run(options)
+
+
+def run(options, loader=None):
+  """Run pytype with profiling and metrics collection set up from options.
+
+  Callers that keep pytype in a long-lived process (e.g. the analyze_project
+  worker pool or the pytype daemon) use this directly, bypassing command-line
+  handling.
+
+  Args:
+    options: A config.Options object.
+    loader: Optionally, the load_pytd.Loader to analyze the input file with.
+
+  Returns:
+    An error code (0 means no error).
+  """
+  if options.metrics:
+    # A long-lived process may already have analyzed other modules. Only
+    # report the metrics of this run.
+    metrics.reset()
   with _ProfileContext(options.profile):
     with metrics.MetricsContext(options.metrics, options.open_function):
-      with metrics.StopWatch("total_time"):
-        with metrics.Snapshot("memory", enabled=options.memory_snapshots):
-          return _run_pytype(options)
+      # Reuse the metrics if a long-lived process has already called run().
+      with metrics.get_metric("total_time", metrics.StopWatch):
+        with metrics.get_metric("memory", metrics.Snapshot,
+                                enabled=options.memory_snapshots):
+          return _run_pytype(options, loader)
 
 
-def _run_pytype(options):
+def _run_pytype(options, loader=None):
   """Run pytype with the given configuration options."""
   if options.generate_builtins:
     return _generate_builtins_pickle(options)
@@ -95,7 +111,7 @@ def _run_pytype(options):
     unused_ast = io.parse_pyi(options)
     return 0
   else:
-    return io.process_one_file(options)
+    return io.process_one_file(options, loader)
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ import textwrap
 
 from pytype import config
 from pytype import file_utils
+from pytype import metrics
 from pytype import single
 from pytype import utils
 from pytype.imports import builtin_stubs
@@ -200,6 +201,22 @@ class PytypeTest(test_base.UnitTest):
     single._run_pytype(options)
     self.assertTrue(path_utils.isfile(outfile))
 
+  def test_run_metrics(self):
+    """Test that each run writes only its own metrics."""
+    infile = self._tmp_path("input.py")
+    with open(infile, "w") as f:
+      f.write("def f(x): return [x]\nf(0)\n")
+    opcodes = []
+    for i in range(2):
+      metrics_file = self._tmp_path(f"metrics{i}")
+      options = config.Options.create(infile, metrics=metrics_file)
+      self.assertEqual(single.run(options), 0)
+      with open(metrics_file) as f:
+        loaded = {m.name: m for m in metrics.load_all(f)}
+      opcodes.append(str(loaded["vm_opcode"]))
+      self.assertGreater(loaded["total_time"]._total, 0)  # pylint: disable=protected-access
+    self.assertEqual(opcodes[0], opcodes[1])
+
   @test_base.skip("flaky; see b/195678773")
   def test_pickled_file_stableness(self):
     # Tests that the pickled format is stable under a constant PYTHONHASHSEED.
@@ -23,6 +23,10 @@ FrameType = Union["SimpleFrame", "Frame"]
 # This should be context.Context, which can't be imported due to a circular dep.
 _ContextType = Any
 
+# Counts the data stack entries of merged states, by whether they had to be
+# pasted into the target state or were already shared with it.
+_merge_counter = metrics.MapCounter("state_merge")
+
 
 class FrameState(utils.ContextWeakrefMixin):
   """Immutable state object, for attaching to opcodes."""
@@ -151,10 +155,16 @@ class FrameState(utils.ContextWeakrefMixin):
       return self
     assert len(self.data_stack) == len(other.data_stack)
     assert len(self.block_stack) == len(other.block_stack)
-    both = list(zip(self.data_stack, other.data_stack))
-    if any(v1 is not v2 for v1, v2 in both):
-      for v, o in both:
-        o.PasteVariable(v, None)
+    # States share their (immutable) stacks until an opcode changes them, so
+    # at a join point most entries are the same variable on both sides, and
+    # pasting a variable into itself would add nothing.
+    if self.data_stack is not other.data_stack:
+      for v, o in zip(self.data_stack, other.data_stack):
+        if v is o:
+          _merge_counter.inc("shared")
+        else:
+          _merge_counter.inc("pasted")
+          o.PasteVariable(v, None)
     if self.node is not other.node:
       self.node.ConnectTo(other.node)
       return FrameState(other.data_stack, self.block_stack, other.node,
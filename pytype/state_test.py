@@ -154,5 +154,51 @@ class RestrictConditionTest(ConditionTestBase):
                        a=a, b=b, c=c, x=x, y=y)
 
 
+class FakeContext:
+  pass
+
+
+class MergeIntoTest(unittest.TestCase):
+  """Tests for FrameState.merge_into."""
+
+  def setUp(self):
+    super().setUp()
+    self._program = cfg.Program()
+    self._ctx = FakeContext()
+    self._root = self._program.NewCFGNode("root")
+
+  def new_state(self, data_stack, node):
+    return state.FrameState(data_stack, (), node, self._ctx, False, None)
+
+  def test_merge(self):
+    shared = self._program.NewVariable([1], [], self._root)
+    node1 = self._root.ConnectNew("node1")
+    node2 = self._root.ConnectNew("node2")
+    join = node2.ConnectNew("join")
+    var1 = self._program.NewVariable(["a"], [], node1)
+    var2 = self._program.NewVariable(["b"], [], node2)
+    merged = self.new_state((shared, var1), node1).merge_into(
+        self.new_state((shared, var2), join))
+    self.assertIs(merged.node, join)
+    self.assertIn(join, node1.outgoing)
+    self.assertEqual(merged.data_stack, (shared, var2))
+    self.assertCountEqual(var2.data, ["a", "b"])
+    self.assertEqual(shared.data, [1])
+    self.assertEqual(len(shared.bindings[0].origins), 1)
+
+  def test_merge_shared_stack(self):
+    var = self._program.NewVariable([1], [], self._root)
+    node = self._root.ConnectNew("node")
+    data_stack = (var,)
+    merged = self.new_state(data_stack, self._root).merge_into(
+        self.new_state(data_stack, node))
+    self.assertIs(merged.data_stack, data_stack)
+    self.assertEqual(var.data, [1])
+
+  def test_merge_into_nothing(self):
+    s = self.new_state((), self._root)
+    self.assertIs(s.merge_into(None), s)
+
+
 if __name__ == "__main__":
   unittest.main()
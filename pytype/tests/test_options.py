@@ -1,6 +1,9 @@
 """Tests for the options you can configure the VM with."""
 
+import os
+
 from pytype.tests import test_base
+from pytype.tests import test_utils
 
 
 class OptionsTest(test_base.BaseTest):
@@ -119,6 +122,153 @@ class OptionsTest(test_base.BaseTest):
         foo.get_bar()
     """, deep=False, maximum_depth=3, init_maximum_depth=4)
 
+  def test_call_summary_depth(self):
+    self.ConfigureOptions(call_summary_depth=2)
+    self.Check("""
+      from typing import List
+      def f(x):
+        return [x]
+      assert_type(f(1), List[int])
+      assert_type(f(2), List[int])
+      assert_type(f(""), List[str])
+      assert_type(f([1]), List[List[int]])
+      assert_type(f([""]), List[List[str]])
+    """)
+
+  def test_call_summary_depth_attribute_side_effect(self):
+    self.ConfigureOptions(call_summary_depth=1)
+    self.Check("""
+      class A:
+        def set_x(self):
+          self.x = 1
+      def f(a):
+        a.set_x()
+      a1 = A()
+      a2 = A()
+      f(a1)
+      f(a2)
+      assert_type(a2.x, int)
+    """)
+
+  def test_call_summary_depth_type_parameter_side_effect(self):
+    self.ConfigureOptions(call_summary_depth=1)
+    errors = self.CheckWithErrors("""
+      from typing import List
+      def g(lst):
+        lst.append("s")
+      def h() -> List[int]:
+        x = [1]
+        y = [2]
+        g(x)
+        g(y)
+        return y  # bad-return-type[e]
+    """)
+    self.assertErrorRegexes(errors, {"e": r"List\[str\]"})
+
+  def test_call_summary_depth_constant(self):
+    self.ConfigureOptions(call_summary_depth=1)
+    self.Check("""
+      def f(x):
+        if x == 0:
+          return None
+        return ""
+      assert_type(f(0), None)
+      assert_type(f(1), str)
+    """)
+
+  def test_function_summaries(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("foo.pyi", """
+        from typing import Any
+        def f(x) -> Any: ...
+      """)
+      d.create_file("foo.pyi.summary", """
+        def f(x: int) -> int: ...
+      """)
+      self.ConfigureOptions(function_summaries=True)
+      self.Check("""
+        import foo
+        from typing import Any
+        assert_type(foo.f(0), int)
+        assert_type(foo.f(""), Any)
+      """, pythonpath=[d.path])
+
+  def test_no_function_summaries(self):
+    with test_utils.Tempdir() as d:
+      d.create_file("foo.pyi", """
+        from typing import Any
+        def f(x) -> Any: ...
+      """)
+      d.create_file("foo.pyi.summary", """
+        def f(x: int) -> int: ...
+      """)
+      self.Check("""
+        import foo
+        from typing import Any
+        assert_type(foo.f(0), Any)
+      """, pythonpath=[d.path])
+
+  def test_function_budget(self):
+    self.ConfigureOptions(function_budget=30)
+    ty, errors = self.InferWithErrors("""
+      def f(x):  # analysis-budget-exceeded[e]
+        y = [x]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        return y
+      def g(x) -> int:  # analysis-budget-exceeded
+        y = [x]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        y = [y, y]
+        return len(y)
+      def h(x: int):
+        return [x]
+      a = f(0)
+      b = g(0)
+      c = h(0)
+    """)
+    self.assertTypesMatchPytd(ty, """
+      from typing import Any, List
+      a: Any
+      b: int
+      c: List[int]
+      def f(x) -> Any: ...
+      def g(x) -> int: ...
+      def h(x: int) -> List[int]: ...
+    """)
+    self.assertErrorRegexes(errors, {"e": r"f.*budget"})
+
+  def test_bytecode_cache(self):
+    with test_utils.Tempdir() as d:
+      self.ConfigureOptions(bytecode_cache=d.path)
+      # Analyze the code twice, once to fill the cache and once to use it.
+      for _ in range(2):
+        ty, errors = self.InferWithErrors("""
+          from typing import List
+          def f(x: List[int]):
+            y = x  # type: List[str]  # annotation-type-mismatch
+            # type: int  # ignored-type-comment[e]
+            return [(1, 2), (3, 4)]
+        """)
+        self.assertTypesMatchPytd(ty, """
+          from typing import List, Tuple
+          def f(x: List[int]) -> List[Tuple[int, int]]: ...
+        """)
+        self.assertErrorRegexes(errors, {"e": r"int"})
+      self.assertTrue(os.listdir(d.path))
+
 
 if __name__ == "__main__":
   test_base.main()
@@ -0,0 +1,92 @@
+"""Content-hash cache of analyze_project results.
+
+A build statement's cache key is a hash of the pytype version, the
+pytype-single command (which contains all options that affect the output), and
+the contents of the module's source, its imports file and the generated
+interfaces (and function summaries, if any) of its dependencies. A statement
+does not need to be re-run if its key and the hash of its output match what
+was recorded after its last successful run, so a module is re-analyzed only
+when its own source or the interface of one of its dependencies actually
+changed, not whenever a file is touched.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, Optional
+
+from pytype import __version__
+from pytype import file_utils
+from pytype.imports import function_summaries
+
+
+class BuildCache:
+  """A persistent map from build outputs to the keys they were built with."""
+
+  def __init__(self, filename):
+    self.filename = filename
+    # output -> {'key': cache key, 'output_hash': hash of the output}
+    self._entries: Dict[str, Dict[str, str]] = {}
+    self._file_hashes: Dict[str, Optional[str]] = {}
+    try:
+      with open(filename) as f:
+        self._entries = json.load(f)
+    except (OSError, ValueError):
+      pass
+
+  def file_hash(self, path) -> Optional[str]:
+    if path not in self._file_hashes:
+      self._file_hashes[path] = file_utils.hash_file(path)
+    return self._file_hashes[path]
+
+  def compute_key(self, stmt, command: str) -> Optional[str]:
+    """Computes the cache key of a build statement.
+
+    Args:
+      stmt: A worker_pool.BuildStatement.
+      command: The full command line of the statement.
+
+    Returns:
+      The key, or None if one of the statement's inputs is missing.
+    """
+    h = hashlib.sha256()
+    for part in (__version__.__version__, command):
+      h.update(part.encode('utf-8') + b'\0')
+    for path in (stmt.input, stmt.imports) + stmt.deps:
+      file_hash = self.file_hash(path)
+      if file_hash is None:
+        return None
+      h.update(f'{path}\0{file_hash}\0'.encode('utf-8'))
+    for dep in stmt.deps:
+      path = function_summaries.get_summary_path(dep)
+      summary_hash = self.file_hash(path)
+      if summary_hash is not None:
+        h.update(f'{path}\0{summary_hash}\0'.encode('utf-8'))
+    return h.hexdigest()
+
+  def is_fresh(self, stmt, key: Optional[str]) -> bool:
+    """Whether the output of stmt was built with the given key."""
+    entry = self._entries.get(stmt.output)
+    return bool(key and entry and entry['key'] == key and
+                self.file_hash(stmt.output) == entry['output_hash'])
+
+  def record(self, stmt, key: Optional[str]):
+    """Records a successful run of stmt."""
+    # The output has just been (re)written, so forget its old hash.
+    self._file_hashes.pop(stmt.output, None)
+    output_hash = self.file_hash(stmt.output)
+    if key and output_hash:
+      self._entries[stmt.output] = {'key': key, 'output_hash': output_hash}
+    else:
+      self.forget(stmt)
+
+  def forget(self, stmt):
+    self._file_hashes.pop(stmt.output, None)
+    self._entries.pop(stmt.output, None)
+
+  def save(self):
+    try:
+      with open(self.filename, 'w') as f:
+        json.dump(self._entries, f, indent=0, sort_keys=True)
+    except OSError:
+      logging.warning('Could not write cache index: %s', self.filename)
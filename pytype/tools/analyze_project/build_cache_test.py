@@ -0,0 +1,108 @@
+"""Tests for build_cache.py."""
+
+from pytype.platform_utils import path_utils
+from pytype.tests import test_utils
+from pytype.tools.analyze_project import build_cache
+from pytype.tools.analyze_project import worker_pool
+
+import unittest
+
+
+class TestBuildCache(unittest.TestCase):
+  """Test BuildCache."""
+
+  def setUp(self):
+    super().setUp()
+    self.d = test_utils.Tempdir()
+    self.d.__enter__()
+    self.d.create_file('foo.py', 'x = 0\n')
+    self.d.create_file('foo.imports', 'bar bar.pyi\n')
+    self.d.create_file('bar.pyi', 'def f() -> int: ...\n')
+    self.d.create_file('foo.pyi', 'x: int\n')
+    self.stmt = worker_pool.BuildStatement(
+        output=path_utils.join(self.d.path, 'foo.pyi'), action='check',
+        input=path_utils.join(self.d.path, 'foo.py'),
+        deps=(path_utils.join(self.d.path, 'bar.pyi'),),
+        imports=path_utils.join(self.d.path, 'foo.imports'), module='foo')
+    self.cache_file = path_utils.join(self.d.path, 'cache.json')
+
+  def tearDown(self):
+    super().tearDown()
+    self.d.__exit__(None, None, None)
+
+  def test_fresh(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    key = cache.compute_key(self.stmt, 'cmd')
+    self.assertFalse(cache.is_fresh(self.stmt, key))
+    cache.record(self.stmt, key)
+    self.assertTrue(cache.is_fresh(self.stmt, key))
+
+  def test_persistent(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    key = cache.compute_key(self.stmt, 'cmd')
+    cache.record(self.stmt, key)
+    cache.save()
+    cache = build_cache.BuildCache(self.cache_file)
+    self.assertTrue(cache.is_fresh(self.stmt, key))
+
+  def test_command_changed(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    cache.record(self.stmt, cache.compute_key(self.stmt, 'cmd'))
+    self.assertFalse(
+        cache.is_fresh(self.stmt, cache.compute_key(self.stmt, 'cmd --flag')))
+
+  def test_touch_does_not_invalidate(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    cache.record(self.stmt, cache.compute_key(self.stmt, 'cmd'))
+    cache.save()
+    # Rewrite the source and the dependency with identical contents.
+    self.d.create_file('foo.py', 'x = 0\n')
+    self.d.create_file('bar.pyi', 'def f() -> int: ...\n')
+    cache = build_cache.BuildCache(self.cache_file)
+    self.assertTrue(
+        cache.is_fresh(self.stmt, cache.compute_key(self.stmt, 'cmd')))
+
+  def test_dependency_interface_changed(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    cache.record(self.stmt, cache.compute_key(self.stmt, 'cmd'))
+    cache.save()
+    self.d.create_file('bar.pyi', 'def f() -> str: ...\n')
+    cache = build_cache.BuildCache(self.cache_file)
+    self.assertFalse(
+        cache.is_fresh(self.stmt, cache.compute_key(self.stmt, 'cmd')))
+
+  def test_dependency_summary_changed(self):
+    self.d.create_file('bar.pyi.summary', 'def f() -> int: ...\n')
+    cache = build_cache.BuildCache(self.cache_file)
+    cache.record(self.stmt, cache.compute_key(self.stmt, 'cmd'))
+    cache.save()
+    self.d.create_file('bar.pyi.summary', 'def f() -> bool: ...\n')
+    cache = build_cache.BuildCache(self.cache_file)
+    self.assertFalse(
+        cache.is_fresh(self.stmt, cache.compute_key(self.stmt, 'cmd')))
+
+  def test_output_changed(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    cache.record(self.stmt, cache.compute_key(self.stmt, 'cmd'))
+    cache.save()
+    self.d.create_file('foo.pyi', 'x: str\n')
+    cache = build_cache.BuildCache(self.cache_file)
+    self.assertFalse(
+        cache.is_fresh(self.stmt, cache.compute_key(self.stmt, 'cmd')))
+
+  def test_missing_input(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    self.d.delete_file('bar.pyi')
+    self.assertIsNone(cache.compute_key(self.stmt, 'cmd'))
+    self.assertFalse(cache.is_fresh(self.stmt, None))
+
+  def test_forget(self):
+    cache = build_cache.BuildCache(self.cache_file)
+    key = cache.compute_key(self.stmt, 'cmd')
+    cache.record(self.stmt, key)
+    cache.forget(self.stmt)
+    self.assertFalse(cache.is_fresh(self.stmt, key))
+
+
+if __name__ == '__main__':
+  unittest.main()
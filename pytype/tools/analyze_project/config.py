@@ -61,6 +61,17 @@ ITEMS = {
         1, '4', None,
         "Run N jobs in parallel. When 'auto' is used, this will be equivalent "
         'to the number of CPUs on the host system.'),
+    'workers': Item(
+        0, '0', None,
+        'Analyze files in N long-lived worker processes instead of starting '
+        'one pytype process per file with ninja. 0 means use ninja. When '
+        "'auto' is used, this will be equivalent to the number of CPUs on the "
+        'host system.'),
+    'function_summaries': Item(
+        False, 'False', None,
+        'Record the argument and return types of calls to the functions of '
+        'each module, and use them to infer more precise return types for '
+        'calls from other modules.'),
     'output': Item(
         '.pytype', '.pytype', None, 'All pytype output goes here.'),
     'platform': Item(
@@ -143,7 +154,9 @@ def make_converters(cwd=None):
       'exclude': lambda v: file_utils.expand_source_files(v, cwd),
       'inputs': lambda v: file_utils.expand_source_files(v, cwd),
       'jobs': parse_jobs,
+      'workers': parse_jobs,
       'keep_going': string_to_bool,
+      'function_summaries': string_to_bool,
       'output': lambda v: file_utils.expand_path(v, cwd),
       'platform': get_platform,
       'python_version': get_python_version,
@@ -142,6 +142,8 @@ def make_parser():
       (('inputs',), {'metavar': 'input', 'nargs': '*', 'action': 'flatten'}),
       (('-k', '--keep-going'), {'action': 'store_true', 'type': None}),
       (('-j', '--jobs'), {'action': 'store', 'metavar': 'N'}),
+      (('--workers',), {'action': 'store', 'metavar': 'N'}),
+      (('--function-summaries',), {'action': 'store_true', 'type': None}),
       (('--platform',),),
       (('-P', '--pythonpath'),),
       (('-V', '--python-version'),)
@@ -8,7 +8,9 @@ from typing import Iterable, Sequence, Tuple
 from pytype import file_utils
 from pytype import module_utils
 from pytype.platform_utils import path_utils
+from pytype.tools.analyze_project import build_cache
 from pytype.tools.analyze_project import config
+from pytype.tools.analyze_project import worker_pool
 
 # Generate a default pyi for builtin and system dependencies.
 DEFAULT_PYI = """
@@ -160,10 +162,17 @@ class PytypeRunner:
     self.pyi_dir = path_utils.join(conf.output, 'pyi')
     self.imports_dir = path_utils.join(conf.output, 'imports')
     self.ninja_file = path_utils.join(conf.output, 'build.ninja')
+    self.bytecode_cache_dir = path_utils.join(conf.output, 'bytecode')
+    self.cache = build_cache.BuildCache(
+        path_utils.join(conf.output, 'cache.json'))
     self.custom_options = [
         (k, getattr(conf, k)) for k in set(conf.__slots__) - set(config.ITEMS)]
     self.keep_going = conf.keep_going
     self.jobs = conf.jobs
+    self.workers = conf.workers
+    self.function_summaries = conf.function_summaries
+    # The build statements in build.ninja, for the worker pool.
+    self.build_statements = []
 
   def set_custom_options(self, flags_with_values, binary_flags, report_errors):
     """Merge self.custom_options into flags_with_values and binary_flags."""
@@ -183,23 +192,29 @@ class PytypeRunner:
 
   def get_pytype_command_for_ninja(self, report_errors):
     """Get the command line for running pytype."""
-    exe = PYTYPE_SINGLE
+    return PYTYPE_SINGLE + self.get_pytype_args(report_errors)
+
+  def get_pytype_args(self, report_errors):
+    """Get the pytype-single arguments, with ninja variables for file names."""
     flags_with_values = {
         '--imports_info': '$imports',
         '-V': self.python_version,
         '-o': '$out',
         '--module-name': '$module',
         '--platform': self.platform,
+        '--bytecode-cache': self.bytecode_cache_dir,
     }
     binary_flags = {
         '--quick',
         '--analyze-annotated' if report_errors else '--no-report-errors',
         '--nofail',
+        '--skip-unchanged-output',
     }
+    if self.function_summaries:
+      binary_flags.add('--function-summaries')
     self.set_custom_options(flags_with_values, binary_flags, report_errors)
     # Order the flags so that ninja recognizes commands across runs.
     return (
-        exe +
         list(sum(sorted(flags_with_values.items()), ())) +
         sorted(binary_flags) +
         ['$in']
@@ -293,10 +308,24 @@ class PytypeRunner:
         f.write(
             'rule {action}\n'
             '  command = {command}\n'
-            '  description = {action} $module\n'.format(
+            '  description = {action} $module\n'
+            # pytype-single does not rewrite outputs whose interfaces are
+            # unchanged; restat tells ninja not to rebuild their dependents.
+            '  restat = 1\n'.format(
                 action=action, command=command)
         )
 
+  def get_output_path(self, module, suffix):
+    return path_utils.join(self.pyi_dir,
+                           _module_to_output_path(module) + '.pyi' + suffix)
+
+  def get_cache_key(self, stmt):
+    """Get the build cache key of a worker_pool.BuildStatement."""
+    args = self.get_pytype_args(report_errors=stmt.action == Action.CHECK)
+    command = ' '.join(
+        PYTYPE_SINGLE + worker_pool.substitute_variables(args, stmt))
+    return self.cache.compute_key(stmt, command)
+
   def write_build_statement(self, module, action, deps, imports, suffix):
     """Write a build statement for the given module.
 
@@ -310,14 +339,13 @@ class PytypeRunner:
     Returns:
       The expected output of the build statement.
     """
-    output = path_utils.join(self.pyi_dir,
-                             _module_to_output_path(module) + '.pyi' + suffix)
+    output = self.get_output_path(module, suffix)
     logging.info('%s %s\n  imports: %s\n  deps: %s\n  output: %s',
                  action, module.name, imports, deps, output)
     if deps:
-      deps = ' | ' +  escape_ninja_path(' '.join(deps))
+      ninja_deps = ' | ' +  escape_ninja_path(' '.join(deps))
     else:
-      deps = ''
+      ninja_deps = ''
     with open(self.ninja_file, 'a') as f:
       f.write('build {output}: {action} {input}{deps}\n'
               '  imports = {imports}\n'
@@ -325,9 +353,12 @@ class PytypeRunner:
                   output=escape_ninja_path(output),
                   action=action,
                   input=escape_ninja_path(module.full_path),
-                  deps=deps,
+                  deps=ninja_deps,
                   imports=escape_ninja_path(imports),
                   module=module.name))
+    self.build_statements.append(worker_pool.BuildStatement(
+        output=output, action=action, input=module.full_path, deps=tuple(deps),
+        imports=imports, module=module.name))
     return output
 
   def setup_build(self):
@@ -338,11 +369,14 @@ class PytypeRunner:
     """
     if not self.make_imports_dir():
       return set()
+    self.build_statements = []
     default_output = self.write_default_pyi()
     self.write_ninja_preamble()
     files = set()
     module_to_imports_map = {}
     module_to_output = {}
+    # Outputs that are not up to date in the build cache.
+    dirty_outputs = set()
     for module, action, deps, stage in self.yield_sorted_modules():
       if files >= self.filenames:
         logging.info('skipped: %s %s (%s)', action, module.name, stage)
@@ -365,12 +399,23 @@ class PytypeRunner:
       # Don't depend on default.pyi, since it's regenerated every time.
       deps = tuple(module_to_output[m] for m in deps
                    if module_to_output[m] != default_output)
-      module_to_output[module] = self.write_build_statement(
-          module, action, deps, imports, suffix)
+      output = module_to_output[module] = self.get_output_path(module, suffix)
+      stmt = worker_pool.BuildStatement(
+          output=output, action=action, input=module.full_path, deps=deps,
+          imports=imports, module=module.name)
+      if (not dirty_outputs.intersection(deps) and
+          self.cache.is_fresh(stmt, self.get_cache_key(stmt))):
+        # The module and the interfaces of its dependencies are unchanged.
+        logging.info('cached: %s %s', action, module.name)
+        continue
+      dirty_outputs.add(output)
+      self.write_build_statement(module, action, deps, imports, suffix)
     return files
 
   def build(self):
     """Execute the build.ninja file."""
+    if self.workers:
+      return self.build_with_workers()
     # -k N     keep going until N jobs fail (0 means infinity)
     # -C DIR   change to DIR before doing anything else
     # -j N     run N jobs in parallel (0 means infinity)
@@ -385,8 +430,26 @@ class PytypeRunner:
       command.append('-v')
     ret = subprocess.call(command)
     print(f'Leaving directory {c!r}')
+    if not ret:
+      # ninja does not tell us which statements succeeded, so the cache is only
+      # updated after a fully successful build.
+      for stmt in self.build_statements:
+        self.cache.record(stmt, self.get_cache_key(stmt))
+      self.cache.save()
     return ret
 
+  def build_with_workers(self):
+    """Execute the build statements in a pool of pytype worker processes."""
+    commands = {action: self.get_pytype_args(report_errors)
+                for action, report_errors in ((Action.INFER, False),
+                                              (Action.CHECK, True))}
+    pool = worker_pool.WorkerPool(
+        PYTYPE_SINGLE, commands, self.build_statements, workers=self.workers,
+        keep_going=self.keep_going, cache=self.cache,
+        python_version=self.python_version, platform=self.platform,
+        verbose=logging.getLogger().isEnabledFor(logging.INFO))
+    return pool.run()
+
   def run(self):
     """Run pytype over the project."""
     logging.info('------------- Starting pytype run. -------------')
@@ -1,7 +1,10 @@
 """Tests for pytype_runner.py."""
 
 import collections
+import contextlib
 import dataclasses
+import io
+import os
 import re
 import sys
 
@@ -14,6 +17,7 @@ from pytype.tools.analyze_project import parse_args
 from pytype.tools.analyze_project import pytype_runner
 
 import unittest
+from unittest import mock
 
 
 # Convenience aliases.
@@ -43,7 +47,7 @@ class ExpectedBuildStatement:
 
 
 # number of lines in the build.ninja preamble
-_PREAMBLE_LENGTH = 6
+_PREAMBLE_LENGTH = 8
 
 
 class FakeImportGraph:
@@ -261,6 +265,20 @@ class TestGetRunCmd(TestBase):
   def test_module_name(self):
     self.assertEqual(self.get_basic_options().module_name, '$module')
 
+  def test_skip_unchanged_output(self):
+    self.assertTrue(self.get_basic_options().skip_unchanged_output)
+
+  def test_bytecode_cache(self):
+    self.assertEqual(self.get_basic_options().bytecode_cache,
+                     self.runner.bytecode_cache_dir)
+
+  def test_function_summaries(self):
+    self.assertFalse(self.get_basic_options().function_summaries)
+    conf = self.parser.config_from_defaults()
+    conf.function_summaries = True
+    self.runner = make_runner([], [], conf)
+    self.assertTrue(self.get_basic_options().function_summaries)
+
   def test_error_reporting(self):
     # Disable error reporting
     options = self.get_basic_options(report_errors=False)
@@ -412,20 +430,23 @@ class TestNinjaPreamble(TestBase):
       with open(runner.ninja_file) as f:
         preamble = f.read().splitlines()
     self.assertEqual(len(preamble), _PREAMBLE_LENGTH)
-    # The preamble consists of triples of lines of the format:
+    # The preamble consists of groups of four lines of the format:
     # rule {name}
     #   command = pytype-single {args} $in
     #   description = {name} $module
+    #   restat = 1
     # Check that the lines cycle through these patterns.
     for i, line in enumerate(preamble):
-      if not i % 3:
+      if not i % 4:
         self.assertRegex(line, r'rule \w*')
-      elif i % 3 == 1:
+      elif i % 4 == 1:
         expected = r'  command = {} .* \$in'.format(
             re.escape(' '.join(pytype_runner.PYTYPE_SINGLE)))
         self.assertRegex(line, expected)
-      else:
+      elif i % 4 == 2:
         self.assertRegex(line, r'  description = \w* \$module')
+      else:
+        self.assertEqual(line, '  restat = 1')
 
 
 class TestNinjaBuildStatement(TestBase):
@@ -677,6 +698,36 @@ class TestNinjaBody(TestBase):
             imports=path_utils.join(runner.imports_dir, 'foo.imports'),
             module='foo'))
 
+  def test_cached(self):
+    with test_utils.Tempdir() as d:
+      self.conf.output = d.path
+      d.create_file('foo.py')
+      d.create_file('bar.py')
+      src = Module(d.path, 'foo.py', 'foo')
+      dep = Module(d.path, 'bar.py', 'bar')
+      runner = make_runner([src], [((dep,), ()), ((src,), (dep,))], self.conf)
+      runner.setup_build()
+      # Pretend that the build ran and succeeded.
+      for stmt in runner.build_statements:
+        d.create_file(stmt.output, '# ' + stmt.module)
+        runner.cache.record(stmt, runner.get_cache_key(stmt))
+      runner.cache.save()
+      d.create_file('foo.py', 'x = 0')
+      runner = make_runner([src], [((dep,), ()), ((src,), (dep,))], self.conf)
+      runner.setup_build()
+      with open(runner.ninja_file) as f:
+        body = f.read().splitlines()[_PREAMBLE_LENGTH:]
+    # Only foo.py changed, so bar.py does not need to be analyzed again.
+    self.assertBuildStatementMatches(
+        body,
+        ExpectedBuildStatement(
+            output=path_utils.join(runner.pyi_dir, 'foo.pyi'),
+            action=Action.CHECK,
+            input=path_utils.join(d.path, 'foo.py'),
+            deps=' | ' + path_utils.join(runner.pyi_dir, 'bar.pyi'),
+            imports=path_utils.join(runner.imports_dir, 'foo.imports'),
+            module='foo'))
+
 
 class TestImports(TestBase):
   """Test imports-related functionality."""
@@ -718,5 +769,46 @@ class TestImports(TestBase):
                      {'foo': '/dir/foo.pyi', 'bar': '/dir/bar.pyi'})
 
 
+class TestBuild(TestBase):
+  """Test PytypeRunner.run with both build backends."""
+
+  def setUp(self):
+    super().setUp()
+    self.conf = self.parser.config_from_defaults()
+    # ninja runs pytype-single in subprocesses, which must use this pytype.
+    root = path_utils.dirname(path_utils.dirname(
+        path_utils.abspath(file_utils.__file__)))
+    pythonpath = os.pathsep.join(
+        p for p in (root, os.environ.get('PYTHONPATH')) if p)
+    patcher = mock.patch.dict(os.environ, {'PYTHONPATH': pythonpath})
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def _build(self, d, workers):
+    """Analyze foo.py and its dependency bar.py, returning the outputs."""
+    self.conf.output = path_utils.join(d.path, f'out{workers}')
+    self.conf.workers = workers
+    src = Module(d.path, 'foo.py', 'foo')
+    dep = Module(d.path, 'bar.py', 'bar')
+    runner = make_runner([src], [((dep,), ()), ((src,), (dep,))], self.conf)
+    with contextlib.redirect_stdout(io.StringIO()):
+      self.assertEqual(runner.run(), 0)
+    outputs = {}
+    for stmt in runner.build_statements:
+      with open(stmt.output) as f:
+        outputs[stmt.module] = f.read()
+    return outputs
+
+  def test_workers_match_ninja(self):
+    with test_utils.Tempdir() as d:
+      d.create_file('bar.py', 'class A:\n  def f(self):\n    return 42\n')
+      d.create_file('foo.py', 'import bar\ndef g():\n  return bar.A().f()\n')
+      ninja_outputs = self._build(d, workers=0)
+      worker_outputs = self._build(d, workers=2)
+    self.assertEqual(set(ninja_outputs), {'foo', 'bar'})
+    self.assertIn('def g() -> int: ...', ninja_outputs['foo'])
+    self.assertEqual(ninja_outputs, worker_outputs)
+
+
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,266 @@
+"""Run pytype-single in long-lived worker processes instead of via ninja.
+
+Every build statement that PytypeRunner writes to build.ninja is also recorded
+as a BuildStatement. WorkerPool executes those statements in dependency order
+in a pool of worker processes, each of which imports pytype and parses
+builtins/typing once and then analyzes many modules. Like the pytype daemon,
+every worker keeps the dependencies that it has loaded in a ModuleCache, so
+that a module imported by many others is only loaded once per worker. The
+commands, progress output and exit codes are the same as those of the ninja
+backend. Unlike ninja, the pool checks the build cache right before running a
+statement, so a module whose dependencies were re-analyzed without changing
+their interfaces is not re-analyzed itself.
+"""
+
+import concurrent.futures
+import contextlib
+import dataclasses
+import io
+import logging
+import traceback
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from pytype import config as pytype_config
+from pytype import file_utils
+from pytype import module_cache
+from pytype.platform_utils import path_utils
+from pytype.tools.analyze_project import build_cache
+
+# The modules loaded by the statements that this worker process has run.
+_modules = module_cache.ModuleCache()
+
+
+@dataclasses.dataclass(eq=True, frozen=True)
+class BuildStatement:
+  """The worker pool equivalent of a ninja build statement.
+
+  Attributes:
+    output: The output pyi file.
+    action: The pytype_runner.Action to run.
+    input: The source file.
+    deps: The outputs of the module's dependencies.
+    imports: The imports file.
+    module: The module name.
+  """
+
+  output: str
+  action: str
+  input: str
+  deps: Tuple[str, ...]
+  imports: str
+  module: str
+
+  def description(self):
+    return f'{self.action} {self.module}'
+
+
+def substitute_variables(command: Sequence[str], stmt: BuildStatement):
+  """Fill in the ninja variables in a pytype-single command."""
+  variables = {
+      '$imports': stmt.imports,
+      '$in': stmt.input,
+      '$module': stmt.module,
+      '$out': stmt.output,
+  }
+  return [variables.get(arg, arg) for arg in command]
+
+
+def _init_worker(python_version, platform):
+  """Pool initializer: warm up the module cache of a new worker."""
+  # Messages are written to a per-module buffer by _run_pytype_single, so drop
+  # any handlers inherited from the parent process.
+  for handler in logging.getLogger().handlers[:]:
+    logging.getLogger().removeHandler(handler)
+  try:
+    options = pytype_config.Options.create(
+        python_version=python_version, platform=platform)
+    _modules.create_loader(options)
+  except Exception:  # pylint: disable=broad-except
+    # The worker can still run; any persistent problem will also be reported
+    # when it analyzes its first module.
+    logging.warning('Failed to warm up pytype worker', exc_info=True)
+
+
+def _run_pytype_single(args: List[str]) -> Tuple[int, str]:
+  """Run pytype-single in-process, capturing everything it prints.
+
+  Args:
+    args: The pytype-single command-line arguments, without the executable.
+
+  Returns:
+    A tuple of the exit status and the captured stdout and stderr.
+  """
+  out = io.StringIO()
+  handler = logging.StreamHandler(out)
+  handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s %(message)s'))
+  logging.getLogger().addHandler(handler)
+  try:
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+      try:
+        options = pytype_config.Options(args, command_line=True)
+        ret = _modules.run(options)
+      except SystemExit as e:
+        ret = e.code if isinstance(e.code, int) else 1
+      except Exception:  # pylint: disable=broad-except
+        traceback.print_exc()
+        ret = 1
+  finally:
+    logging.getLogger().removeHandler(handler)
+  return ret, out.getvalue()
+
+
+class WorkerPool:
+  """Executes build statements in a pool of long-lived pytype processes."""
+
+  def __init__(self, executable: List[str], commands: Dict[str, List[str]],
+               statements: Sequence[BuildStatement], *, workers: int,
+               keep_going: bool, cache: build_cache.BuildCache,
+               python_version: str,
+               platform: str, verbose: bool = False):
+    """Initializer.
+
+    Args:
+      executable: The pytype-single executable, used only for reporting.
+      commands: A map from action to pytype-single arguments with ninja
+        variables.
+      statements: The build statements, in dependency order.
+      workers: The number of worker processes.
+      keep_going: Whether to keep going past failures.
+      cache: The build cache.
+      python_version: The target python version, for warming up workers.
+      platform: The target platform, for warming up workers.
+      verbose: Whether to show full command lines instead of descriptions.
+    """
+    self.executable = executable
+    self.commands = commands
+    self.statements = statements
+    self.workers = workers
+    self.keep_going = keep_going
+    self.cache = cache
+    self.python_version = python_version
+    self.platform = platform
+    self.verbose = verbose
+
+  def _args(self, stmt: BuildStatement):
+    return substitute_variables(self.commands[stmt.action], stmt)
+
+  def _command(self, stmt: BuildStatement):
+    return ' '.join(self.executable + self._args(stmt))
+
+  def _report(self, index, total, stmt, ret, output):
+    """Print a result the way ninja does."""
+    command = self._command(stmt)
+    print(f'[{index}/{total}] ' +
+          (command if self.verbose else stmt.description()))
+    if ret:
+      print(f'FAILED: {stmt.output} \n{command}')
+    if output:
+      print(output, end='' if output.endswith('\n') else '\n')
+
+  def _check_cache(self, stmt) -> Tuple[bool, Optional[str]]:
+    """Get whether stmt is up to date, and its cache key."""
+    key = self.cache.compute_key(stmt, self._command(stmt))
+    if self.cache.is_fresh(stmt, key):
+      logging.info('cached: %s', stmt.description())
+      return True, key
+    return False, key
+
+  def _get_todo(self) -> List[BuildStatement]:
+    """Get the statements that may need to run, in dependency order.
+
+    A statement is left out if it is up to date and none of its dependencies
+    need to run. Statements whose dependencies run are checked again once
+    those have finished.
+
+    Returns:
+      A list of statements.
+    """
+    todo = []
+    todo_outputs = set()
+    for stmt in self.statements:
+      if todo_outputs.isdisjoint(stmt.deps) and self._check_cache(stmt)[0]:
+        continue
+      todo.append(stmt)
+      todo_outputs.add(stmt.output)
+    return todo
+
+  def run(self) -> int:
+    """Run all build statements that are not up to date in the cache.
+
+    Returns:
+      The exit status: 0 on success, 1 if any statement failed.
+    """
+    todo = self._get_todo()
+    if not todo:
+      print('no work to do.')
+      return 0
+    # Statements that turn out to be up to date once their dependencies have
+    # run still count towards the total, so that it does not change.
+    total = len(todo)
+    pending_outputs = {stmt.output for stmt in todo}
+    finished = 0
+    failed: Set[str] = set()
+    running: Dict[concurrent.futures.Future,
+                  Tuple[BuildStatement, Optional[str]]] = {}
+    stop = False
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=self.workers, initializer=_init_worker,
+        initargs=(self.python_version, self.platform)) as executor:
+      while todo or running:
+        ready: List[BuildStatement] = []
+        blocked: List[BuildStatement] = []
+        if not stop:
+          for stmt in todo:
+            if any(d in failed for d in stmt.deps):
+              # Like ninja, do not build anything depending on a failure.
+              failed.add(stmt.output)
+            elif any(d in pending_outputs for d in stmt.deps):
+              blocked.append(stmt)
+            else:
+              ready.append(stmt)
+          todo = blocked
+        skipped = False
+        for stmt in ready:
+          fresh, key = self._check_cache(stmt)
+          if fresh:
+            # Dependencies were re-analyzed without changing their interfaces.
+            pending_outputs.discard(stmt.output)
+            finished += 1
+            skipped = True
+            continue
+          # ninja creates the directories of outputs before running commands.
+          file_utils.makedirs(path_utils.dirname(stmt.output))
+          running[executor.submit(_run_pytype_single, self._args(stmt))] = (
+              stmt, key)
+        if not running:
+          if skipped and todo:
+            # Skipping statements may have unblocked others.
+            continue
+          break
+        done, _ = concurrent.futures.wait(
+            running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+          stmt, key = running.pop(future)
+          pending_outputs.discard(stmt.output)
+          finished += 1
+          try:
+            ret, output = future.result()
+          except concurrent.futures.process.BrokenProcessPool as e:
+            # The pool cannot run anything else once a worker has died.
+            ret, output = 1, f'pytype worker process died: {e}\n'
+            stop = True
+          self._report(finished, total, stmt, ret, output)
+          if ret:
+            failed.add(stmt.output)
+            self.cache.forget(stmt)
+            if not self.keep_going:
+              stop = True
+          else:
+            self.cache.record(stmt, key)
+        if stop:
+          todo = []
+    self.cache.save()
+    if failed:
+      print('build stopped: subcommand failed.')
+      return 1
+    return 0
@@ -0,0 +1,165 @@
+"""Tests for worker_pool.py."""
+
+import contextlib
+import io
+import sys
+
+from pytype.platform_utils import path_utils
+from pytype.tests import test_utils
+from pytype.tools.analyze_project import build_cache
+from pytype.tools.analyze_project import worker_pool
+
+import unittest
+
+
+class TestSubstituteVariables(unittest.TestCase):
+  """Test substitute_variables."""
+
+  def test_substitute(self):
+    stmt = worker_pool.BuildStatement(
+        output='foo.pyi', action='infer', input='foo.py', deps=(),
+        imports='foo.imports', module='foo')
+    command = ['--imports_info', '$imports', '--module-name', '$module',
+               '-o', '$out', '--quick', '$in']
+    self.assertEqual(
+        worker_pool.substitute_variables(command, stmt),
+        ['--imports_info', 'foo.imports', '--module-name', 'foo',
+         '-o', 'foo.pyi', '--quick', 'foo.py'])
+
+
+def _python_version():
+  return '.'.join(map(str, sys.version_info[:2]))
+
+
+def _make_statements(d, srcs, cached=()):
+  """Create build statements for the modules in srcs.
+
+  Args:
+    d: A test_utils.Tempdir.
+    srcs: A sequence of (module name, source code, dependency names), in
+      dependency order.
+    cached: The names of modules whose outputs are already up to date.
+
+  Returns:
+    The build statements and a build cache.
+  """
+  cache = build_cache.BuildCache(path_utils.join(d.path, 'cache.json'))
+  stmts = []
+  for name, src, deps in srcs:
+    d.create_file(name + '.py', src)
+    d.create_file(name + '.imports', ''.join(
+        f'{dep} {path_utils.join(d.path, dep)}.pyi\n' for dep in deps))
+    stmt = worker_pool.BuildStatement(
+        output=path_utils.join(d.path, name + '.pyi'), action='infer',
+        input=path_utils.join(d.path, name + '.py'),
+        deps=tuple(path_utils.join(d.path, dep + '.pyi') for dep in deps),
+        imports=path_utils.join(d.path, name + '.imports'), module=name)
+    if name in cached:
+      d.create_file(name + '.pyi')
+      cache.record(stmt, cache.compute_key(stmt, 'pytype-single ' + ' '.join(
+          worker_pool.substitute_variables(_ARGS, stmt))))
+    stmts.append(stmt)
+  return stmts, cache
+
+
+_ARGS = ['--imports_info', '$imports', '--module-name', '$module', '-o',
+         '$out', '-V', _python_version(), '$in']
+
+
+class TestRunPytypeSingle(unittest.TestCase):
+  """Test _run_pytype_single."""
+
+  def setUp(self):
+    super().setUp()
+    worker_pool._modules.clear()  # pylint: disable=protected-access
+
+  def test_run_twice(self):
+    # The second run in a process must not trip over state left behind by the
+    # first, and reuses the dependencies that the first one loaded.
+    with test_utils.Tempdir() as d:
+      stmts, _ = _make_statements(
+          d, [('bar', 'x = 42', ()), ('baz', 'import bar\ny = bar.x', ('bar',)),
+              ('foo', 'import bar\nz = bar.x', ('bar',))])
+      for stmt in stmts:
+        ret, output = worker_pool._run_pytype_single(  # pylint: disable=protected-access
+            worker_pool.substitute_variables(_ARGS, stmt))
+        self.assertEqual((ret, output), (0, ''))
+        if stmt.module == 'baz':
+          self.assertEqual(len(worker_pool._modules), 1)  # pylint: disable=protected-access
+      with open(stmts[-1].output) as f:
+        self.assertIn('z: int', f.read().splitlines())
+
+  def test_error(self):
+    with test_utils.Tempdir() as d:
+      stmts, _ = _make_statements(d, [('foo', 'def f(:', ())])
+      ret, output = worker_pool._run_pytype_single(  # pylint: disable=protected-access
+          worker_pool.substitute_variables(_ARGS, stmts[0]))
+    self.assertEqual(ret, 1)
+    self.assertIn('invalid syntax', output)
+
+
+class TestWorkerPool(unittest.TestCase):
+  """Test WorkerPool."""
+
+  def _run(self, stmts, cache):
+    pool = worker_pool.WorkerPool(
+        ['pytype-single'], {'infer': _ARGS}, stmts, workers=1,
+        keep_going=False, cache=cache, python_version=_python_version(),
+        platform=sys.platform)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+      ret = pool.run()
+    return ret, out.getvalue()
+
+  def test_no_work(self):
+    with test_utils.Tempdir() as d:
+      cache = build_cache.BuildCache(path_utils.join(d.path, 'cache.json'))
+      pool = worker_pool.WorkerPool(
+          ['pytype-single'], {}, [], workers=1, keep_going=False, cache=cache,
+          python_version='3.10', platform='linux')
+      out = io.StringIO()
+      with contextlib.redirect_stdout(out):
+        self.assertEqual(pool.run(), 0)
+    self.assertEqual(out.getvalue(), 'no work to do.\n')
+
+  def test_skip_cached(self):
+    with test_utils.Tempdir() as d:
+      stmts, cache = _make_statements(
+          d, [('bar', '', ()), ('foo', '', ('bar',))], cached=('bar', 'foo'))
+      ret, out = self._run(stmts, cache)
+    # Both statements are up to date, so no worker is started.
+    self.assertEqual(ret, 0)
+    self.assertEqual(out, 'no work to do.\n')
+
+  def test_run(self):
+    with test_utils.Tempdir() as d:
+      stmts, cache = _make_statements(
+          d, [('baz', 'w = 0', ()), ('bar', 'x = 42', ()),
+              ('foo', 'import bar\ny = bar.x', ('bar',))], cached=('baz',))
+      ret, out = self._run(stmts, cache)
+      with open(stmts[-1].output) as f:
+        pyi = f.read()
+    self.assertEqual(ret, 0)
+    # The up-to-date baz is not counted. Both statements run in the same worker.
+    self.assertEqual(out, '[1/2] infer bar\n[2/2] infer foo\n')
+    self.assertIn('y: int', pyi.splitlines())
+
+  def test_failure(self):
+    with test_utils.Tempdir() as d:
+      stmts, cache = _make_statements(
+          d, [('bar', 'def f(:', ()), ('foo', 'import bar', ('bar',))])
+      ret, out = self._run(stmts, cache)
+      foo_built = path_utils.exists(stmts[-1].output)
+    self.assertEqual(ret, 1)
+    lines = out.splitlines()
+    self.assertEqual(lines[:2], ['[1/2] infer bar',
+                                 f'FAILED: {stmts[0].output} '])
+    self.assertIn('invalid syntax', out)
+    self.assertEqual(lines[-1], 'build stopped: subcommand failed.')
+    # Nothing that depends on a failure is built.
+    self.assertNotIn('infer foo', out)
+    self.assertFalse(foo_built)
+
+
+if __name__ == '__main__':
+  unittest.main()
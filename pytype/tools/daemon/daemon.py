@@ -0,0 +1,142 @@
+"""Serve pytype-single requests from a long-lived process.
+
+Every pytype-single process parses builtins and typing and loads all of its
+dependencies from scratch, which takes seconds even when the module being
+checked is tiny. The daemon keeps the loaded and resolved dependencies of
+previous requests in memory and analyzes new requests against them, so that
+repeated single-file checks (from an editor or a pre-commit hook) take a
+fraction of that time.
+
+The daemon listens on a Unix socket. A request is a single line of JSON with
+the pytype-single arguments and the working directory of the client; the
+response is a single line of JSON with the exit status and everything pytype
+printed to stdout and stderr. Requests are handled one at a time.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from typing import List, Optional
+
+from pytype import config as pytype_config
+from pytype import module_cache
+from pytype import utils
+
+
+class Daemon:
+  """Runs pytype-single requests against a ModuleCache."""
+
+  def __init__(self):
+    self.cache = module_cache.ModuleCache()
+
+  def _run(self, args: List[str]) -> int:
+    """Run pytype-single with the given arguments."""
+    try:
+      options = pytype_config.Options(args, command_line=True)
+    except utils.UsageError as e:
+      print(str(e), file=sys.stderr)
+      return 1
+    return self.cache.run(options)
+
+  def handle(self, request):
+    """Handle a request, capturing everything pytype prints.
+
+    Args:
+      request: A dict with the pytype-single arguments, 'args', and the
+        working directory, 'cwd'.
+
+    Returns:
+      A dict with the exit status, 'exit_status', and the captured output,
+      'stdout' and 'stderr'.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    handler = logging.StreamHandler(stderr)
+    handler.setFormatter(
+        logging.Formatter('%(levelname)s:%(name)s %(message)s'))
+    logging.getLogger().addHandler(handler)
+    old_cwd = os.getcwd()
+    try:
+      with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+          stderr):
+        try:
+          os.chdir(request['cwd'])
+          ret = self._run(request['args'])
+        except SystemExit as e:
+          ret = e.code if isinstance(e.code, int) else 1
+        except Exception:  # pylint: disable=broad-except
+          traceback.print_exc()
+          ret = 1
+    finally:
+      os.chdir(old_cwd)
+      logging.getLogger().removeHandler(handler)
+    return {'exit_status': ret, 'stdout': stdout.getvalue(),
+            'stderr': stderr.getvalue()}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+  def handle(self):
+    try:
+      request = json.loads(self.rfile.readline())
+    except ValueError:
+      return
+    response = self.server.pytype_daemon.handle(request)
+    self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class Server(socketserver.UnixStreamServer):
+  """Serves Daemon requests on a Unix socket."""
+
+  def __init__(self, socket_path: str, pytype_daemon: Optional[Daemon] = None):
+    if os.path.exists(socket_path):
+      with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+          sock.connect(socket_path)
+        except OSError:
+          # The socket was left behind by a daemon that has exited.
+          os.unlink(socket_path)
+        else:
+          raise OSError(
+              f'A pytype daemon is already listening on {socket_path}')
+    self.pytype_daemon = pytype_daemon or Daemon()
+    super().__init__(socket_path, _RequestHandler)
+
+  def server_close(self):
+    super().server_close()
+    with contextlib.suppress(OSError):
+      os.unlink(self.server_address)
+
+
+def send_request(socket_path: str, args: List[str],
+                 cwd: Optional[str] = None):
+  """Send a pytype-single request to the daemon listening on socket_path.
+
+  Args:
+    socket_path: The socket of the daemon.
+    args: The pytype-single arguments.
+    cwd: The working directory to run pytype-single in. Defaults to the
+      current directory.
+
+  Returns:
+    The response of the daemon; see Daemon.handle().
+
+  Raises:
+    OSError: If the daemon could not be reached.
+  """
+  request = {'args': args, 'cwd': cwd or os.getcwd()}
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+    sock.connect(socket_path)
+    with sock.makefile('rwb') as f:
+      f.write(json.dumps(request).encode('utf-8') + b'\n')
+      f.flush()
+      line = f.readline()
+  if not line:
+    raise ConnectionError('The pytype daemon closed the connection')
+  return json.loads(line)
@@ -0,0 +1,35 @@
+"""Tests for daemon.py."""
+
+import threading
+
+from pytype import utils
+from pytype.platform_utils import path_utils
+from pytype.tests import test_base
+from pytype.tests import test_utils
+from pytype.tools.daemon import daemon
+
+import unittest
+
+
+class TestServer(test_base.UnitTest):
+  """Test the daemon server and client."""
+
+  def test_request(self):
+    with test_utils.Tempdir() as d:
+      d.create_file('foo.py', 'x: int = "hello"')
+      socket_path = path_utils.join(d.path, 'pytype.sock')
+      with daemon.Server(socket_path) as server:
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+        response = daemon.send_request(
+            socket_path,
+            ['-V', utils.format_version(self.python_version), 'foo.py'],
+            cwd=d.path)
+        thread.join()
+      self.assertEqual(response['exit_status'], 1)
+      self.assertIn('annotation-type-mismatch', response['stderr'])
+      self.assertFalse(path_utils.exists(socket_path))
+
+
+if __name__ == '__main__':
+  unittest.main()
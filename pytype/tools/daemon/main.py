@@ -0,0 +1,76 @@
+"""Run a pytype daemon, or send it a pytype-single request.
+
+Usage:
+  pytype-daemon serve --socket SOCKET
+  pytype-daemon run --socket SOCKET -- [pytype-single arguments]
+
+`run` prints what pytype-single would have printed and exits with its exit
+status. If no daemon is listening on the socket, it runs pytype-single in
+process instead.
+"""
+
+import argparse
+import logging
+import sys
+
+from pytype import single
+from pytype.tools import tool_utils
+from pytype.tools.daemon import daemon
+
+
+def parse_args(argv):
+  """Process command line arguments using argparse."""
+  parser = argparse.ArgumentParser(
+      description='Keep pytype dependencies loaded between runs.')
+  parser.add_argument(
+      '-v', '--verbosity', type=int, action='store', default=1,
+      help='Set logging level: 0=ERROR, 1=WARNING (default), 2=INFO.')
+  parser.add_argument(
+      '--socket', type=str, action='store', required=True,
+      help='The Unix socket that the daemon listens on.')
+  parser.add_argument(
+      'command', choices=['serve', 'run'],
+      help=('serve: run the daemon in the foreground. run: send a '
+            'pytype-single request to the daemon.'))
+  parser.add_argument(
+      'args', nargs=argparse.REMAINDER,
+      help='The pytype-single arguments, for run.')
+  args = parser.parse_args(argv)
+  if args.args and args.args[0] == '--':
+    args.args = args.args[1:]
+  return args
+
+
+def serve(socket_path):
+  with daemon.Server(socket_path) as server:
+    logging.info('Serving on %s', socket_path)
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      pass
+
+
+def run(socket_path, args):
+  """Send a request to the daemon and replay its output."""
+  try:
+    response = daemon.send_request(socket_path, args)
+  except OSError as e:
+    logging.warning('Could not reach the pytype daemon: %s', e)
+    sys.argv = ['pytype-single'] + args
+    return single.main() or 0
+  sys.stdout.write(response['stdout'])
+  sys.stderr.write(response['stderr'])
+  return response['exit_status']
+
+
+def main():
+  args = parse_args(sys.argv[1:])
+  tool_utils.setup_logging_or_die(args.verbosity)
+  if args.command == 'serve':
+    serve(args.socket)
+    return 0
+  return run(args.socket, args.args)
+
+
+if __name__ == '__main__':
+  sys.exit(main())
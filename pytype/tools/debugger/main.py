@@ -11,9 +11,11 @@ import argparse
 import sys
 
 import jinja2
+from pytype import analyze
 from pytype import config as pytype_config
 from pytype import datatypes
 from pytype import io
+from pytype import load_pytd
 from pytype.inspect import graph
 from pytype.tools import arg_parser
 from pytype.tools.debugger import visualizer
@@ -83,7 +85,14 @@ def main():
   parser = make_parser()
   args = parser.parse_args(sys.argv[1:])
   validate_args(parser, args.tool_args)
-  result = io.check_or_generate_pyi(args.pytype_opts)
+  options = args.pytype_opts
+  loader = load_pytd.create_loader(options)
+  # Show the whole typegraph, including bindings that are no longer used.
+  ctx = analyze.make_context(
+      options, loader, not options.main_only,
+      keep_all_bindings=bool(args.tool_args.output_typegraph or
+                             args.tool_args.visualize_typegraph))
+  result = io.check_or_generate_pyi(options, loader, ctx)
   output_graphs(args.tool_args, result.context)
 
 
@@ -30,6 +30,20 @@ log = logging.getLogger(__name__)
 # have names like "<listcomp>" and "<genexpr>".
 _SKIP_FUNCTION_RE = re.compile(r"<(?!lambda)\w+>$")
 
+# The most signatures to write into a function summary per function.
+_MAX_SUMMARY_SIGNATURES = 16
+
+
+def _is_constant(value):
+  return (isinstance(value, abstract.ConcreteValue) and
+          isinstance(value.pyval, (int, float, complex, str, bytes)))
+
+
+def _is_literal_constant(value):
+  return (isinstance(value, abstract.ConcreteValue) and
+          isinstance(value.pyval, (int, str, bytes)))
+
+
 _InstanceCacheType = Dict[abstract.InterpreterClass,
                           Dict[Any, Union["_InitClassState", cfg.Variable]]]
 
@@ -691,6 +705,91 @@ class CallTracer(vm.VirtualMachine):
       ))
     return classes
 
+  def _summary_signature(self, func, callargs, passed, ret, node):
+    """Convert a call to func into a pytd signature, if it is informative."""
+    sig = func.signature
+    names = sig.param_names + sig.kwonly_params
+    if not all(name in callargs for name in names):
+      return None
+    values = [callargs[name].data for name in names] + [ret.data]
+    if any(not v or any(isinstance(x, (abstract.Unknown, abstract.Unsolvable,
+                                       abstract.Empty)) for x in v)
+           for v in values):
+      return None
+    # pytype inferred the return type for the concrete values of constant
+    # arguments, so a constant has to be emitted as a Literal of its value.
+    # Default values are left out of the signature, so that calls that pass
+    # the parameter explicitly don't match it.
+    if any(_is_constant(x) for name in names if name not in passed
+           for x in callargs[name].data):
+      return None
+    if any(_is_constant(x) and not _is_literal_constant(x)
+           for name in passed for x in callargs[name].data):
+      return None
+
+    def to_type(data):
+      return pytd_utils.JoinTypes(
+          abstract.LiteralClass(d, self.ctx).get_instance_type(node)
+          if _is_literal_constant(d) else d.to_type(node) for d in data)
+
+    params = []
+    skipped_default = False
+    with self.ctx.pytd_convert.optimize_literals():
+      for i, name in enumerate(names):
+        if name not in passed:
+          skipped_default = True
+          continue
+        if i < sig.posonly_count:
+          kind = pytd.ParameterKind.POSONLY
+        elif i >= len(sig.param_names) or skipped_default:
+          # A later positional argument would be bound to the skipped
+          # parameter, so the parameters after it are keyword-only.
+          kind = pytd.ParameterKind.KWONLY
+        else:
+          kind = pytd.ParameterKind.REGULAR
+        params.append(pytd.Parameter(name, to_type(callargs[name].data), kind,
+                                     False, None))
+      return_type = to_type(ret.data)
+    return pytd.Signature(tuple(params), None, None, return_type,
+                          exceptions=(), template=())
+
+  def pytd_functions_for_summaries(self):
+    """Generate the function summary of the module.
+
+    Returns:
+      A list of pytd.Function, one for each top-level function that was called
+      with known argument types. Each signature is the argument types of one
+      such call, with the call's return type.
+    """
+    funcs = collections.defaultdict(set)
+    for f in self._interpreter_functions:
+      for value in f.bindings:
+        data = value.data
+        if (isinstance(data, abstract.InterpreterFunction) and
+            data.name.isidentifier() and not data.is_attribute_of_class and
+            not data.is_overload and not data.is_class_builder and
+            not data.is_coroutine()):
+          funcs[data.name].add(data)
+    functions = []
+    for name, values in sorted(funcs.items()):
+      if len(values) > 1:
+        # The module defines several functions with this name.
+        continue
+      func, = values
+      if func.signature.varargs_name or func.signature.kwargs_name:
+        continue
+      signatures = pytd_utils.OrderedSet()
+      for callargs, passed, ret, node in func.get_summary_records():
+        signature = self._summary_signature(func, callargs, passed, ret, node)
+        if signature:
+          signatures.add(signature)
+        if len(signatures) >= _MAX_SUMMARY_SIGNATURES:
+          break
+      if signatures:
+        functions.append(pytd.Function(name, tuple(signatures),
+                                       pytd.MethodKind.METHOD))
+    return functions
+
   def compute_types(self, defs):
     classes = (tuple(self.pytd_classes_for_unknowns()) +
                tuple(self.pytd_classes_for_call_traces()))
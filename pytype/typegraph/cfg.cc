@@ -45,6 +45,7 @@ static PyObject* k_next_variable_id;
 static PyObject* k_next_binding_id;
 static PyObject* k_condition;
 static PyObject* k_default_data;
+static PyObject* k_keep_all_bindings;
 
 typedef struct {
   PyObject_HEAD
@@ -292,6 +293,9 @@ static PyObject* ProgramGetAttro(PyObject* self, PyObject* attr) {
     }
     Py_INCREF(data);
     return data;
+  } else if (PyObject_RichCompareBool(attr, k_keep_all_bindings, Py_EQ) > 0) {
+    // CFG nodes always keep all of their bindings alive.
+    Py_RETURN_TRUE;
   }
   return PyObject_GenericGetAttr(self, attr);
 }
@@ -316,6 +320,16 @@ static int ProgramSetAttro(PyObject* self, PyObject* attr, PyObject* val) {
     Py_INCREF(val);
     program->program->set_default_data(MakeBindingData(val));
     return 0;
+  } else if (PyObject_RichCompareBool(attr, k_keep_all_bindings, Py_EQ) > 0) {
+    int keep_all_bindings = PyObject_IsTrue(val);
+    if (keep_all_bindings < 0) {
+      return -1;
+    } else if (!keep_all_bindings) {
+      PyErr_SetString(PyExc_ValueError,
+                      "this typegraph always keeps all bindings");
+      return -1;
+    }
+    return 0;
   }
   return PyObject_GenericSetAttr(self, attr, val);
 }
@@ -721,6 +735,43 @@ static PyObject* HasCombination(PyCFGNodeObj* self,
   }
 }
 
+PyDoc_STRVAR(
+    has_combinations_doc,
+    "HasCombinations([[attr, attr2, ...], ...]) -> list of bool\n\n"
+    "Query whether each of several combinations is possible at this CFG node. "
+    "Equivalent to calling HasCombination for each of them, but shares the "
+    "work of checking bindings that appear in more than one combination.");
+
+static PyObject* HasCombinations(PyCFGNodeObj* self,
+                                 PyObject* args, PyObject* kwargs) {
+  PyProgramObj* program = get_program(self);
+  static const char *kwlist[] = {"attrs_list", nullptr};
+  PyObject* lists = nullptr;
+  if (!SafeParseTupleAndKeywords(args, kwargs, "O!", kwlist, &PyList_Type,
+                                 &lists))
+    return nullptr;
+  int num_lists = PyList_Size(lists);
+  std::vector<std::vector<const typegraph::Binding*>> attrs_list(num_lists);
+  for (int i = 0; i < num_lists; i++) {
+    PyObject* list = PyList_GET_ITEM(lists, i);
+    if (!VerifyListOfBindings(list, program)) return nullptr;
+    int length = PyList_Size(list);
+    attrs_list[i].resize(length);
+    for (int j = 0; j < length; j++) {
+      auto item = reinterpret_cast<PyBindingObj*>(PyList_GET_ITEM(list, j));
+      attrs_list[i][j] = item->attr;
+    }
+  }
+  std::vector<bool> results = self->cfg_node->HasCombinations(attrs_list);
+  PyObject* py_results = PyList_New(num_lists);
+  for (int i = 0; i < num_lists; i++) {
+    PyObject* result = results[i] ? Py_True : Py_False;
+    Py_INCREF(result);
+    PyList_SET_ITEM(py_results, i, result);
+  }
+  return py_results;
+}
+
 PyDoc_STRVAR(
     can_have_combo_doc,
     "CanHaveCombination([attr, att2, ...]) -> bool\n\n"
@@ -755,6 +806,8 @@ static PyMethodDef cfg_node_methods[] = {
     METH_VARARGS|METH_KEYWORDS, connect_to_doc},
   {"HasCombination", reinterpret_cast<PyCFunction>(HasCombination),
     METH_VARARGS|METH_KEYWORDS, has_combination_doc},
+  {"HasCombinations", reinterpret_cast<PyCFunction>(HasCombinations),
+    METH_VARARGS|METH_KEYWORDS, has_combinations_doc},
   {"CanHaveCombination", reinterpret_cast<PyCFunction>(CanHaveCombination),
     METH_VARARGS|METH_KEYWORDS, can_have_combo_doc},
   {0, 0, 0, nullptr}  // sentinel
@@ -1498,6 +1551,8 @@ static PyObject* InitModule(PyObject* module) {
   k_condition = PyUnicode_FromString("condition");
   Py_XDECREF(k_default_data);
   k_default_data = PyUnicode_FromString("default_data");
+  Py_XDECREF(k_keep_all_bindings);
+  k_keep_all_bindings = PyUnicode_FromString("keep_all_bindings");
   return module;
 }
 
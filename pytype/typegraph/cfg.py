@@ -7,7 +7,9 @@ and to model path-specific visibility of nested data structures.
 import collections
 import dataclasses
 import logging
-from typing import Set
+import operator
+import weakref
+from typing import List
 
 from pytype import metrics
 
@@ -23,6 +25,12 @@ _variable_size_metric = metrics.Distribution("variable_size")
 # use that as the cutoff.
 MAX_VAR_SIZE = 64
 
+# Nearly all bindings have only one or two origins, which are found by a linear
+# search. Bindings with more origins also index them by CFG node.
+_MAX_UNINDEXED_ORIGINS = 4
+
+_get_id = operator.attrgetter("id")
+
 
 class Program:
   """Program instances describe program entities.
@@ -40,6 +48,13 @@ class Program:
     solver: the active Solver instance.
     default_data: Default value for data.
     variables: Variables in use. Will be used for assigning variable IDs.
+    keep_all_bindings: Whether CFG nodes keep all their bindings alive, e.g.,
+      to inspect the whole typegraph. By default, they only hold weak
+      references, so that bindings that nothing else refers to anymore, like
+      the temporary values of a function whose analysis has finished, are
+      garbage-collected; no query of the typegraph can involve such a binding.
+      Bindings that were dropped before this is set are not restored. (The C++
+      typegraph always keeps all bindings.)
   """
 
   def __init__(self):
@@ -50,6 +65,23 @@ class Program:
     self.solver = None
     self.default_data = None
     self.next_binding_id = 0
+    # Most source sets are equal to many others (e.g., the empty one), so we
+    # store only one copy of each.
+    # The interned source sets are keyed on the ids of their bindings, so that
+    # they don't keep dead bindings alive.
+    self._source_sets = weakref.WeakValueDictionary()
+    self._keep_all_bindings = False
+
+  @property
+  def keep_all_bindings(self):
+    return self._keep_all_bindings
+
+  @keep_all_bindings.setter
+  def keep_all_bindings(self, keep_all_bindings):
+    self._keep_all_bindings = keep_all_bindings
+    for node in self.cfg_nodes:
+      node.bindings = (set(node.bindings) if keep_all_bindings
+                       else weakref.WeakSet(node.bindings))
 
   def CreateSolver(self):
     if self.solver is None:
@@ -59,9 +91,20 @@ class Program:
   def InvalidateSolver(self):
     self.solver = None
 
+  def InvalidateSolverDownstream(self, cfg_node):
+    """Forget solver answers that depend on the incoming edges of cfg_node."""
+    if self.solver is not None:
+      self.solver.InvalidateDownstream(cfg_node)
+
+  def InvalidateSolverForVariable(self, variable):
+    """Forget solver answers that depend on the bindings of variable."""
+    if self.solver is not None:
+      self.solver.InvalidateVariable(variable)
+
   def NewCFGNode(self, name=None, condition=None):
     """Start a new CFG node."""
-    self.InvalidateSolver()
+    # A new node is not connected to anything yet, so it can't change any of
+    # the answers of the solver.
     cfg_node = CFGNode(self, name, len(self.cfg_nodes), condition)
     self.cfg_nodes.append(cfg_node)
     return cfg_node
@@ -109,6 +152,13 @@ class Program:
     self.next_binding_id += 1
     return self.next_binding_id-1
 
+  def InternSourceSet(self, source_set):
+    """Return the unique SourceSet that is equal to source_set."""
+    if not isinstance(source_set, SourceSet):
+      source_set = SourceSet(source_set)
+    key = frozenset(map(_get_id, source_set))
+    return self._source_sets.setdefault(key, source_set)
+
 
 class CFGNode:
   """A node in the CFG.
@@ -124,12 +174,14 @@ class CFGNode:
     incoming: Other CFGNodes that are connected to this node.
     outgoing: CFGNodes we connect to.
     bindings: Bindings that are being assigned to Variables at this CFGNode.
+      Unless Program.keep_all_bindings is set, bindings that are no longer
+      used anywhere else are dropped from this set.
     condition: None if no condition is set at this node;
                The binding representing the condition which needs to be
                  fulfilled to take the branch represented by this node.
   """
   __slots__ = ("program", "id", "name", "incoming", "outgoing", "bindings",
-               "condition")
+               "_condition")
 
   def __init__(self, program, name, cfgnode_id, condition):
     """Initialize a new CFG node. Called from Program.NewCFGNode."""
@@ -138,8 +190,18 @@ class CFGNode:
     self.name = name
     self.incoming = set()
     self.outgoing = set()
-    self.bindings = set()  # filled through RegisterBinding()
-    self.condition = condition
+    # filled through RegisterBinding()
+    self.bindings = set() if program.keep_all_bindings else weakref.WeakSet()
+    self._condition = condition
+
+  @property
+  def condition(self):
+    return self._condition
+
+  @condition.setter
+  def condition(self, condition):
+    self.program.InvalidateSolverDownstream(self)
+    self._condition = condition
 
   def ConnectNew(self, name=None, condition=None):
     """Add a new node connected to this node."""
@@ -149,13 +211,19 @@ class CFGNode:
 
   def ConnectTo(self, cfg_node):
     """Connect this node to an existing node."""
-    self.program.InvalidateSolver()
+    self.program.InvalidateSolverDownstream(cfg_node)
     self.outgoing.add(cfg_node)
     cfg_node.incoming.add(self)
 
   def CanHaveCombination(self, bindings):
     """Quick version of HasCombination below."""
     goals = set(bindings)
+    # Index the goals by the nodes they are assigned at, so that visiting a
+    # node costs the same no matter how many goals are left.
+    goals_at = {}
+    for b in goals:
+      for origin in b.origins:
+        goals_at.setdefault(origin.where, []).append(b)
     seen = set()
     stack = [self]
     while stack and goals:
@@ -163,7 +231,8 @@ class CFGNode:
       if node in seen:
         continue
       seen.add(node)
-      goals -= node.bindings
+      if node in goals_at:
+        goals.difference_update(goals_at[node])
       stack.extend(node.incoming)
     return not goals
 
@@ -186,6 +255,28 @@ class CFGNode:
     return (all(self.program.solver.Solve({b}, self) for b in bindings)
             and self.program.solver.Solve(bindings, self))
 
+  def HasCombinations(self, binding_lists):
+    """Query whether each of several combinations is possible.
+
+    Equivalent to [self.HasCombination(bindings) for bindings in binding_lists],
+    but each binding that appears in more than one combination is only checked
+    on its own once.
+
+    Arguments:
+      binding_lists: A list of lists of Bindings.
+    Returns:
+      A list of booleans, one per combination.
+    """
+    self.program.CreateSolver()
+    solver = self.program.solver
+    visible = {}
+    def IsVisible(binding):
+      if binding not in visible:
+        visible[binding] = solver.Solve({binding}, self)
+      return visible[binding]
+    return [all(IsVisible(b) for b in bindings) and
+            solver.Solve(bindings, self) for bindings in binding_lists]
+
   def RegisterBinding(self, binding):
     self.bindings.add(binding)
 
@@ -211,20 +302,28 @@ class SourceSet(frozenset):
 class Origin:
   """An "origin" is an explanation of how a binding was constructed.
 
-  It consists of a CFG node and a set of sourcesets.
+  It consists of a CFG node and a list of sourcesets.
 
   Attributes:
     where: The CFG node where this assignment happened.
     source_sets: Possible SourceSets used to construct the binding we belong to.
-      A set of SourceSet instances.
+      A list of distinct SourceSet instances.
   """
 
+  # There is an Origin for nearly every Binding, so we keep them small.
+  __slots__ = ("where", "source_sets")
+
   where: CFGNode
-  source_sets: Set[SourceSet] = dataclasses.field(default_factory=set)
+  source_sets: List[SourceSet]
 
   def AddSourceSet(self, source_set):
     """Add a new possible source set."""
-    self.source_sets.add(SourceSet(source_set))
+    if not isinstance(source_set, SourceSet):
+      source_set = SourceSet(source_set)
+    # An origin rarely has more than a couple of source sets, so a list is
+    # smaller and not slower than a set.
+    if source_set not in self.source_sets:
+      self.source_sets.append(source_set)
 
 
 class Binding:
@@ -240,7 +339,7 @@ class Binding:
   originally retrieved from, before being assigned to something else here.
   Origins contain, through source_sets, "sources", which are other bindings.
   """
-  __slots__ = ("program", "id", "variable", "origins", "data",
+  __slots__ = ("__weakref__", "program", "id", "variable", "origins", "data",
                "_cfgnode_to_origin")
 
   def __init__(self, program, id_num, variable, data):
@@ -250,7 +349,8 @@ class Binding:
     self.variable = variable
     self.origins = []
     self.data = data
-    self._cfgnode_to_origin = {}
+    # Created once there are more than _MAX_UNINDEXED_ORIGINS origins.
+    self._cfgnode_to_origin = None
 
   def IsVisible(self, viewpoint):
     """Can we "see" this binding from the current cfg node?
@@ -271,25 +371,32 @@ class Binding:
     return self.program.solver.Solve({self}, viewpoint)
 
   def _FindOrAddOrigin(self, cfg_node):
-    try:
-      origin = self._cfgnode_to_origin[cfg_node]
-    except KeyError:
-      origin = Origin(cfg_node)
+    origin = self.FindOrigin(cfg_node)
+    if origin is None:
+      origin = Origin(cfg_node, [])
       self.origins.append(origin)
-      self._cfgnode_to_origin[cfg_node] = origin
+      if self._cfgnode_to_origin is not None:
+        self._cfgnode_to_origin[cfg_node] = origin
+      elif len(self.origins) > _MAX_UNINDEXED_ORIGINS:
+        self._cfgnode_to_origin = {o.where: o for o in self.origins}
       self.variable.RegisterBindingAtNode(self, cfg_node)
       cfg_node.RegisterBinding(self)
     return origin
 
   def FindOrigin(self, cfg_node):
     """Return an Origin instance for a CFGNode, or None."""
-    return self._cfgnode_to_origin.get(cfg_node)
+    if self._cfgnode_to_origin is not None:
+      return self._cfgnode_to_origin.get(cfg_node)
+    for origin in self.origins:
+      if origin.where is cfg_node:
+        return origin
+    return None
 
   def AddOrigin(self, where, source_set):
     """Add another possible origin to this binding."""
-    self.program.InvalidateSolver()
+    self.program.InvalidateSolverForVariable(self.variable)
     origin = self._FindOrAddOrigin(where)
-    origin.AddSourceSet(source_set)
+    origin.AddSourceSet(self.program.InternSourceSet(source_set))
 
   def CopyOrigins(self, other_binding, where, additional_sources=None):
     """Copy the origins from another binding."""
@@ -428,7 +535,8 @@ class Variable:
     try:
       binding = self._data_id_to_binding[id(data)]
     except KeyError:
-      self.program.InvalidateSolver()
+      # A binding without origins can't change any of the answers of the
+      # solver. Its origins are added through AddOrigin.
       binding = Binding(self.program, self.program.MakeBindingId(), self, data)
       self.bindings.append(binding)
       self._data_id_to_binding[id(data)] = binding
@@ -562,7 +670,7 @@ class State:
     Yields:
       (removed_goals, new_goals) tuples.
     """
-    goals_to_remove = self.pos.bindings & self.goals
+    goals_to_remove = {g for g in self.goals if g.FindOrigin(self.pos)}
     seen_goals = set()
     removed_goals = set()
     new_goals = self.goals - goals_to_remove
@@ -608,6 +716,12 @@ class _PathFinder:
   def __init__(self):
     self._solved_find_queries = {}
 
+  def Invalidate(self, starts):
+    """Drop the answers for queries that start at one of the given nodes."""
+    self._solved_find_queries = {
+        query: result for query, result in self._solved_find_queries.items()
+        if query[0] not in starts}
+
   def FindAnyPathToNode(self, start, finish, blocked):
     """Determine whether we can reach a node at all.
 
@@ -758,7 +872,11 @@ class Solver:
   """The solver class is instantiated for a given "problem" instance.
 
   It maintains a cache of solutions for subproblems to be able to recall them if
-  they reoccur in the solving process.
+  they reoccur in the solving process. The cache is kept while the program
+  grows: the answer for a state depends only on the CFG nodes from which its
+  position can be reached and on the bindings of the variables that solving it
+  looked at, so only the answers that a change to those can affect are
+  dropped.
   """
 
   _cache_metric = metrics.MapCounter("cfg_solver_cache")
@@ -773,6 +891,47 @@ class Solver:
     self.program = program
     self._solved_states = {}
     self._path_finder = _PathFinder()
+    # The positions of the states in _solved_states.
+    self._positions = set()
+    # The variables whose bindings were looked at by _FindSolution.
+    self._variables = set()
+
+  def InvalidateDownstream(self, cfg_node):
+    """Drop the answers for states that can be reached from cfg_node."""
+    if not self._positions:
+      return
+    affected = set()
+    stack = [cfg_node]
+    seen = set()
+    while stack:
+      node = stack.pop()
+      if node in seen:
+        continue
+      seen.add(node)
+      if node in self._positions:
+        affected.add(node)
+      stack.extend(node.outgoing)
+    if not affected:
+      return
+    Solver._cache_metric.inc("evicted", sum(
+        state.pos in affected for state in self._solved_states))
+    self._solved_states = {state: result
+                           for state, result in self._solved_states.items()
+                           if state.pos not in affected}
+    self._positions -= affected
+    self._path_finder.Invalidate(affected)
+
+  def InvalidateVariable(self, variable):
+    """Drop all answers if solving looked at the bindings of variable."""
+    if variable not in self._variables:
+      return
+    # Answers are derived from each other, so we can't tell which of them
+    # depend on the variable.
+    Solver._cache_metric.inc("evicted", len(self._solved_states))
+    self._solved_states = {}
+    self._positions = set()
+    self._variables = set()
+    self._path_finder = _PathFinder()
 
   def Solve(self, start_attrs, start_node):
     """Try to solve the given problem.
@@ -804,6 +963,7 @@ class Solver:
     # that if it's possible to solve this state at this level of the tree, it
     # can also be solved in any of the children.
     self._solved_states[state] = True
+    self._positions.add(state.pos)
     # Careful! Modifying seen_states would affect other recursive calls, so we
     # need to copy it.
     seen_states = seen_states | {state}
@@ -818,7 +978,9 @@ class Solver:
       state.goals.add(state.pos.condition)
     Solver._goals_per_find_metric.add(len(state.goals))
     for removed_goals, new_goals in state.RemoveFinishedGoals():
-      assert not state.pos.bindings & new_goals
+      assert not any(g.FindOrigin(state.pos) for g in new_goals)
+      self._variables.update(goal.variable for goal in removed_goals)
+      self._variables.update(goal.variable for goal in new_goals)
       if _GoalsConflict(removed_goals):
         continue  # We bulk-removed goals that are internally conflicting.
       if not new_goals:
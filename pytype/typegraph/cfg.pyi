@@ -8,6 +8,7 @@ class Program:
   entrypoint: CFGNode
   next_variable_id: int
   next_binding_id: int
+  keep_all_bindings: bool
 
   def NewCFGNode(self, name: Optional[str] = ..., condition: Binding = ...) -> CFGNode: ...
   def NewVariable(self, bindings: Optional[Iterable[BindingData]] = ..., source_set: Optional[Iterable[Binding]] = ..., where: Optional[CFGNode] = ...) -> Variable: ...
@@ -25,6 +26,7 @@ class CFGNode:
   def ConnectNew(self, name: Optional[str] = ..., condition: Optional[Binding] = ...) -> CFGNode: ...
   def ConnectTo(self, node: CFGNode) -> None: ...
   def HasCombination(self, attrs: list[Binding]) -> bool: ...
+  def HasCombinations(self, attrs_list: list[list[Binding]]) -> list[bool]: ...
   def CanHaveCombination(self, attrs: list[Binding]) -> bool: ...
 
 class Variable:
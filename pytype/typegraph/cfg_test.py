@@ -1,10 +1,17 @@
 """Test for the cfg Python extension module."""
 
+import gc
+
 from pytype.typegraph import cfg
 
 import unittest
 
 
+# Some storage details are only implemented by the pure-Python typegraph, not
+# by the C++ extension that is built by default.
+_IS_PYTHON_TYPEGRAPH = cfg.__file__.endswith(".py")
+
+
 class CFGTest(unittest.TestCase):
   """Test control flow graph creation."""
 
@@ -411,6 +418,23 @@ class CFGTest(unittest.TestCase):
     self.assertFalse(n2.HasCombination([ya, zb]))
     self.assertFalse(n2.HasCombination([yb, za]))
 
+  def test_has_combinations(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    n2 = n1.ConnectNew("n2")
+    n3 = p.NewCFGNode("n3")
+    x = p.NewVariable()
+    y = p.NewVariable()
+    a = x.AddBinding("a", source_set=[], where=n1)
+    b = x.AddBinding("b", source_set=[], where=n1)
+    ya = y.AddBinding("ya", source_set=[a], where=n2)
+    yb = y.AddBinding("yb", source_set=[b], where=n2)
+    c = x.AddBinding("c", source_set=[], where=n3)
+    p.entrypoint = n1
+    self.assertEqual(
+        n2.HasCombinations([[a, ya], [a, yb], [b, yb], [c], [], [ya, c]]),
+        [True, False, True, False, True, False])
+
   def test_conflicting_bindings(self):
     p = cfg.Program()
     n1 = p.NewCFGNode("n1")
@@ -546,6 +570,44 @@ class CFGTest(unittest.TestCase):
     p.entrypoint = n1
     self.assertTrue(n2.HasCombination([a]))
 
+  def test_solving_after_new_edge(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    n2 = n1.ConnectNew("n2")
+    n3 = p.NewCFGNode("n3")
+    x = p.NewVariable()
+    a = x.AddBinding("a", source_set=[], where=n3)
+    self.assertFalse(a.IsVisible(n2))
+    n3.ConnectTo(n1)
+    self.assertTrue(a.IsVisible(n2))
+
+  def test_solving_after_new_origin(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    n2 = n1.ConnectNew("n2")
+    x = p.NewVariable()
+    a = x.AddBinding("a", source_set=[], where=n1)
+    y = p.NewVariable()
+    b = y.AddBinding("b", source_set=[a], where=n2)
+    self.assertTrue(b.IsVisible(n2))
+    self.assertTrue(n2.HasCombination([a, b]))
+    # Overwriting x at n2 hides a, so b can't be formed from it anymore.
+    x.AddBinding("c", source_set=[], where=n2)
+    self.assertFalse(b.IsVisible(n2))
+    self.assertFalse(n2.HasCombination([a, b]))
+
+  def test_solving_after_new_condition(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    n2 = n1.ConnectNew("n2")
+    n3 = n2.ConnectNew("n3")
+    x = p.NewVariable()
+    a = x.AddBinding("a", source_set=[], where=n1)
+    b = x.AddBinding("b", source_set=[], where=n1)
+    self.assertTrue(a.IsVisible(n3))
+    n2.condition = b
+    self.assertFalse(a.IsVisible(n3))
+
   def test_filter2(self):
     p = cfg.Program()
     n1 = p.NewCFGNode("n1")
@@ -679,6 +741,64 @@ class CFGTest(unittest.TestCase):
     o, = ay.origins
     self.assertCountEqual([set()], o.source_sets)
 
+  @unittest.skipUnless(_IS_PYTHON_TYPEGRAPH, "C++ typegraph copies source sets")
+  def test_source_sets_are_shared(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    x = p.NewVariable()
+    a = x.AddBinding("a", source_set=[], where=n1)
+    b = x.AddBinding("b", source_set=[], where=n1)
+    y = p.NewVariable()
+    c = y.AddBinding("c", source_set=[a, b], where=n1)
+    d = y.AddBinding("d", source_set={b, a}, where=n1)
+    c.AddOrigin(n1, [b, a])
+    source_set, = c.origins[0].source_sets
+    self.assertIs(a.origins[0].source_sets[0], b.origins[0].source_sets[0])
+    self.assertIs(source_set, d.origins[0].source_sets[0])
+
+  @unittest.skipUnless(_IS_PYTHON_TYPEGRAPH, "C++ typegraph has no FindOrigin")
+  def test_find_origin(self):
+    p = cfg.Program()
+    nodes = [p.NewCFGNode(f"n{i}") for i in range(10)]
+    x = p.NewVariable()
+    a = x.AddBinding("a")
+    for i, node in enumerate(nodes):
+      a.AddOrigin(node, [])
+      self.assertEqual(len(a.origins), i + 1)
+      for origin, n in zip(a.origins, nodes):
+        self.assertIs(a.FindOrigin(n), origin)
+        self.assertIs(origin.where, n)
+    self.assertIsNone(a.FindOrigin(p.NewCFGNode("n10")))
+
+  @unittest.skipUnless(_IS_PYTHON_TYPEGRAPH, "C++ typegraph keeps all bindings")
+  def test_dead_bindings(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    n2 = n1.ConnectNew("n2")
+    x = p.NewVariable()
+    a = x.AddBinding("a", source_set=[], where=n1)
+    y = p.NewVariable()
+    y.AddBinding("b", source_set=[a], where=n2)
+    z = p.NewVariable()
+    c = z.AddBinding("c", source_set=[a], where=n2)
+    del x, y
+    gc.collect()
+    # The binding of y is gone, while a is still a source of c.
+    self.assertCountEqual(n1.bindings, [a])
+    self.assertCountEqual(n2.bindings, [c])
+    self.assertTrue(c.IsVisible(n2))
+
+  def test_keep_all_bindings(self):
+    p = cfg.Program()
+    n1 = p.NewCFGNode("n1")
+    p.keep_all_bindings = True
+    self.assertTrue(p.keep_all_bindings)
+    x = p.NewVariable()
+    x.AddBinding("a", source_set=[], where=n1)
+    del x
+    gc.collect()
+    self.assertEqual([b.data for b in n1.bindings], ["a"])
+
   def test_paste_with_additional_sources(self):
     p = cfg.Program()
     n1 = p.NewCFGNode("n1")
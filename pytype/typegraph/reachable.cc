@@ -1,49 +1,87 @@
 #include "reachable.h"
 
+#include <algorithm>
 #include <cstddef>
-#include <cstdint>
+#include <utility>
+#include <vector>
 
 namespace devtools_python_typegraph {
 
-static inline std::int64_t _node_bit(int node_id) {
-  return 1l << (node_id & 63);
+ReachabilityAnalyzer::ReachabilityAnalyzer() {
 }
 
-ReachabilityAnalyzer::ReachabilityAnalyzer() : num_nodes_(0) {
+int ReachabilityAnalyzer::add_node() {
+  /* Add a single node, which can only reach itself. */
+  int node = reachable_.size();
+  reachable_.push_back({{node, node}});
+  incoming_.emplace_back();
+  return node;
 }
 
-int ReachabilityAnalyzer::add_node() {
-  /* Add a single node, and grow the matrix by one row and one column. */
-  int node = num_nodes_++;
-  size_ = (num_nodes_ + 63) / 64;
-  adj_.resize(num_nodes_);
-  for (int i = 0; i < num_nodes_; i++) {
-    adj_[i].resize(size_, 0);
+bool ReachabilityAnalyzer::Merge(IntervalSet* set, const IntervalSet& other) {
+  /* Compute the union of two sorted lists of disjoint intervals. Adjacent
+   * intervals are joined, so that a range of consecutive nodes is always
+   * stored as a single interval. */
+  IntervalSet result;
+  result.reserve(set->size() + other.size());
+  IntervalSet::const_iterator a = set->cbegin(), b = other.cbegin();
+  while (a != set->cend() || b != other.cend()) {
+    const std::pair<int, int>& next =
+        (b == other.cend() || (a != set->cend() && a->first <= b->first)) ?
+        *a++ : *b++;
+    if (!result.empty() && next.first <= result.back().second + 1) {
+      result.back().second = std::max(result.back().second, next.second);
+    } else {
+      result.push_back(next);
+    }
   }
-  adj_[node][node / 64] = _node_bit(node);  // New row, so we don't need "|="
-  return node;
+  if (result == *set) {
+    return false;
+  }
+  set->swap(result);
+  return true;
 }
 
 void ReachabilityAnalyzer::add_connection(const int src, const int dst) {
-  /* Update the bit matrix to account for the fact that src and dst are now
-   * connected. We consider every pair (i, j) of nodes, and check whether we
-   * can now connect them using the new src->dst edge. */
-  std::int64_t src_bit = _node_bit(src);
-  int src_pos = src / 64;
-  std::int64_t* row_dst = adj_[dst].data();
-  for (int i = 0; i < num_nodes_; i++) {
-    if (adj_[i][src_pos] & src_bit) {
-      // i is connected to src
-      std::int64_t* row_i = adj_[i].data();
-      for (int j = 0; j < size_; j++) {
-        row_i[j] |= row_dst[j];  // if dst is connected to j, connect i and j
-      }
+  /* Update the reachability sets to account for the fact that src and dst are
+   * now connected. Every node that can reach src can now also reach everything
+   * dst reaches. We walk backwards from src, and stop at nodes that already
+   * reach all of these: the nodes that reach them do so as well. */
+  if (is_reachable(src, dst)) {
+    return;
+  }
+  incoming_[dst].push_back(src);
+  // Copy, in case dst can reach src and its set gets updated as well.
+  const IntervalSet new_reachable = reachable_[dst];
+  std::vector<int> stack = {src};
+  while (!stack.empty()) {
+    int node = stack.back();
+    stack.pop_back();
+    if (Merge(&reachable_[node], new_reachable)) {
+      stack.insert(stack.end(), incoming_[node].begin(),
+                   incoming_[node].end());
     }
   }
 }
 
-const bool ReachabilityAnalyzer::is_reachable(const int src, const int dst) {
-  return adj_[src][dst / 64] & _node_bit(dst) ? true : false;
+const bool ReachabilityAnalyzer::is_reachable(const int src,
+                                              const int dst) const {
+  const IntervalSet& set = reachable_[src];
+  // Find the first interval that ends at or after dst.
+  auto it = std::lower_bound(
+      set.begin(), set.end(), dst,
+      [](const std::pair<int, int>& interval, int node) {
+        return interval.second < node;
+      });
+  return it != set.end() && it->first <= dst;
+}
+
+std::size_t ReachabilityAnalyzer::num_intervals() const {
+  std::size_t count = 0;
+  for (const auto& set : reachable_) {
+    count += set.size();
+  }
+  return count;
 }
 
 }  // namespace devtools_python_typegraph
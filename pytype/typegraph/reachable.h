@@ -4,25 +4,42 @@
 #define PYTYPE_TYPEGRAPH_REACHABLE_H_
 
 #include <cstddef>
-#include <cstdint>
+#include <utility>
 #include <vector>
 
 namespace devtools_python_typegraph {
 
+// Maintains the transitive closure of a graph that only ever grows.
+//
+// The set of nodes reachable from each node is stored as a sorted list of
+// disjoint [first, last] intervals of node ids. The CFGs pytype builds are
+// mostly series-parallel, and their nodes are numbered in the order in which
+// they are created, so these sets consist of a few long runs of consecutive
+// ids, and memory use is close to linear in the number of nodes (as opposed to
+// a bit matrix, which is quadratic).
 class ReachabilityAnalyzer {
  public:
   ReachabilityAnalyzer();
 
   int add_node();
   void add_connection(const int src, const int dst);
-  const bool is_reachable(const int src, const int dst);
+  const bool is_reachable(const int src, const int dst) const;
 
-  std::size_t size() const { return size_; }
+  std::size_t num_nodes() const { return reachable_.size(); }
+  // The total number of intervals stored, for testing and benchmarking.
+  std::size_t num_intervals() const;
 
  private:
-  std::vector<std::vector<std::int64_t>> adj_;
-  std::size_t num_nodes_;  // == adj_.size() == adj_[0].size()
-  std::size_t size_;
+  typedef std::vector<std::pair<int, int>> IntervalSet;
+
+  // Merges "other" into "set". Returns false if "set" already contained it.
+  static bool Merge(IntervalSet* set, const IntervalSet& other);
+
+  // reachable_[i] is the set of nodes reachable from i, including i itself.
+  std::vector<IntervalSet> reachable_;
+  // incoming_[i] are the sources of the edges into node i. Edges that don't
+  // add any new connections are not recorded.
+  std::vector<std::vector<int>> incoming_;
 };
 
 }  // namespace devtools_python_typegraph
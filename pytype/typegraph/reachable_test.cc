@@ -1,5 +1,9 @@
 #include "reachable.h"
 
+#include <random>
+#include <set>
+#include <vector>
+
 #include "gtest/gtest.h"
 
 namespace devtools_python_typegraph {
@@ -55,5 +59,75 @@ TEST_F(ReachabilityTest, TestReachabilityRaw) {
   EXPECT_FALSE(reach_.is_reachable(200, 4));
 }
 
+TEST_F(ReachabilityTest, TestCycle) {
+  for (int i = 0; i < 5; i++) {
+    reach_.add_node();
+  }
+  reach_.add_connection(0, 1);
+  reach_.add_connection(1, 2);
+  reach_.add_connection(2, 3);
+  reach_.add_connection(3, 1);  // loop back
+  reach_.add_connection(3, 4);
+  for (int i = 1; i < 4; i++) {
+    for (int j = 1; j < 5; j++) {
+      EXPECT_TRUE(reach_.is_reachable(i, j)) << i << " " << j;
+    }
+    EXPECT_FALSE(reach_.is_reachable(i, 0));
+  }
+  EXPECT_TRUE(reach_.is_reachable(0, 4));
+  EXPECT_FALSE(reach_.is_reachable(4, 3));
+}
+
+TEST_F(ReachabilityTest, TestIntervals) {
+  // A chain, numbered in order, only needs a single interval per node.
+  for (int i = 0; i < 1000; i++) {
+    reach_.add_node();
+    if (i > 0) {
+      reach_.add_connection(i - 1, i);
+    }
+  }
+  EXPECT_EQ(1000, reach_.num_intervals());
+  EXPECT_TRUE(reach_.is_reachable(0, 999));
+  EXPECT_TRUE(reach_.is_reachable(500, 501));
+  EXPECT_FALSE(reach_.is_reachable(501, 500));
+}
+
+TEST_F(ReachabilityTest, TestRandomGraph) {
+  // Compare against a depth-first search on the explicit graph.
+  const int num_nodes = 60;
+  std::mt19937 rng(42);
+  std::uniform_int_distribution<int> node(0, num_nodes - 1);
+  std::vector<std::set<int>> edges(num_nodes);
+  for (int i = 0; i < num_nodes; i++) {
+    reach_.add_node();
+  }
+  for (int e = 0; e < 120; e++) {
+    int src = node(rng), dst = node(rng);
+    edges[src].insert(dst);
+    reach_.add_connection(src, dst);
+    if (e % 10 != 0) {
+      continue;
+    }
+    for (int i = 0; i < num_nodes; i++) {
+      std::vector<bool> seen(num_nodes, false);
+      std::vector<int> stack = {i};
+      seen[i] = true;
+      while (!stack.empty()) {
+        int n = stack.back();
+        stack.pop_back();
+        for (int m : edges[n]) {
+          if (!seen[m]) {
+            seen[m] = true;
+            stack.push_back(m);
+          }
+        }
+      }
+      for (int j = 0; j < num_nodes; j++) {
+        EXPECT_EQ(seen[j], reach_.is_reachable(i, j)) << i << " " << j;
+      }
+    }
+  }
+}
+
 }  // namespace
 }  // namespace devtools_python_typegraph
@@ -253,6 +253,21 @@ QueryResult PathFinder::FindNodeBackwards(
   return result;
 }
 
+void PathFinder::Invalidate(const std::unordered_set<const CFGNode*>& starts) {
+  for (auto it = solved_find_queries_->begin();
+       it != solved_find_queries_->end();) {
+    if (starts.count(it->first.start())) {
+      it = solved_find_queries_->erase(it);
+    } else {
+      ++it;
+    }
+  }
+}
+
+void PathFinder::Clear() {
+  solved_find_queries_->clear();
+}
+
 }  // namespace internal
 
 Solver::Solver(const Program* program)
@@ -267,6 +282,41 @@ SolverMetrics Solver::CalculateMetrics() const {
   return SolverMetrics(std::vector<QueryMetrics>(query_metrics_), cm);
 }
 
+void Solver::InvalidateDownstream(const CFGNode* node) {
+  if (positions_.empty()) return;
+  std::unordered_set<const CFGNode*> affected;
+  std::unordered_set<const CFGNode*> seen;
+  std::vector<const CFGNode*> stack;
+  stack.push_back(node);
+  while (!stack.empty()) {
+    const CFGNode* n = stack.back();
+    stack.pop_back();
+    if (!seen.insert(n).second) continue;
+    if (positions_.count(n)) affected.insert(n);
+    stack.insert(stack.end(), n->outgoing().begin(), n->outgoing().end());
+  }
+  if (affected.empty()) return;
+  for (auto it = solved_states_->begin(); it != solved_states_->end();) {
+    if (affected.count(it->first.pos())) {
+      it = solved_states_->erase(it);
+    } else {
+      ++it;
+    }
+  }
+  for (const CFGNode* n : affected) positions_.erase(n);
+  path_finder_.Invalidate(affected);
+}
+
+void Solver::InvalidateVariable(const Variable* variable) {
+  if (!variables_.count(variable)) return;
+  // Answers are derived from each other, so we can't tell which of them
+  // depend on the variable.
+  solved_states_->clear();
+  positions_.clear();
+  variables_.clear();
+  path_finder_.Clear();
+}
+
 bool Solver::GoalsConflict(const internal::GoalSet& goals) const {
   std::unordered_map<const Variable*, const Binding*> variables;
   for (const Binding* goal : goals) {
@@ -320,6 +370,12 @@ bool Solver::FindSolution(const internal::State& state,
       LOG(INFO) << indent << "New: " << goal->variable()->id() << " = "
                 << goal->data();
     }
+    for (const auto* goal : result.removed_goals) {
+      variables_.insert(goal->variable());
+    }
+    for (const auto* goal : result.new_goals) {
+      variables_.insert(goal->variable());
+    }
     current_depth += 1;
     if (GoalsConflict(result.removed_goals)) {
       LOG(INFO) << indent << "conflicting removed goals!";
@@ -411,6 +467,7 @@ bool Solver::RecallOrFindSolution(
   // that if it's possible to solve this state at this level of the tree, it can
   // also be solved in any of the children.
   (*solved_states_)[state] = true;
+  positions_.insert(state.pos());
   // Careful! Modifying seen_states would affect other recursive calls, so we
   // need to copy it.
   internal::StateSet new_seen_states(seen_states);
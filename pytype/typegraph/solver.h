@@ -26,6 +26,7 @@
 #include <memory>
 #include <set>
 #include <unordered_map>
+#include <unordered_set>
 #include <vector>
 
 #include "typegraph.h"
@@ -110,6 +111,8 @@ class QueryKey {
            const CFGNodeSet& b):
     start_(s), finish_(f), blocked_(b) {}
 
+  const CFGNode* start() const { return start_; }
+
   std::size_t Hash() const {
     std::size_t hash = std::hash<const CFGNode*>{}(start_);
     hash_mix<const CFGNode*>(hash, finish_);
@@ -184,6 +187,12 @@ class PathFinder {
   QueryResult FindNodeBackwards(const CFGNode* start, const CFGNode* finish,
                                 const CFGNodeSet& blocked);
 
+  // Drop the answers for queries that start at one of the given nodes.
+  void Invalidate(const std::unordered_set<const CFGNode*>& starts);
+
+  // Drop all answers.
+  void Clear();
+
  private:
   const std::unique_ptr<QueryMap> solved_find_queries_;
 };
@@ -214,6 +223,17 @@ class Solver {
 
   SolverMetrics CalculateMetrics () const;
 
+  // The solver keeps its answers while the program grows. The answer for a
+  // state depends only on the CFG nodes from which its position can be
+  // reached and on the bindings of the variables that solving it looked at,
+  // so only the answers that a change to those can affect are dropped.
+
+  // Drop the answers for states whose position can be reached from node.
+  void InvalidateDownstream(const CFGNode* node);
+
+  // Drop all answers if solving looked at the bindings of variable.
+  void InvalidateVariable(const Variable* variable);
+
  private:
   // Do a quick (one DFS run) sanity check of whether a solution might exist.
   bool CanHaveSolution(const std::vector<const Binding*>& start_attrs,
@@ -234,6 +254,10 @@ class Solver {
              const CFGNode* start_node);
 
   const std::unique_ptr<internal::StateMap> solved_states_;
+  // The positions of the states in solved_states_.
+  std::unordered_set<const CFGNode*> positions_;
+  // The variables whose bindings were looked at by FindSolution.
+  std::unordered_set<const Variable*> variables_;
   std::size_t state_cache_hits_;
   std::size_t state_cache_misses_;
 
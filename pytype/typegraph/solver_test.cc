@@ -543,34 +543,42 @@ TEST(SolverTest, TestMetricsCache) {
   EXPECT_TRUE(qm[2].from_cache());
   EXPECT_EQ(qm[2].end_node(), n2->id());
 
-  // Adding a new binding will invalidate the solver and destroy the cache.
+  // Bindings of a variable that the solver hasn't looked at and new nodes
+  // can't change its answers, so the cache is kept.
   auto y = p.NewVariable();
   auto yb = AddBinding(y, &b, n2, {});
-
-  // Seed the cache.
-  solver = p.GetSolver();
-  EXPECT_TRUE(solver->Solve({xa}, n1));
-  // Since xa is bound at n0, the previous query adds 2 entries to the cache.
-  EXPECT_EQ(solver->CalculateMetrics().cache_metrics().total_size(), 2);
+  auto n3 = n2->ConnectNew("n3");
+  EXPECT_EQ(p.GetSolver(), solver);
+  EXPECT_EQ(solver->CalculateMetrics().cache_metrics().total_size(), 3);
 
   EXPECT_TRUE(solver->Solve({xa, yb}, n2));
   auto m2 = solver->CalculateMetrics();
-  auto cm2 = metrics.cache_metrics();
-  EXPECT_EQ(cm2.total_size(), 3);
+  auto cm2 = m2.cache_metrics();
   // Because there are >1 initial bindings, the Solver performs a short-circuit
-  // check. This hits the cache. The query isn't shortcircuited, so the cache is
-  // hit a second time during regular evaluation.
-  EXPECT_EQ(cm2.hits(), 2);
-  EXPECT_EQ(cm2.misses(), 3);
+  // check. Solving for xa hits the cache, solving for yb adds a new entry. The
+  // query isn't shortcircuited, so regular evaluation adds another entry, and
+  // hits the cache once xa is the only goal left.
+  EXPECT_EQ(cm2.total_size(), 5);
+  EXPECT_EQ(cm2.hits(), 4);
+  EXPECT_EQ(cm2.misses(), 5);
 
   auto xy_qm = m2.query_metrics().back();
   // from_cache is set if any part of the query is answered by the cache.
   EXPECT_TRUE(xy_qm.from_cache());
   EXPECT_FALSE(xy_qm.shortcircuited());
-  // Shortcircuiting adds 2, then evaluating adds another 2.
-  EXPECT_EQ(xy_qm.total_binding_count(), 4);
+  // Shortcircuiting adds 1 for yb, then evaluating adds another 2.
+  EXPECT_EQ(xy_qm.total_binding_count(), 3);
   // xa is set on n0, but the cache means we can answer the query at n2.
   EXPECT_EQ(xy_qm.end_node(), n2->id());
+
+  // A new edge drops the answers for the nodes below it.
+  n3->ConnectTo(n1);
+  EXPECT_EQ(solver->CalculateMetrics().cache_metrics().total_size(), 1);
+  // A new binding for a variable the solver looked at drops all answers.
+  std::string c("c");
+  AddBinding(x, &c, n1, {});
+  EXPECT_EQ(solver->CalculateMetrics().cache_metrics().total_size(), 0);
+  EXPECT_FALSE(solver->Solve({xa}, n2));
 }
 
 TEST(SolverTest, TestMetricsShortcircuit) {
@@ -4,6 +4,7 @@
 #include <cstddef>
 #include <iterator>
 #include <stack>
+#include <unordered_map>
 #include <unordered_set>
 #include <vector>
 
@@ -20,8 +21,9 @@ CFGNode* Program::NewCFGNode(const std::string& name) {
 }
 
 CFGNode* Program::NewCFGNode(const std::string& name, Binding* condition) {
+  // A new node is not connected to anything yet, so it can't change any of the
+  // answers of the solver.
   // Count the number of nodes so far and use that as ID
-  InvalidateSolver();
   std::size_t node_nr = CountCFGNodes();
   int n = backward_reachability_->add_node();
   CHECK(n == node_nr) <<
@@ -64,6 +66,14 @@ void Program::InvalidateSolver() {
   solver_.reset();
 }
 
+void Program::InvalidateSolverDownstream(const CFGNode* node) {
+  if (solver_) solver_->InvalidateDownstream(node);
+}
+
+void Program::InvalidateSolverForVariable(const Variable* variable) {
+  if (solver_) solver_->InvalidateVariable(variable);
+}
+
 bool Program::is_reachable(const CFGNode* src, const CFGNode* dst) {
   return backward_reachability_->is_reachable(dst->id(), src->id());
 }
@@ -133,7 +143,7 @@ void CFGNode::ConnectTo(CFGNode* node) {
       return;  // already connected
     }
   }
-  program_->InvalidateSolver();
+  program_->InvalidateSolverDownstream(node);
   node->incoming_.push_back(this);
   this->outgoing_.push_back(node);
   this->backward_reachability_->add_connection(node->id(), this->id());
@@ -143,6 +153,33 @@ bool CFGNode::HasCombination(const std::vector<const Binding*>& bindings) {
   return program_->GetSolver()->Solve(bindings, this);
 }
 
+std::vector<bool> CFGNode::HasCombinations(
+    const std::vector<std::vector<const Binding*>>& binding_lists) {
+  Solver* solver = program_->GetSolver();
+  std::unordered_map<const Binding*, bool> visible;
+  std::vector<bool> results;
+  results.reserve(binding_lists.size());
+  for (const auto& bindings : binding_lists) {
+    bool possible = true;
+    if (bindings.size() > 1) {
+      // Solve() checks each binding on its own first, so only do this once
+      // per binding for the whole batch.
+      for (const Binding* binding : bindings) {
+        auto it = visible.find(binding);
+        if (it == visible.end()) {
+          it = visible.emplace(binding, solver->Solve({binding}, this)).first;
+        }
+        if (!it->second) {
+          possible = false;
+          break;
+        }
+      }
+    }
+    results.push_back(possible && solver->Solve(bindings, this));
+  }
+  return results;
+}
+
 bool CFGNode::CanHaveCombination(const std::vector<const Binding*>& bindings) {
   for (const Binding* goal : bindings) {
     bool origin_reachable = false;
@@ -199,19 +236,20 @@ Origin* Binding::FindOrAddOrigin(CFGNode* node) {
 }
 
 Origin* Binding::AddOrigin(CFGNode* node) {
-  program_->InvalidateSolver();
+  program_->InvalidateSolverForVariable(variable_);
   return FindOrAddOrigin(node);
 }
 
 Origin* Binding::AddOrigin(CFGNode* node,
                            const std::vector<Binding*>& source_set) {
-  program_->InvalidateSolver();
+  program_->InvalidateSolverForVariable(variable_);
   Origin* origin = FindOrAddOrigin(node);
   origin->AddSourceSet(source_set);
   return origin;
 }
 
 Origin* Binding::AddOrigin(CFGNode* node, const SourceSet& source_set) {
+  program_->InvalidateSolverForVariable(variable_);
   Origin* origin = FindOrAddOrigin(node);
   origin->AddSourceSet(source_set);
   return origin;
@@ -260,7 +298,8 @@ Binding* Variable::FindOrAddBindingHelper(const BindingData& data) {
   auto it = data_to_binding_.find(data.get());
   if (it == data_to_binding_.end()) {
     LOG(DEBUG) << "Adding choice to Variable " << id_;
-    program_->InvalidateSolver();
+    // A binding without origins can't change any of the answers of the
+    // solver. Its origins are added through AddOrigin.
     auto binding =
         std::unique_ptr<Binding>(new Binding(program_, this, data,
                                              program_->MakeBindingId()));
@@ -106,6 +106,10 @@ class Program {
 
   Solver* GetSolver();
   void InvalidateSolver();
+  // Forget solver answers that depend on the incoming edges of node.
+  void InvalidateSolverDownstream(const CFGNode* node);
+  // Forget solver answers that depend on the bindings of variable.
+  void InvalidateSolverForVariable(const Variable* variable);
 
   bool is_reachable(const CFGNode* src, const CFGNode* dst);
 
@@ -147,6 +151,11 @@ class CFGNode {
   // the current CFG node.
   bool HasCombination(const std::vector<const Binding*>& bindings);
 
+  // Like HasCombination, for a batch of combinations. Bindings that appear in
+  // more than one combination are only checked on their own once.
+  std::vector<bool> HasCombinations(
+      const std::vector<std::vector<const Binding*>>& binding_lists);
+
   bool CanHaveCombination(const std::vector<const Binding*>& bindings);
 
   // Called whenever a Binding uses a (new) CFG node.
@@ -163,7 +172,10 @@ class CFGNode {
 
   // Node condition. The binding representing condition for node's branch.
   Binding* condition() const { return condition_; }
-  void set_condition(Binding* condition) { this->condition_ = condition; }
+  void set_condition(Binding* condition) {
+    program_->InvalidateSolverDownstream(this);
+    this->condition_ = condition;
+  }
 
   // Incoming nodes, i.e. program paths that converge at this point.
   const std::vector<CFGNode*>& incoming() const { return incoming_; }
@@ -1,5 +1,7 @@
 """Tests for typegraph_serializer.py."""
 
+from pytype import context
+from pytype import load_pytd
 from pytype.tests import test_base
 from pytype.tests import test_utils
 from pytype.typegraph import typegraph_serializer
@@ -8,7 +10,9 @@ from pytype.typegraph import typegraph_serializer
 class TypegraphSerializerTest(test_base.BaseTest):
 
   def test_basic(self):
-    ctx = test_utils.make_context(self.options)
+    ctx = context.Context(options=self.options,
+                          loader=load_pytd.Loader(self.options),
+                          keep_all_bindings=True)
     # Max depth is arbitrarily chosen from analyze.py.
     loc, defs = ctx.vm.run_program(
         src="", filename="", maximum_depth=3)
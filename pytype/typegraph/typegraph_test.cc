@@ -1,4 +1,6 @@
 #include <algorithm>
+#include <chrono>
+#include <iostream>
 
 #include "test_util.h"
 #include "typegraph.h"
@@ -192,21 +194,39 @@ TEST_F(TypeGraphTest, testInvalidateSolver) {
   EXPECT_EQ(p.solver(), nullptr);
   n1->HasCombination({});
   EXPECT_NE(p.solver(), nullptr);
-  // Adding a new CFGNode invalidates the current solver.
+  // The solver is kept while the program grows, and drops the answers that
+  // the changes affect.
+  Solver* solver = p.solver();
   CFGNode* n2 = p.NewCFGNode("n2");
-  EXPECT_EQ(p.solver(), nullptr);
-  n2->HasCombination({});
-  EXPECT_NE(p.solver(), nullptr);
-  // a new Variable by itself doesn't change the CFG, so the solver is valid.
   Variable* x = p.NewVariable();
-  EXPECT_NE(p.solver(), nullptr);
-  // Adding a binding invalidates the solver.
   std::string a("a");
-  Binding* ax = AddBinding(x, &a);
-  ax->AddOrigin(n1);
+  Binding* ax = AddBinding(x, &a, n1, {});
+  EXPECT_FALSE(n2->HasCombination({ax}));
+  n1->ConnectTo(n2);
+  EXPECT_TRUE(n2->HasCombination({ax}));
+  EXPECT_EQ(p.solver(), solver);
+  p.InvalidateSolver();
   EXPECT_EQ(p.solver(), nullptr);
-  n2->HasCombination({ax});
-  EXPECT_NE(p.solver(), nullptr);
+}
+
+TEST_F(TypeGraphTest, testHasCombinations) {
+  Program p;
+  CFGNode* n1 = p.NewCFGNode("n1");
+  CFGNode* n2 = n1->ConnectNew("n2");
+  CFGNode* n3 = p.NewCFGNode("n3");
+  Variable* x = p.NewVariable();
+  Variable* y = p.NewVariable();
+  std::string a("a");
+  std::string b("b");
+  std::string c("c");
+  Binding* xa = AddBinding(x, &a, n1, {});
+  Binding* xb = AddBinding(x, &b, n1, {});
+  Binding* xc = AddBinding(x, &c, n3, {});
+  Binding* ya = AddBinding(y, &a, n2, {xa});
+  Binding* yb = AddBinding(y, &b, n2, {xb});
+  EXPECT_THAT(n2->HasCombinations({{xa, ya}, {xa, yb}, {xb, yb}, {xc}, {},
+                                   {ya, xc}}),
+              testing::ElementsAre(true, false, true, false, true, false));
 }
 
 TEST_F(TypeGraphTest, testMaxVarSize) {
@@ -263,5 +283,47 @@ TEST_F(TypeGraphTest, TestMetrics) {
   EXPECT_EQ(varm[0].binding_count(), 1);
   EXPECT_THAT(varm[0].node_ids(), testing::UnorderedElementsAre(0, 1));
 }
+
+// Microbenchmark for the reachability index. Builds a CFG shaped like the ones
+// pytype generates: a sequence of if/else diamonds, with every tenth diamond
+// wrapped in a loop, and then queries reachability between pairs of nodes.
+static void BenchmarkReachability(int num_nodes) {
+  auto start = std::chrono::steady_clock::now();
+  Program p;
+  std::vector<CFGNode*> joins;
+  CFGNode* node = p.NewCFGNode("root");
+  joins.push_back(node);
+  while (p.CountCFGNodes() < num_nodes) {
+    CFGNode* if_node = node->ConnectNew("if");
+    CFGNode* else_node = node->ConnectNew("else");
+    node = if_node->ConnectNew("join");
+    else_node->ConnectTo(node);
+    if (joins.size() % 10 == 0) {
+      node->ConnectTo(if_node);  // loop back
+    }
+    joins.push_back(node);
+  }
+  auto built = std::chrono::steady_clock::now();
+  int num_queries = 0;
+  for (std::size_t i = 1; i < joins.size(); i += joins.size() / 1000 + 1) {
+    EXPECT_TRUE(p.is_reachable(joins[0], joins[i]));
+    EXPECT_FALSE(p.is_reachable(joins[i], joins[0]));
+    EXPECT_TRUE(p.is_reachable(joins[i - 1], joins[i]));
+    num_queries += 3;
+  }
+  auto queried = std::chrono::steady_clock::now();
+  typedef std::chrono::duration<double, std::milli> ms;
+  std::cout << "reachability, " << p.CountCFGNodes() << " nodes: build "
+            << ms(built - start).count() << "ms, " << num_queries
+            << " queries " << ms(queried - built).count() << "ms"
+            << std::endl;
+}
+
+TEST(TypeGraphBenchmark, Reachability10K) { BenchmarkReachability(10000); }
+
+TEST(TypeGraphBenchmark, Reachability100K) { BenchmarkReachability(100000); }
+
+TEST(TypeGraphBenchmark, Reachability1M) { BenchmarkReachability(1000000); }
+
 }  // namespace
 }  // namespace devtools_python_typegraph
@@ -18,9 +18,11 @@ import functools
 import itertools
 import logging
 import re
+import time
 from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 from pytype import blocks
+from pytype import code_cache
 from pytype import compare
 from pytype import constant_folding
 from pytype import datatypes
@@ -36,6 +38,7 @@ from pytype.abstract import mixin
 from pytype.directors import directors
 from pytype.overlays import overlay_dict
 from pytype.overlays import overlay as overlay_lib
+from pytype.pyc import compiler
 from pytype.pyc import loadmarshal
 from pytype.pyc import opcodes
 from pytype.pyc import pyc
@@ -163,6 +166,47 @@ class _BranchTracker:
 
 
 _opcode_counter = metrics.MapCounter("vm_opcode")
+_budget_counter = metrics.MapCounter("vm_function_budget_exceeded")
+
+
+class _OpcodeProfiler:
+  """Records the cost of every executed opcode, for --profile-opcodes.
+
+  Opcodes are keyed on their name and source location. The count of an opcode
+  is the number of bindings that were created while running it.
+  """
+
+  def __init__(self, program):
+    self._program = program
+    # Looked up per run rather than at import time, so that the profile is
+    # still recorded after the metrics registry has been reset.
+    self._profile = metrics.get_metric("vm_opcode_profile", metrics.MapProfile)
+    # For every opcode that is running, the cost of the opcodes nested in it,
+    # e.g., the ones in the body of a function that it calls.
+    self._nested = []
+
+  @contextlib.contextmanager
+  def profile(self, op, filename):
+    """Profile the execution of op."""
+    start_wall = time.perf_counter()
+    start_cpu = metrics.get_cpu_clock()
+    start_count = self._program.next_binding_id
+    nested = [0.0, 0.0, 0]
+    self._nested.append(nested)
+    try:
+      yield
+    finally:
+      self._nested.pop()
+      wall = time.perf_counter() - start_wall
+      cpu = metrics.get_cpu_clock() - start_cpu
+      count = self._program.next_binding_id - start_count
+      self._profile.add(f"{op.name} {filename}:{op.line}", wall, cpu, count,
+                        wall - nested[0], cpu - nested[1], count - nested[2])
+      if self._nested:
+        parent = self._nested[-1]
+        parent[0] += wall
+        parent[1] += cpu
+        parent[2] += count
 
 
 class VirtualMachineError(Exception):
@@ -221,6 +265,14 @@ class VirtualMachine:
     # variable ids.
     self._var_names = {}
     self._branch_tracker = None
+    self._opcode_profiler = (_OpcodeProfiler(ctx.program)
+                             if ctx.options.profile_opcodes else None)
+    # For --function-budget: the number of opcodes that each function's code
+    # has run, and the code of the functions that ran out of budget.
+    self._function_costs = collections.Counter()
+    self._over_budget = set()
+    self._code_cache = (code_cache.CodeCache(ctx.options.bytecode_cache)
+                        if ctx.options.bytecode_cache else None)
 
   @property
   def current_local_ops(self):
@@ -281,6 +333,39 @@ class VirtualMachine:
   def is_at_maximum_depth(self):
     return len(self.frames) > self._maximum_depth
 
+  def is_over_budget(self, code):
+    """Whether the function with the given code ran out of --function-budget."""
+    return code in self._over_budget
+
+  def _charge_budget(self, frame, block):
+    """Charges running block to frame's budget.
+
+    Args:
+      frame: The frame that is about to run the block.
+      block: A block of opcodes.
+
+    Returns:
+      False if running the block would exceed the --function-budget, in which
+      case the function is marked as over budget and the block should not be
+      run; True otherwise.
+    """
+    budget = self.ctx.options.function_budget
+    if not budget or not frame.f_code.has_newlocals():
+      # Only functions have a budget, not modules and class bodies.
+      return True
+    code = frame.f_code
+    if self._function_costs[code] + len(block.code) <= budget:
+      self._function_costs[code] += len(block.code)
+      return True
+    if code not in self._over_budget:
+      self._over_budget.add(code)
+      name = frame.func.data.name if frame.func else code.co_name
+      log.warning("Analysis of %s exceeded the function budget", name)
+      _budget_counter.inc(name)
+      self.ctx.errorlog.analysis_budget_exceeded(
+          self.frames, name, budget, code.co_firstlineno)
+    return False
+
   def run_instruction(
       self, op: opcodes.Opcode, state: frame_state.FrameState
   ) -> frame_state.FrameState:
@@ -297,6 +382,12 @@ class VirtualMachine:
       VirtualMachineError: if a fatal error occurs.
     """
     _opcode_counter.inc(op.name)
+    if self._opcode_profiler:
+      with self._opcode_profiler.profile(op, self.frame.f_code.co_filename):
+        return self._run_instruction(op, state)
+    return self._run_instruction(op, state)
+
+  def _run_instruction(self, op, state):
     self.frame.current_opcode = op
     self._importing = "IMPORT" in op.__class__.__name__
     if log.isEnabledFor(logging.INFO):
@@ -340,6 +431,14 @@ class VirtualMachine:
       if not state:
         log.warning("Skipping block %d, nothing connects to it.", block.id)
         continue
+      if not self._charge_budget(frame, block):
+        # Give up on the rest of the function, which returns its annotation or
+        # Any instead.
+        self._set_frame_return(
+            state.node, frame, self.ctx.new_unsolvable(state.node))
+        can_return = True
+        return_nodes.append(state.node)
+        break
       self.frame.current_block = block
       op = None
       for op in block:
@@ -468,6 +567,32 @@ class VirtualMachine:
     frame.f_back = None
     return node, val
 
+  def _parse_src(self, src):
+    """Parse the program source.
+
+    If the directors parse the source with the stdlib ast module, the source is
+    parsed only once: the annotation preprocessing is applied to the ast, and
+    if we compile in-process, we compile the ast rather than the source.
+
+    Args:
+      src: The program source code.
+
+    Returns:
+      A tuple of the parsed source, for directors.Director, and the source to
+      pass to compile_src.
+    """
+    python_version = self.ctx.python_version
+    if not directors.PARSES_TO_AST:
+      if python_version >= (3, 8):
+        src = preprocess.augment_annotations(src)
+      return directors.parse_src(src, python_version), src
+    src_tree = directors.parse_src(src, python_version)
+    if python_version >= (3, 8):
+      src = preprocess.augment_annotations(src, src_tree.ast)
+    if compiler.can_compile_bytecode_natively(python_version):
+      src = src_tree.ast
+    return src_tree, src
+
   def compile_src(self, src, filename=None, mode="exec"):
     """Compile the given source code."""
     code = pyc.compile_src(
@@ -501,6 +626,23 @@ class VirtualMachine:
     node, return_var = self.run_frame(frame, node)
     return node, frame.f_globals, frame.f_locals, return_var
 
+  def _process_code(self, code):
+    """Add the director's information to the code and optimize it.
+
+    Args:
+      code: The code of the program, as returned by compile_src.
+
+    Returns:
+      A tuple of the processed code and the lines of the type comments that
+      were not attached to an opcode.
+    """
+    code = blocks.merge_annotations(code, self._director.annotations)
+    visitor = vm_utils.FindIgnoredTypeComments(self._director.type_comments)
+    pyc.visit(code, visitor)
+    code = constant_folding.optimize(code)
+    vm_utils.adjust_block_returns(code, self._director.block_returns)
+    return code, frozenset(visitor.ignored_lines())
+
   def run_program(self, src, filename, maximum_depth):
     """Run the code and return the CFG nodes.
 
@@ -514,10 +656,14 @@ class VirtualMachine:
     """
     self.filename = filename
     self._maximum_depth = maximum_depth
-    if self.ctx.python_version >= (3, 8):
-      src = preprocess.augment_annotations(src)
-    src_tree = directors.parse_src(src, self.ctx.python_version)
-    code = self.compile_src(src, filename=filename)
+    # Before 3.8, the director needs the bytecode (see below), so we don't cache
+    # it.
+    cache_key = cached = None
+    if self._code_cache and self.ctx.python_version >= (3, 8):
+      cache_key = code_cache.make_key(src, filename, self.ctx.python_version)
+      cached = self._code_cache.load(filename, cache_key)
+    src_tree, src = self._parse_src(src)
+    code = None if cached else self.compile_src(src, filename=filename)
     # In Python 3.8+, opcodes are consistently at the first line of the
     # corresponding source code. Before 3.8, they are on one of the last lines
     # but the exact positioning is unpredictable, so we pass the bytecode to the
@@ -531,14 +677,15 @@ class VirtualMachine:
     self._director = director
     self.ctx.options.set_feature_flags(director.features)
     self._branch_tracker = _BranchTracker(director)
-    code = blocks.merge_annotations(code, self._director.annotations)
-    visitor = vm_utils.FindIgnoredTypeComments(self._director.type_comments)
-    pyc.visit(code, visitor)
-    for line in visitor.ignored_lines():
+    if cached:
+      code, ignored_lines = cached
+    else:
+      code, ignored_lines = self._process_code(code)
+      if cache_key:
+        self._code_cache.store(filename, cache_key, (code, ignored_lines))
+    for line in sorted(ignored_lines):
       self.ctx.errorlog.ignored_type_comment(self.filename, line,
                                              self._director.type_comments[line])
-    code = constant_folding.optimize(code)
-    vm_utils.adjust_block_returns(code, self._director.block_returns)
 
     node = self.ctx.root_node.ConnectNew("init")
     node, f_globals, f_locals, _ = self.run_bytecode(node, code)
@@ -21,7 +21,9 @@ prints:
 import textwrap
 
 from pytype import context
+from pytype import metrics
 from pytype import vm
+from pytype.platform_utils import path_utils
 from pytype.tests import test_base
 from pytype.tests import test_utils
 
@@ -114,5 +116,37 @@ class AnnotationsTest(VmTestBase):
         })
 
 
+class OpcodeProfileTest(VmTestBase):
+  """Tests for --profile-opcodes."""
+
+  def setUp(self):
+    super().setUp()
+    self.options.tweak(profile_opcodes=True)
+    self.ctx = self.make_context()
+
+  def test_profile(self):
+    src = textwrap.dedent("""
+      def f(x):  # line 1
+        return [x]  # line 2
+      y = f(1)  # line 3
+    """).lstrip()
+    with test_utils.Tempdir() as d:
+      metrics_file = path_utils.join(d.path, "metrics")
+      with metrics.MetricsContext(metrics_file):
+        self.ctx.vm.run_program(src, "profiled.py", maximum_depth=10)
+      with open(metrics_file) as f:
+        profile, = (m for m in metrics.load_all(f)
+                    if m.name == "vm_opcode_profile")
+    entries = {key.split(" ")[0]: entry
+               for key, entry in profile.entries().items()
+               if key.endswith(" profiled.py:3")}
+    self.assertIn("STORE_NAME", entries)
+    # The call also counts the bindings created in the body of f.
+    call = max(entries.values(), key=lambda entry: entry["count"])
+    self.assertEqual(call["calls"], 1)
+    self.assertGreater(call["count"], call["self_count"])
+    self.assertGreaterEqual(call["wall"], call["self_wall"])
+
+
 if __name__ == "__main__":
   test_base.main()